@@ -0,0 +1,42 @@
+"""
+Admin configuration for analytics app.
+"""
+
+from django.contrib import admin
+from .models import DailyCategorySales, DailyProductSales, DailySales, RollupWatermark
+
+
+class ReadOnlyRollupAdmin(admin.ModelAdmin):
+    """Rollups are written by the rollup task only."""
+    date_hierarchy = 'bucket'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ['bucket', 'revenue', 'orders', 'units']
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ['bucket', 'category', 'revenue', 'orders', 'units']
+    list_filter = ['category']
+    list_select_related = ['category']
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ['bucket', 'product', 'category', 'revenue', 'orders', 'units']
+    search_fields = ['product__name']
+    list_select_related = ['product', 'category']
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ['name', 'position', 'updated_at']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,37 @@
+"""
+Serializers for analytics API.
+"""
+
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+# Longest range a report may cover, per granularity
+MAX_RANGE_DAYS = {'day': 366, 'hour': 31}
+DEFAULT_RANGE_DAYS = 30
+
+
+class ReportQuerySerializer(serializers.Serializer):
+    """
+    Query parameters shared by the reports: an inclusive date range in
+    ``TIME_ZONE`` (default: the last 30 days) and an optional category.
+    """
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    granularity = serializers.ChoiceField(choices=['day', 'hour'], default='day')
+    category = serializers.UUIDField(required=False)
+    order_by = serializers.ChoiceField(choices=['revenue', 'units', 'orders'], default='revenue')
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, attrs):
+        end = attrs.get('end') or timezone.localdate()
+        start = attrs.get('start') or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+        if start > end:
+            raise serializers.ValidationError({'start': 'start must not be after end'})
+        if (end - start).days + 1 > MAX_RANGE_DAYS[attrs['granularity']]:
+            raise serializers.ValidationError(
+                {'start': f'At most {MAX_RANGE_DAYS[attrs["granularity"]]} days per report'}
+            )
+        attrs['start'], attrs['end'] = start, end
+        return attrs
@@ -0,0 +1,12 @@
+"""
+URL configuration for analytics API.
+"""
+
+from django.urls import path
+from .views import category_sales, sales_report, top_products
+
+urlpatterns = [
+    path('analytics/sales/', sales_report, name='analytics_sales'),
+    path('analytics/top-products/', top_products, name='analytics_top_products'),
+    path('analytics/categories/', category_sales, name='analytics_categories'),
+]
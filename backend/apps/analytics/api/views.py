@@ -0,0 +1,136 @@
+"""
+Sales reports, served from the rollup tables only.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Sum
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from ..models import (
+    DailyCategorySales,
+    DailyProductSales,
+    DailySales,
+    HourlyCategorySales,
+    HourlySales,
+    RollupWatermark,
+)
+from ..rollups import WATERMARK, day_start
+from .serializers import ReportQuerySerializer
+
+# Aliases must not clash with the rollup fields they sum
+TOTALS = {
+    'total_revenue': Sum('revenue'),
+    'total_orders': Sum('orders'),
+    'total_units': Sum('units'),
+}
+
+
+def _query(request):
+    serializer = ReportQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def _figures(row):
+    return {
+        'revenue': float(row['total_revenue'] or 0),
+        'orders': row['total_orders'] or 0,
+        'units': row['total_units'] or 0,
+    }
+
+
+def _report(query, data):
+    watermark = RollupWatermark.objects.filter(name=WATERMARK).values_list('position', flat=True).first()
+    return Response({
+        'start': query['start'],
+        'end': query['end'],
+        # Orders paid after this are not in the figures yet
+        'updated_until': watermark,
+        **data,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def sales_report(request):
+    """
+    Revenue, orders and units per day or hour, optionally for one category.
+    """
+    query = _query(request)
+    if query['granularity'] == 'hour':
+        model = HourlyCategorySales if 'category' in query else HourlySales
+        rows = model.objects.filter(
+            bucket__gte=day_start(query['start']),
+            bucket__lt=day_start(query['end'] + timedelta(days=1)),
+        )
+    else:
+        model = DailyCategorySales if 'category' in query else DailySales
+        rows = model.objects.filter(bucket__gte=query['start'], bucket__lte=query['end'])
+    if 'category' in query:
+        rows = rows.filter(category_id=query['category'])
+
+    series = [
+        {'bucket': row['bucket'], **_figures(row)}
+        for row in rows.values('bucket').annotate(**TOTALS).order_by('bucket')
+    ]
+    total = rows.aggregate(**TOTALS)
+    return _report(query, {
+        'granularity': query['granularity'],
+        'total': _figures(total),
+        'series': series,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def top_products(request):
+    """
+    Best-selling products over a date range, optionally within one category.
+    """
+    query = _query(request)
+    rows = DailyProductSales.objects.filter(bucket__gte=query['start'], bucket__lte=query['end'])
+    if 'category' in query:
+        rows = rows.filter(category_id=query['category'])
+
+    products = (
+        rows
+        .values('product_id', 'product__name')
+        .annotate(**TOTALS)
+        .order_by(f'-total_{query["order_by"]}', 'product_id')[:query['limit']]
+    )
+    return _report(query, {
+        'products': [
+            {'id': row['product_id'], 'name': row['product__name'], **_figures(row)}
+            for row in products
+        ],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def category_sales(request):
+    """
+    Sales per category over a date range.
+    """
+    query = _query(request)
+    categories = (
+        DailyCategorySales.objects
+        .filter(bucket__gte=query['start'], bucket__lte=query['end'])
+        .values('category_id', 'category__name')
+        .annotate(**TOTALS)
+        .order_by(f'-total_{query["order_by"]}', 'category_id')
+    )
+    return _report(query, {
+        'categories': [
+            {'id': row['category_id'], 'name': row['category__name'], **_figures(row)}
+            for row in categories
+        ],
+    })
+
+
+# Reports only read rollups, which may lag anyway; serve them from replicas
+for _view in (sales_report, top_products, category_sales):
+    _view.use_read_replica = True
@@ -0,0 +1,147 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0006_category_tree_interval_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='名称')),
+                ('position', models.DateTimeField(blank=True, null=True, verbose_name='水位')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '统计水位',
+                'verbose_name_plural': '统计水位',
+                'db_table': 'analytics_rollup_watermarks',
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlySales',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='销售额')),
+                ('orders', models.IntegerField(default=0, verbose_name='订单数')),
+                ('units', models.IntegerField(default=0, verbose_name='销量')),
+                ('bucket', models.DateTimeField(unique=True, verbose_name='小时')),
+            ],
+            options={
+                'verbose_name': '小时销售',
+                'verbose_name_plural': '小时销售',
+                'db_table': 'analytics_hourly_sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='销售额')),
+                ('orders', models.IntegerField(default=0, verbose_name='订单数')),
+                ('units', models.IntegerField(default=0, verbose_name='销量')),
+                ('bucket', models.DateField(unique=True, verbose_name='日期')),
+            ],
+            options={
+                'verbose_name': '日销售',
+                'verbose_name_plural': '日销售',
+                'db_table': 'analytics_daily_sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyCategorySales',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='销售额')),
+                ('orders', models.IntegerField(default=0, verbose_name='订单数')),
+                ('units', models.IntegerField(default=0, verbose_name='销量')),
+                ('bucket', models.DateTimeField(verbose_name='小时')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.category', verbose_name='分类')),
+            ],
+            options={
+                'verbose_name': '分类小时销售',
+                'verbose_name_plural': '分类小时销售',
+                'db_table': 'analytics_hourly_category_sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCategorySales',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='销售额')),
+                ('orders', models.IntegerField(default=0, verbose_name='订单数')),
+                ('units', models.IntegerField(default=0, verbose_name='销量')),
+                ('bucket', models.DateField(verbose_name='日期')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.category', verbose_name='分类')),
+            ],
+            options={
+                'verbose_name': '分类日销售',
+                'verbose_name_plural': '分类日销售',
+                'db_table': 'analytics_daily_category_sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyProductSales',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='销售额')),
+                ('orders', models.IntegerField(default=0, verbose_name='订单数')),
+                ('units', models.IntegerField(default=0, verbose_name='销量')),
+                ('bucket', models.DateTimeField(verbose_name='小时')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.category', verbose_name='分类')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product', verbose_name='商品')),
+            ],
+            options={
+                'verbose_name': '商品小时销售',
+                'verbose_name_plural': '商品小时销售',
+                'db_table': 'analytics_hourly_product_sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='销售额')),
+                ('orders', models.IntegerField(default=0, verbose_name='订单数')),
+                ('units', models.IntegerField(default=0, verbose_name='销量')),
+                ('bucket', models.DateField(verbose_name='日期')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.category', verbose_name='分类')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product', verbose_name='商品')),
+            ],
+            options={
+                'verbose_name': '商品日销售',
+                'verbose_name_plural': '商品日销售',
+                'db_table': 'analytics_daily_product_sales',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='hourlycategorysales',
+            constraint=models.UniqueConstraint(fields=('bucket', 'category'), name='analytics_hourly_bucket_category_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycategorysales',
+            constraint=models.UniqueConstraint(fields=('bucket', 'category'), name='analytics_daily_bucket_category_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='hourlyproductsales',
+            index=models.Index(fields=['bucket', 'category'], name='analytics_hourly_prod_cat_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='hourlyproductsales',
+            constraint=models.UniqueConstraint(fields=('bucket', 'product'), name='analytics_hourly_bucket_product_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyproductsales',
+            index=models.Index(fields=['bucket', 'category'], name='analytics_daily_prod_cat_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyproductsales',
+            constraint=models.UniqueConstraint(fields=('bucket', 'product'), name='analytics_daily_bucket_product_uniq'),
+        ),
+    ]
@@ -0,0 +1,147 @@
+"""
+Sales rollup models.
+
+Rows are written only by ``apps.analytics.rollups``; reports read these
+tables instead of aggregating ``orders``/``order_items``. Each rollup
+exists per hour and per day (days in ``TIME_ZONE``), for all sales, per
+category and per product. ``orders`` counts distinct orders, so it is
+kept per dimension rather than summed from finer rows.
+"""
+
+from django.db import models
+from apps.products.models import Category, Product
+
+
+class SalesRollup(models.Model):
+    """
+    Sales figures of one time bucket.
+    """
+    id = models.BigAutoField(primary_key=True)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='销售额')
+    orders = models.IntegerField(default=0, verbose_name='订单数')
+    units = models.IntegerField(default=0, verbose_name='销量')
+
+    class Meta:
+        abstract = True
+
+
+class CategorySalesRollup(SalesRollup):
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='分类'
+    )
+
+    class Meta:
+        abstract = True
+
+
+class ProductSalesRollup(SalesRollup):
+    """
+    ``category`` is the product's category when the bucket was computed.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='商品'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='分类'
+    )
+
+    class Meta:
+        abstract = True
+
+
+class HourlySales(SalesRollup):
+    bucket = models.DateTimeField(unique=True, verbose_name='小时')
+
+    class Meta:
+        db_table = 'analytics_hourly_sales'
+        verbose_name = '小时销售'
+        verbose_name_plural = '小时销售'
+
+
+class DailySales(SalesRollup):
+    bucket = models.DateField(unique=True, verbose_name='日期')
+
+    class Meta:
+        db_table = 'analytics_daily_sales'
+        verbose_name = '日销售'
+        verbose_name_plural = '日销售'
+
+
+class HourlyCategorySales(CategorySalesRollup):
+    bucket = models.DateTimeField(verbose_name='小时')
+
+    class Meta:
+        db_table = 'analytics_hourly_category_sales'
+        verbose_name = '分类小时销售'
+        verbose_name_plural = '分类小时销售'
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'category'], name='analytics_hourly_bucket_category_uniq'),
+        ]
+
+
+class DailyCategorySales(CategorySalesRollup):
+    bucket = models.DateField(verbose_name='日期')
+
+    class Meta:
+        db_table = 'analytics_daily_category_sales'
+        verbose_name = '分类日销售'
+        verbose_name_plural = '分类日销售'
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'category'], name='analytics_daily_bucket_category_uniq'),
+        ]
+
+
+class HourlyProductSales(ProductSalesRollup):
+    bucket = models.DateTimeField(verbose_name='小时')
+
+    class Meta:
+        db_table = 'analytics_hourly_product_sales'
+        verbose_name = '商品小时销售'
+        verbose_name_plural = '商品小时销售'
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'product'], name='analytics_hourly_bucket_product_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket', 'category'], name='analytics_hourly_prod_cat_idx'),
+        ]
+
+
+class DailyProductSales(ProductSalesRollup):
+    bucket = models.DateField(verbose_name='日期')
+
+    class Meta:
+        db_table = 'analytics_daily_product_sales'
+        verbose_name = '商品日销售'
+        verbose_name_plural = '商品日销售'
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'product'], name='analytics_daily_bucket_product_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket', 'category'], name='analytics_daily_prod_cat_idx'),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """
+    How far (by ``Order.paid_at``) the rollups have been filled.
+    """
+    name = models.CharField(max_length=50, primary_key=True, verbose_name='名称')
+    position = models.DateTimeField(null=True, blank=True, verbose_name='水位')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        db_table = 'analytics_rollup_watermarks'
+        verbose_name = '统计水位'
+        verbose_name_plural = '统计水位'
+
+    def __str__(self):
+        return f'{self.name}: {self.position}'
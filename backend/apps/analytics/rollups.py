@@ -0,0 +1,251 @@
+"""
+Filling the sales rollup tables.
+
+A bucket is always recomputed whole from its source rows and replaced,
+never incremented, so refreshing a bucket twice (a retried task, an
+overlapping backfill chunk) gives the same result. Hourly buckets are
+aggregated from paid orders (``Order.paid_at``, served by
+``orders_paid_at_idx``); daily buckets are summed from the hourly ones.
+
+``update_rollups`` is the incremental path: it refreshes the hours
+between the ``sales`` watermark and now minus ``LAG_SECONDS`` and moves
+the watermark. The lag leaves time for payment transactions that stamped
+``paid_at`` just before the run to commit, and the hour containing the
+watermark is always recomputed, so a late commit inside it is still
+picked up by the next run. ``rebuild_rollups`` (the
+``backfill_sales_rollups`` command) recomputes everything in parallel
+day chunks.
+"""
+
+import multiprocessing
+import os
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from apps.orders.models import Order, OrderItem
+from .models import (
+    DailyCategorySales,
+    DailyProductSales,
+    DailySales,
+    HourlyCategorySales,
+    HourlyProductSales,
+    HourlySales,
+    RollupWatermark,
+)
+
+WATERMARK = 'sales'
+
+# Orders whose items count as sold
+SOLD_STATUSES = ('paid', 'shipped', 'completed')
+
+# Held while a backfill runs so the incremental task stays out of its way
+BACKFILL_LOCK_KEY = 'analytics:backfill'
+
+DEFAULT_SETTINGS = {
+    'LAG_SECONDS': 120,
+    'MAX_WINDOW_HOURS': 24,
+    'BACKFILL_CHUNK_DAYS': 7,
+    'BACKFILL_LOCK_TIMEOUT': 6 * 3600,
+}
+
+# (hourly model, daily model, {rollup field: order item field})
+ROLLUPS = (
+    (HourlySales, DailySales, {}),
+    (HourlyCategorySales, DailyCategorySales, {'category_id': 'product__category_id'}),
+    (HourlyProductSales, DailyProductSales, {'product_id': 'product_id', 'category_id': 'product__category_id'}),
+)
+
+
+def get_analytics_settings():
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'ANALYTICS', {}))
+    return options
+
+
+def floor_hour(value):
+    return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def refresh_hours(start, end):
+    """
+    Recompute hourly rollups for the hours in ``[start, end)`` (both on
+    hour boundaries). Returns the number of rows written.
+    """
+    items = (
+        OrderItem.objects
+        .filter(order__status__in=SOLD_STATUSES, order__paid_at__gte=start, order__paid_at__lt=end)
+        .annotate(bucket=TruncHour('order__paid_at'))
+        .order_by()
+    )
+    written = 0
+    with transaction.atomic():
+        for hourly, _, dimensions in ROLLUPS:
+            rows = items.values('bucket', *dimensions.values()).annotate(
+                total_revenue=Sum('subtotal'),
+                total_orders=Count('order_id', distinct=True),
+                total_units=Sum('quantity'),
+            )
+            hourly.objects.filter(bucket__gte=start, bucket__lt=end).delete()
+            created = hourly.objects.bulk_create([
+                hourly(
+                    bucket=row['bucket'],
+                    revenue=row['total_revenue'],
+                    orders=row['total_orders'],
+                    units=row['total_units'],
+                    **{field: row[source] for field, source in dimensions.items()}
+                )
+                for row in rows
+            ], batch_size=2000)
+            written += len(created)
+    return written
+
+
+def refresh_days(first_day, last_day):
+    """
+    Recompute daily rollups for ``first_day``..``last_day`` (inclusive)
+    from the hourly ones. Returns the number of rows written.
+    """
+    start, end = day_start(first_day), day_start(last_day + timedelta(days=1))
+    written = 0
+    with transaction.atomic():
+        for hourly, daily, dimensions in ROLLUPS:
+            rows = (
+                hourly.objects
+                .filter(bucket__gte=start, bucket__lt=end)
+                .annotate(day=TruncDate('bucket'))
+                .values('day', *dimensions)
+                .annotate(
+                    total_revenue=Sum('revenue'),
+                    total_orders=Sum('orders'),
+                    total_units=Sum('units'),
+                )
+                .order_by()
+            )
+            daily.objects.filter(bucket__gte=first_day, bucket__lte=last_day).delete()
+            created = daily.objects.bulk_create([
+                daily(
+                    bucket=row['day'],
+                    revenue=row['total_revenue'],
+                    orders=row['total_orders'],
+                    units=row['total_units'],
+                    **{field: row[field] for field in dimensions}
+                )
+                for row in rows
+            ], batch_size=2000)
+            written += len(created)
+    return written
+
+
+def refresh_range(start, end):
+    """Recompute the hours in ``[start, end)`` and the days they touch."""
+    start, end = floor_hour(start), floor_hour(end)
+    if end <= start:
+        return 0
+    with transaction.atomic():
+        written = refresh_hours(start, end)
+        written += refresh_days(timezone.localdate(start), timezone.localdate(end - timedelta(microseconds=1)))
+    return written
+
+
+def update_rollups(now=None):
+    """
+    Fill the rollups from the watermark up to now minus ``LAG_SECONDS``,
+    at most ``MAX_WINDOW_HOURS`` per call. Returns the number of rows
+    written, or None if a backfill is running.
+    """
+    if cache.get(BACKFILL_LOCK_KEY):
+        return None
+
+    options = get_analytics_settings()
+    upper = (now or timezone.now()) - timedelta(seconds=options['LAG_SECONDS'])
+
+    with transaction.atomic():
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK)
+        lower = watermark.position
+        if lower is None:
+            lower = Order.objects.aggregate(first=Min('paid_at'))['first'] or upper
+        if upper <= lower:
+            return 0
+
+        # Catch up a long backlog over several runs
+        upper = min(upper, lower + timedelta(hours=options['MAX_WINDOW_HOURS']))
+        written = refresh_range(lower, floor_hour(upper) + timedelta(hours=1))
+        watermark.position = upper
+        watermark.save(update_fields=['position', 'updated_at'])
+    return written
+
+
+# -- Backfill ------------------------------------------------------------------
+
+def _refresh_days_chunk(days):
+    """Pool worker: recompute a chunk of whole days."""
+    first_day, last_day = days
+    try:
+        return days, refresh_range(day_start(first_day), day_start(last_day + timedelta(days=1)))
+    finally:
+        connections.close_all()
+
+
+def rebuild_rollups(workers=None, chunk_days=None, log=print):
+    """
+    Delete every rollup row and recompute them from all paid orders in
+    parallel chunks of ``chunk_days`` days, then reset the watermark so
+    the incremental task continues from where the rebuild stopped.
+    """
+    options = get_analytics_settings()
+    chunk_days = chunk_days or options['BACKFILL_CHUNK_DAYS']
+    workers = workers or os.cpu_count() or 1
+
+    if not cache.add(BACKFILL_LOCK_KEY, 1, options['BACKFILL_LOCK_TIMEOUT']):
+        raise RuntimeError('Another rollup backfill is running')
+    try:
+        upper = timezone.now() - timedelta(seconds=options['LAG_SECONDS'])
+        with transaction.atomic():
+            # Wait for an incremental run that started before the lock was taken
+            RollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK)
+            for hourly, daily, _ in ROLLUPS:
+                hourly.objects.all().delete()
+                daily.objects.all().delete()
+
+        bounds = Order.objects.filter(status__in=SOLD_STATUSES).aggregate(
+            first=Min('paid_at'), last=Max('paid_at')
+        )
+        chunks = []
+        if bounds['first'] is not None:
+            day = timezone.localdate(bounds['first'])
+            last_day = timezone.localdate(bounds['last'])
+            while day <= last_day:
+                chunk_end = min(day + timedelta(days=chunk_days - 1), last_day)
+                chunks.append((day, chunk_end))
+                day = chunk_end + timedelta(days=1)
+        log(f'Rebuilding {len(chunks)} chunks of up to {chunk_days} days with {workers} workers...')
+
+        def collect(results):
+            written = 0
+            for done, ((first_day, last_day), rows) in enumerate(results, 1):
+                written += rows
+                log(f'  {first_day}..{last_day}: {rows} rows ({done}/{len(chunks)})')
+            return written
+
+        # Don't hand open database sockets to forked workers
+        connections.close_all()
+        if workers <= 1 or len(chunks) <= 1:
+            written = collect(map(_refresh_days_chunk, chunks))
+        else:
+            with multiprocessing.Pool(min(workers, len(chunks))) as pool:
+                written = collect(pool.imap_unordered(_refresh_days_chunk, chunks))
+
+        RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={'position': upper})
+        return written
+    finally:
+        cache.delete(BACKFILL_LOCK_KEY)
@@ -0,0 +1,13 @@
+"""
+Celery tasks for analytics app.
+"""
+
+from celery import shared_task
+
+from .rollups import update_rollups
+
+
+@shared_task
+def update_sales_rollups():
+    """Fill the hourly/daily sales rollups from paid orders since the watermark."""
+    return update_rollups()
@@ -39,3 +39,44 @@ class CartItemUpdateSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("Quantity must be greater than 0.")
         return value
+
+
+class CartBatchOperationSerializer(serializers.Serializer):
+    """
+    A single operation in a batch cart mutation.
+
+    ``add`` needs ``product_id``; ``update`` and ``remove`` accept either
+    ``item_id`` or ``product_id``. ``update`` fails for a product that
+    isn't in the cart.
+    """
+    OPERATIONS = ['add', 'update', 'remove']
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    item_id = serializers.UUIDField(required=False)
+    product_id = serializers.UUIDField(required=False)
+    quantity = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        if attrs['op'] == 'add' and 'product_id' not in attrs:
+            raise serializers.ValidationError("product_id is required for add.")
+        if 'item_id' not in attrs and 'product_id' not in attrs:
+            raise serializers.ValidationError("item_id or product_id is required.")
+        if attrs['op'] in ('add', 'update') and 'quantity' not in attrs:
+            raise serializers.ValidationError("quantity is required.")
+        return attrs
+
+
+class CartBatchSerializer(serializers.Serializer):
+    """
+    Batch cart mutation serializer.
+    """
+    operations = CartBatchOperationSerializer(many=True, allow_empty=False)
+
+    MAX_OPERATIONS = 100
+
+    def validate_operations(self, value):
+        if len(value) > self.MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f"At most {self.MAX_OPERATIONS} operations per batch."
+            )
+        return value
@@ -6,6 +6,7 @@ from django.urls import path
 from .views import (
     cart_summary,
     add_to_cart,
+    batch_update_cart,
     CartItemDetailView,
     clear_cart
 )
@@ -13,6 +14,7 @@ from .views import (
 urlpatterns = [
     path('cart/', cart_summary, name='cart_summary'),
     path('cart/items/', add_to_cart, name='add_to_cart'),
+    path('cart/batch/', batch_update_cart, name='batch_update_cart'),
     path('cart/items/<uuid:id>/', CartItemDetailView.as_view(), name='cart_item_detail'),
     path('cart/clear/', clear_cart, name='clear_cart'),
 ]
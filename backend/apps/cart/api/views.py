@@ -6,30 +6,35 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from ..models import CartItem
+from django.db import transaction
+from django.http import Http404
 from apps.products.models import Product
-from .serializers import CartItemSerializer, CartItemUpdateSerializer
+from ..storage import get_cart_store, CartStockError
+from .serializers import CartItemSerializer, CartItemUpdateSerializer, CartBatchSerializer
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def cart_summary(request):
-    """
-    Get current user's cart summary.
-    """
-    cart_items = CartItem.objects.filter(user=request.user).select_related('product')
+def build_cart_summary(cart_items):
+    """Serialize cart items together with their totals."""
     serializer = CartItemSerializer(cart_items, many=True)
 
     # Calculate totals
     total_items = sum(item.quantity for item in cart_items)
     total_amount = sum(item.subtotal for item in cart_items)
 
-    return Response({
+    return {
         'items': serializer.data,
         'total_items': total_items,
         'total_amount': total_amount
-    })
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cart_summary(request):
+    """
+    Get current user's cart summary.
+    """
+    return Response(build_cart_summary(get_cart_store().items(request.user)))
 
 
 @api_view(['POST'])
@@ -39,17 +44,25 @@ def add_to_cart(request):
     Add a product to cart or update quantity if already exists.
     """
     product_id = request.data.get('product_id')
-    quantity = request.data.get('quantity', 1)
-
     if not product_id:
         return Response(
             {'error': 'product_id is required'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    try:
+        quantity = int(request.data.get('quantity', 1))
+    except (TypeError, ValueError):
+        quantity = 0
+    if quantity <= 0:
+        return Response(
+            {'error': 'Quantity must be greater than 0.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
     # Validate product exists and is active
     try:
-        product = Product.objects.get(id=product_id, is_active=True)
+        product = Product.objects.select_related('category').get(id=product_id, is_active=True)
     except Product.DoesNotExist:
         return Response(
             {'error': 'Product not found or not active'},
@@ -63,25 +76,87 @@ def add_to_cart(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Get or create cart item
-    cart_item, created = CartItem.objects.get_or_create(
-        user=request.user,
-        product=product,
-        defaults={'quantity': quantity}
-    )
-
-    if not created:
-        # Update quantity if item already exists
-        cart_item.quantity += quantity
-        if cart_item.quantity > product.stock:
+    try:
+        cart_item, created = get_cart_store().add(request.user, product, quantity)
+    except CartStockError as exc:
+        return Response(
+            {'error': str(exc)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = CartItemSerializer(cart_item)
+    return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch_update_cart(request):
+    """
+    Apply a list of add/update/remove operations to the cart at once.
+
+    All referenced products are validated with one query and the changes
+    are written in a single transaction; nothing is applied if any
+    operation is invalid. Returns the recomputed cart summary.
+    """
+    serializer = CartBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    operations = serializer.validated_data['operations']
+    store = get_cart_store()
+
+    with transaction.atomic():
+        current = store.items(request.user, for_update=True)
+        by_id = {item.id: item for item in current}
+
+        # Resolve item ids to products before the single product lookup
+        errors = {}
+        product_ids = []
+        for index, operation in enumerate(operations):
+            if 'item_id' in operation:
+                item = by_id.get(operation['item_id'])
+                if item is None:
+                    errors[index] = 'Cart item not found'
+                    continue
+                operation['product_id'] = item.product_id
+            product_ids.append(operation['product_id'])
+
+        products = Product.objects.select_related('category').in_bulk(product_ids)
+        quantities = {item.product_id: item.quantity for item in current}
+        for index, operation in enumerate(operations):
+            if index in errors:
+                continue
+            product = products.get(operation['product_id'])
+            if product is None or (operation['op'] != 'remove' and not product.is_active):
+                errors[index] = 'Product not found or not active'
+                continue
+
+            if operation['op'] == 'add':
+                quantities[product.id] = quantities.get(product.id, 0) + operation['quantity']
+            elif operation['op'] == 'update':
+                # Only lines in the cart (or added earlier in the batch) can be updated
+                if not quantities.get(product.id):
+                    errors[index] = 'Cart item not found'
+                    continue
+                quantities[product.id] = operation['quantity']
+            else:
+                quantities[product.id] = 0
+
+            if quantities[product.id] > product.stock:
+                errors[index] = f'Only {product.stock} items available in stock'
+
+        if errors:
             return Response(
-                {'error': f'Only {product.stock} items available in stock'},
+                {'errors': {str(index): message for index, message in sorted(errors.items())}},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        cart_item.save()
 
-    serializer = CartItemSerializer(cart_item)
-    return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+        changed = {
+            products[product_id]: quantity
+            for product_id, quantity in quantities.items()
+            if product_id in products
+        }
+        store.set_quantities(request.user, current, changed)
+
+    return Response(build_cart_summary(store.items(request.user)))
 
 
 class CartItemDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -92,14 +167,30 @@ class CartItemDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
     lookup_field = 'id'
 
-    def get_queryset(self):
-        return CartItem.objects.filter(user=self.request.user)
+    def get_object(self):
+        cart_item = get_cart_store().get(self.request.user, self.kwargs[self.lookup_field])
+        if cart_item is None:
+            raise Http404
+        return cart_item
 
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return CartItemUpdateSerializer
         return CartItemSerializer
 
+    def perform_update(self, serializer):
+        cart_item = get_cart_store().update(
+            self.request.user,
+            serializer.instance.id,
+            serializer.validated_data.get('quantity', serializer.instance.quantity)
+        )
+        if cart_item is None:
+            raise Http404
+        serializer.instance = cart_item
+
+    def perform_destroy(self, instance):
+        get_cart_store().remove(self.request.user, [instance.id])
+
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
@@ -107,5 +198,5 @@ def clear_cart(request):
     """
     Clear all items from cart.
     """
-    CartItem.objects.filter(user=request.user).delete()
+    get_cart_store().clear(request.user)
     return Response({'message': 'Cart cleared successfully'})
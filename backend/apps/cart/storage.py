@@ -0,0 +1,446 @@
+"""
+Cart storage backends.
+
+Views and order placement talk to a cart store instead of the
+``CartItem`` table directly. ``DatabaseCartStore`` (the default) keeps
+using the ORM; ``RedisCartStore`` keeps each cart in a Redis hash and
+flushes changes back to ``CartItem`` asynchronously (write-behind).
+The backend is chosen with the ``CART_STORE`` setting.
+
+Stores hand out unsaved-or-saved ``CartItem`` instances with ``product``
+(and its category) already loaded, so the existing serializers work on
+both backends.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.products.models import Product
+from .models import CartItem
+
+logger = logging.getLogger(__name__)
+
+
+class CartStockError(Exception):
+    """Raised when a cart line would exceed the product's stock."""
+
+    def __init__(self, available):
+        self.available = available
+        super().__init__(f'Only {available} items available in stock')
+
+
+class BaseCartStore:
+    """Interface shared by all cart stores."""
+
+    def items(self, user, item_ids=None, for_update=False):
+        """Return the user's cart items, optionally limited to ``item_ids``."""
+        raise NotImplementedError
+
+    def get(self, user, item_id):
+        """Return one cart item or None."""
+        items = self.items(user, [item_id])
+        return items[0] if items else None
+
+    def add(self, user, product, quantity):
+        """
+        Add ``quantity`` of ``product``, merging with an existing line.
+
+        Returns ``(item, created)``; raises ``CartStockError`` if the
+        resulting quantity exceeds ``product.stock``.
+        """
+        raise NotImplementedError
+
+    def update(self, user, item_id, quantity):
+        """Set a line's quantity; returns the item or None if missing."""
+        raise NotImplementedError
+
+    def remove(self, user, item_ids):
+        """Remove lines by id; returns how many were removed."""
+        raise NotImplementedError
+
+    def clear(self, user):
+        """Remove every line from the user's cart."""
+        raise NotImplementedError
+
+    def claim(self, user, items):
+        """
+        Remove ``items`` for checkout, all or none. Returns False if any
+        of them is gone (taken by a concurrent checkout).
+        """
+        raise NotImplementedError
+
+    def restore(self, user, items):
+        """
+        Undo a ``claim`` whose transaction rolled back. Lines the user has
+        re-added meanwhile are kept.
+        """
+        raise NotImplementedError
+
+    def set_quantities(self, user, current, quantities):
+        """
+        Apply final quantities in one batch.
+
+        ``current`` is the list returned by ``items(user)``; ``quantities``
+        maps product to its new quantity, where 0 removes the line.
+        """
+        raise NotImplementedError
+
+
+class DatabaseCartStore(BaseCartStore):
+    """Cart store backed directly by the ``CartItem`` table."""
+
+    def items(self, user, item_ids=None, for_update=False):
+        queryset = CartItem.objects.filter(user=user).select_related('product__category')
+        if item_ids is not None:
+            queryset = queryset.filter(id__in=list(item_ids))
+        if for_update:
+            queryset = queryset.select_for_update(of=('self',)).order_by('id')
+        return list(queryset)
+
+    def add(self, user, product, quantity):
+        # Lock the cart row so concurrent adds can't both pass the stock check
+        with transaction.atomic():
+            item, created = CartItem.objects.select_for_update().get_or_create(
+                user=user,
+                product=product,
+                defaults={'quantity': quantity}
+            )
+            if not created:
+                if item.quantity + quantity > product.stock:
+                    raise CartStockError(product.stock)
+                item.quantity += quantity
+                item.save(update_fields=['quantity', 'updated_at'])
+        item.product = product
+        return item, created
+
+    def update(self, user, item_id, quantity):
+        item = self.get(user, item_id)
+        if item is None:
+            return None
+        item.quantity = quantity
+        item.save(update_fields=['quantity', 'updated_at'])
+        return item
+
+    def remove(self, user, item_ids):
+        deleted, _ = CartItem.objects.filter(user=user, id__in=list(item_ids)).delete()
+        return deleted
+
+    def clear(self, user):
+        CartItem.objects.filter(user=user).delete()
+
+    def claim(self, user, items):
+        # A partial delete rolls back with the caller's transaction
+        return self.remove(user, [item.id for item in items]) == len(items)
+
+    def restore(self, user, items):
+        # The rollback already brought the rows back
+        pass
+
+    def set_quantities(self, user, current, quantities):
+        by_product = {item.product_id: item for item in current}
+        now = timezone.now()
+        to_create, to_update, to_delete = [], [], []
+        for product, quantity in quantities.items():
+            item = by_product.get(product.id)
+            if item is None:
+                if quantity > 0:
+                    to_create.append(CartItem(user=user, product=product, quantity=quantity))
+            elif quantity <= 0:
+                to_delete.append(item.id)
+            elif quantity != item.quantity:
+                item.quantity = quantity
+                item.updated_at = now
+                to_update.append(item)
+
+        with transaction.atomic():
+            if to_delete:
+                CartItem.objects.filter(user=user, id__in=to_delete).delete()
+            if to_update:
+                CartItem.objects.bulk_update(to_update, ['quantity', 'updated_at'])
+            if to_create:
+                CartItem.objects.bulk_create(to_create)
+
+
+# Adds quantity to a line (creating it if needed) unless it would exceed
+# the stock limit. Returns {created, json} or {-1, current quantity}.
+REDIS_ADD_SCRIPT = """
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+local item
+local created = 0
+if raw then
+    item = cjson.decode(raw)
+    item['q'] = item['q'] + tonumber(ARGV[2])
+else
+    item = {id = ARGV[4], q = tonumber(ARGV[2]), c = ARGV[5]}
+    created = 1
+end
+if item['q'] > tonumber(ARGV[3]) then
+    return {-1, tostring(item['q'] - tonumber(ARGV[2]))}
+end
+item['u'] = ARGV[5]
+local encoded = cjson.encode(item)
+redis.call('HSET', KEYS[1], ARGV[1], encoded)
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+redis.call('SADD', KEYS[2], ARGV[7])
+return {created, encoded}
+"""
+
+# Removes every given line if all of them are still in the cart with the
+# given ids, otherwise none. ARGV: ttl, user id, then product id/item id
+# pairs. Returns 1 if the lines were removed.
+REDIS_CLAIM_SCRIPT = """
+for i = 3, #ARGV, 2 do
+    local raw = redis.call('HGET', KEYS[1], ARGV[i])
+    if not raw or cjson.decode(raw)['id'] ~= ARGV[i + 1] then
+        return 0
+    end
+end
+for i = 3, #ARGV, 2 do
+    redis.call('HDEL', KEYS[1], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('SADD', KEYS[2], ARGV[2])
+return 1
+"""
+
+
+class RedisCartStore(BaseCartStore):
+    """
+    Cart store keeping each cart in a Redis hash.
+
+    ``cart:<user_id>`` maps product id to a JSON line ``{id, q, c, u}``
+    plus a ``_loaded`` sentinel so empty carts are cached too. Carts are
+    loaded from ``CartItem`` on first access, every mutation adds the
+    user to the ``cart:dirty`` set, and ``flush_dirty_carts`` (run by
+    Celery beat) writes dirty carts back to the database.
+    """
+    key_prefix = 'cart:'
+    dirty_key = 'cart:dirty'
+    loaded_field = '_loaded'
+
+    def __init__(self, url=None, ttl=7 * 24 * 3600):
+        import redis
+
+        self.client = redis.Redis.from_url(url or settings.REDIS_URL, decode_responses=True)
+        self.ttl = ttl
+        self._add_script = self.client.register_script(REDIS_ADD_SCRIPT)
+        self._claim_script = self.client.register_script(REDIS_CLAIM_SCRIPT)
+
+    def _key(self, user_id):
+        return f'{self.key_prefix}{user_id}'
+
+    def _load(self, user_id):
+        """Read the cart hash, populating it from the database on a miss."""
+        key = self._key(user_id)
+        data = self.client.hgetall(key)
+        if data:
+            return data
+
+        # HSETNX so a concurrent write that beat us to Redis is not clobbered
+        pipe = self.client.pipeline()
+        pipe.hsetnx(key, self.loaded_field, '1')
+        for item in CartItem.objects.filter(user_id=user_id):
+            pipe.hsetnx(key, str(item.product_id), self._encode(item))
+        pipe.expire(key, self.ttl)
+        pipe.hgetall(key)
+        return pipe.execute()[-1]
+
+    def _mark_dirty(self, pipe, user_id):
+        pipe.expire(self._key(user_id), self.ttl)
+        pipe.sadd(self.dirty_key, str(user_id))
+
+    @staticmethod
+    def _encode(item):
+        return json.dumps({
+            'id': str(item.id),
+            'q': item.quantity,
+            'c': item.created_at.isoformat(),
+            'u': item.updated_at.isoformat(),
+        })
+
+    @staticmethod
+    def _decode(user_id, product_id, raw):
+        data = json.loads(raw)
+        return CartItem(
+            id=uuid.UUID(data['id']),
+            user_id=user_id,
+            product_id=uuid.UUID(product_id),
+            quantity=int(data['q']),
+            created_at=datetime.fromisoformat(data['c']),
+            updated_at=datetime.fromisoformat(data.get('u', data['c'])),
+        )
+
+    def _lines(self, user_id):
+        data = self._load(user_id)
+        return [
+            self._decode(user_id, product_id, raw)
+            for product_id, raw in data.items()
+            if product_id != self.loaded_field
+        ]
+
+    def _attach_products(self, items):
+        products = Product.objects.select_related('category').in_bulk(
+            [item.product_id for item in items]
+        )
+        attached = []
+        for item in items:
+            product = products.get(item.product_id)
+            if product is None:
+                # Product was deleted; the next flush drops the line
+                continue
+            item.product = product
+            attached.append(item)
+        attached.sort(key=lambda item: item.created_at, reverse=True)
+        return attached
+
+    def items(self, user, item_ids=None, for_update=False):
+        lines = self._lines(user.id)
+        if item_ids is not None:
+            wanted = {uuid.UUID(str(item_id)) for item_id in item_ids}
+            lines = [item for item in lines if item.id in wanted]
+        return self._attach_products(lines)
+
+    def add(self, user, product, quantity):
+        self._load(user.id)
+        now = timezone.now().isoformat()
+        created, payload = self._add_script(
+            keys=[self._key(user.id), self.dirty_key],
+            args=[
+                str(product.id), quantity, product.stock,
+                str(uuid.uuid4()), now, self.ttl, str(user.id),
+            ],
+        )
+        if int(created) == -1:
+            raise CartStockError(product.stock)
+        item = self._decode(user.id, str(product.id), payload)
+        item.product = product
+        return item, bool(int(created))
+
+    def update(self, user, item_id, quantity):
+        item = self.get(user, item_id)
+        if item is None:
+            return None
+        item.quantity = quantity
+        item.updated_at = timezone.now()
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(user.id), str(item.product_id), self._encode(item))
+        self._mark_dirty(pipe, user.id)
+        pipe.execute()
+        return item
+
+    def remove(self, user, item_ids):
+        wanted = {uuid.UUID(str(item_id)) for item_id in item_ids}
+        fields = [str(item.product_id) for item in self._lines(user.id) if item.id in wanted]
+        if not fields:
+            return 0
+        pipe = self.client.pipeline()
+        pipe.hdel(self._key(user.id), *fields)
+        self._mark_dirty(pipe, user.id)
+        removed, *_ = pipe.execute()
+        return removed
+
+    def clear(self, user):
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(user.id))
+        pipe.hset(self._key(user.id), self.loaded_field, '1')
+        self._mark_dirty(pipe, user.id)
+        pipe.execute()
+
+    def claim(self, user, items):
+        if not items:
+            return True
+        args = [self.ttl, str(user.id)]
+        for item in items:
+            args += [str(item.product_id), str(item.id)]
+        return bool(int(self._claim_script(keys=[self._key(user.id), self.dirty_key], args=args)))
+
+    def restore(self, user, items):
+        if not items:
+            return
+        self._load(user.id)
+        key = self._key(user.id)
+        pipe = self.client.pipeline()
+        for item in items:
+            pipe.hsetnx(key, str(item.product_id), self._encode(item))
+        self._mark_dirty(pipe, user.id)
+        pipe.execute()
+
+    def set_quantities(self, user, current, quantities):
+        by_product = {item.product_id: item for item in current}
+        now = timezone.now()
+        key = self._key(user.id)
+        pipe = self.client.pipeline()
+        for product, quantity in quantities.items():
+            item = by_product.get(product.id)
+            if quantity <= 0:
+                if item is not None:
+                    pipe.hdel(key, str(product.id))
+                continue
+            if item is None:
+                item = CartItem(id=uuid.uuid4(), user_id=user.id, product_id=product.id, created_at=now)
+            item.quantity = quantity
+            item.updated_at = now
+            pipe.hset(key, str(product.id), self._encode(item))
+        self._mark_dirty(pipe, user.id)
+        pipe.execute()
+
+    def flush(self, user_id):
+        """Write one cart back to the ``CartItem`` table."""
+        items = self._lines(user_id)
+        ids = [item.id for item in items]
+        existing_products = set(
+            Product.objects.filter(id__in=[item.product_id for item in items]).values_list('id', flat=True)
+        )
+        items = [item for item in items if item.product_id in existing_products]
+        with transaction.atomic():
+            CartItem.objects.filter(user_id=user_id).exclude(id__in=ids).delete()
+            CartItem.objects.bulk_create(
+                items,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=['quantity', 'updated_at'],
+            )
+
+    def flush_dirty(self, batch_size=500):
+        """Flush every cart marked dirty; returns how many were written."""
+        flushed = 0
+        failed = []
+        while True:
+            user_ids = self.client.spop(self.dirty_key, batch_size)
+            for user_id in user_ids or []:
+                try:
+                    self.flush(uuid.UUID(user_id))
+                    flushed += 1
+                except Exception:
+                    logger.exception('Failed to flush cart for user %s', user_id)
+                    failed.append(user_id)
+            if not user_ids or len(user_ids) < batch_size:
+                break
+        if failed:
+            # Retry on the next run
+            self.client.sadd(self.dirty_key, *failed)
+        return flushed
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_cart_store():
+    """Return the process-wide cart store configured in ``CART_STORE``."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                options = dict(getattr(settings, 'CART_STORE', {}))
+                backend = import_string(options.pop('BACKEND', 'apps.cart.storage.DatabaseCartStore'))
+                _store = backend(**{key.lower(): value for key, value in options.items()})
+    return _store
@@ -0,0 +1,16 @@
+"""
+Celery tasks for cart app.
+"""
+
+from celery import shared_task
+
+from .storage import get_cart_store
+
+
+@shared_task
+def flush_dirty_carts():
+    """Write carts changed in Redis back to the CartItem table."""
+    store = get_cart_store()
+    if not hasattr(store, 'flush_dirty'):
+        return 0
+    return store.flush_dirty()
@@ -0,0 +1,53 @@
+"""
+Tests for the batch cart endpoint.
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.cart.models import CartItem
+from apps.products.tests.factories import ProductFactory
+from apps.users.tests.factories import UserFactory
+
+
+class BatchUpdateCartTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.in_cart = ProductFactory()
+        self.other = ProductFactory()
+        CartItem.objects.create(user=self.user, product=self.in_cart, quantity=1)
+
+    def batch(self, *operations):
+        return self.client.post(reverse('batch_update_cart'), {'operations': list(operations)}, format='json')
+
+    def cart(self):
+        return dict(CartItem.objects.filter(user=self.user).values_list('product_id', 'quantity'))
+
+    def test_update_of_a_product_not_in_the_cart_is_an_error(self):
+        response = self.batch(
+            {'op': 'update', 'product_id': str(self.in_cart.id), 'quantity': 3},
+            {'op': 'update', 'product_id': str(self.other.id), 'quantity': 2},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'], {'1': 'Cart item not found'})
+        self.assertEqual(self.cart(), {self.in_cart.id: 1})
+
+    def test_update_after_add_in_the_same_batch(self):
+        response = self.batch(
+            {'op': 'add', 'product_id': str(self.other.id), 'quantity': 1},
+            {'op': 'update', 'product_id': str(self.other.id), 'quantity': 4},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.cart(), {self.in_cart.id: 1, self.other.id: 4})
+
+    def test_update_after_remove_in_the_same_batch_is_an_error(self):
+        response = self.batch(
+            {'op': 'remove', 'product_id': str(self.in_cart.id)},
+            {'op': 'update', 'product_id': str(self.in_cart.id), 'quantity': 2},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'], {'1': 'Cart item not found'})
@@ -2,8 +2,9 @@
 Admin configuration for orders app.
 """
 
-from django.contrib import admin
-from .models import Order, OrderItem
+from django.contrib import admin, messages
+from . import state_machine
+from .models import Order, OrderItem, Payment
 
 
 class OrderItemInline(admin.TabularInline):
@@ -13,12 +14,25 @@ class OrderItemInline(admin.TabularInline):
     fields = ['product', 'product_name', 'product_image', 'price', 'quantity', 'subtotal']
 
 
+class PaymentInline(admin.TabularInline):
+    model = Payment
+    extra = 0
+    readonly_fields = ['payment_no', 'method', 'amount', 'status', 'transaction_id', 'paid_at', 'created_at']
+    fields = readonly_fields
+    can_delete = False
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['order_no', 'user', 'total_amount', 'actual_amount', 'status', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['order_no', 'user__username', 'user__email']
-    readonly_fields = ['order_no', 'created_at', 'updated_at']
+    # Status only changes through the transition actions
+    readonly_fields = [
+        'order_no', 'status', 'paid_at', 'shipped_at', 'completed_at', 'cancelled_at',
+        'created_at', 'updated_at',
+    ]
+    actions = ['mark_shipped', 'mark_completed', 'cancel_orders']
     fieldsets = (
         ('Basic Info', {
             'fields': ('user', 'order_no', 'address')
@@ -33,7 +47,31 @@ class OrderAdmin(admin.ModelAdmin):
             'fields': ('paid_at', 'shipped_at', 'completed_at', 'cancelled_at', 'created_at', 'updated_at')
         }),
     )
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, PaymentInline]
+
+    def _bulk_transition(self, request, queryset, name, done):
+        # The selection is passed on as a subquery, so "select all" stays one UPDATE
+        requested = queryset.count()
+        moved = state_machine.bulk_transition(name, queryset)
+        self.message_user(request, f'{moved} orders {done}.')
+        if moved < requested:
+            self.message_user(
+                request,
+                f'{requested - moved} orders skipped: not in a status that allows this.',
+                level=messages.WARNING
+            )
+
+    @admin.action(description='Mark selected orders as shipped')
+    def mark_shipped(self, request, queryset):
+        self._bulk_transition(request, queryset, state_machine.SHIP, 'shipped')
+
+    @admin.action(description='Mark selected orders as completed')
+    def mark_completed(self, request, queryset):
+        self._bulk_transition(request, queryset, state_machine.COMPLETE, 'completed')
+
+    @admin.action(description='Cancel selected orders and release stock')
+    def cancel_orders(self, request, queryset):
+        self._bulk_transition(request, queryset, state_machine.CANCEL, 'cancelled')
 
 
 @admin.register(OrderItem)
@@ -42,3 +80,12 @@ class OrderItemAdmin(admin.ModelAdmin):
     list_filter = ['order__status']
     search_fields = ['order__order_no', 'product_name']
     readonly_fields = ['subtotal']
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = ['payment_no', 'order', 'method', 'amount', 'status', 'paid_at', 'created_at']
+    list_filter = ['status', 'method', 'created_at']
+    search_fields = ['payment_no', 'transaction_id', 'order__order_no']
+    readonly_fields = ['payment_no', 'created_at', 'updated_at']
+    raw_id_fields = ['order']
@@ -2,30 +2,45 @@
 Payment API views.
 """
 
+import json
+
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from django.utils import timezone
-import random
-import string
-from ..models import Order
+from ..idempotency import idempotent
+from ..notifications import (
+    SIGNATURE_HEADER,
+    InvalidNotification,
+    enqueue_notification,
+    parse_notification,
+    verify_signature,
+)
+from ..models import Order, Payment
+from ..services import pay_order
 
 
-def generate_payment_no():
-    """Generate a unique payment number."""
-    import time
-    timestamp = str(int(time.time()))
-    random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-    return f'PAY{timestamp}{random_str}'
+def payment_method(request):
+    method = request.data.get('payment_method', 'alipay')
+    if method not in dict(Payment.METHOD_CHOICES):
+        return None
+    return method
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent('create_payment')
 def create_payment(request, order_id):
     """
     Create a payment for an order.
     """
+    method = payment_method(request)
+    if method is None:
+        return Response(
+            {'error': '不支持的支付方式'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
     try:
         order = Order.objects.get(id=order_id, user=request.user)
     except Order.DoesNotExist:
@@ -40,25 +55,41 @@ def create_payment(request, order_id):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    payment_no = generate_payment_no()
+    payment = Payment.objects.create(
+        order=order,
+        method=method,
+        amount=order.actual_amount
+    )
 
     return Response({
-        'payment_no': payment_no,
+        'payment_no': payment.payment_no,
         'order_id': str(order.id),
         'order_no': order.order_no,
-        'amount': float(order.actual_amount),
-        'status': 'pending',
-        'created_at': timezone.now().isoformat(),
+        'method': payment.method,
+        'amount': float(payment.amount),
+        'status': payment.status,
+        'created_at': payment.created_at.isoformat(),
     })
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent('simulate_payment')
 def simulate_payment(request, order_id):
     """
     Simulate a payment for testing.
+
+    Pass the ``payment_no`` returned by ``create_payment`` to settle that
+    attempt; without one a new payment is recorded. Send an
+    ``Idempotency-Key`` header to make retries safe: a repeat returns the
+    first response instead of a "not payable" error.
     """
-    payment_method = request.data.get('payment_method', 'alipay')
+    method = payment_method(request)
+    if method is None:
+        return Response(
+            {'error': '不支持的支付方式'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
     try:
         order = Order.objects.get(id=order_id, user=request.user)
@@ -68,23 +99,21 @@ def simulate_payment(request, order_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
-    if order.status != 'pending':
+    payment = pay_order(order, method, payment_no=request.data.get('payment_no'))
+    if payment is None:
         return Response(
             {'error': '订单状态不允许支付'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    order.status = 'paid'
-    order.paid_at = timezone.now()
-    order.save()
-
     return Response({
         'success': True,
         'message': '支付成功',
         'order_id': str(order.id),
         'order_no': order.order_no,
-        'amount': float(order.actual_amount),
-        'paid_at': order.paid_at.isoformat(),
+        'payment_no': payment.payment_no,
+        'amount': float(payment.amount),
+        'paid_at': payment.paid_at.isoformat(),
     })
 
 
@@ -108,4 +137,39 @@ def payment_status(request, order_id):
         'status': order.status,
         'amount': float(order.actual_amount),
         'paid_at': order.paid_at.isoformat() if order.paid_at else None,
+        'payments': [
+            {
+                'payment_no': payment.payment_no,
+                'method': payment.method,
+                'amount': float(payment.amount),
+                'status': payment.status,
+                'paid_at': payment.paid_at.isoformat() if payment.paid_at else None,
+            }
+            for payment in order.payments.all()
+        ],
     })
+
+
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def payment_notify(request):
+    """
+    Payment gateway callback.
+
+    Verifies the signature and queues the event for the notification
+    workers; the order is updated asynchronously.
+    """
+    body = request.body
+    try:
+        verify_signature(body, request.META.get(SIGNATURE_HEADER))
+    except InvalidNotification as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        fields = parse_notification(json.loads(body))
+    except (ValueError, InvalidNotification) as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    enqueue_notification(fields)
+    return Response({'received': True})
@@ -4,6 +4,8 @@ Serializers for orders API.
 
 from rest_framework import serializers
 from ..models import Order, OrderItem
+from ..services import place_order, OrderPlacementError
+from ..state_machine import MAX_BULK_ORDERS
 from apps.users.api.serializers import AddressSerializer
 from apps.products.api.serializers import ProductListSerializer
 
@@ -48,6 +50,35 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
 
+class OrderListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight order serializer for listings.
+
+    Expects ``items`` to be prefetched; only item counts and thumbnails
+    are returned, use ``OrderSerializer`` for the full detail.
+    """
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    item_count = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
+
+    THUMBNAIL_LIMIT = 3
+
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'order_no', 'total_amount', 'discount_amount',
+            'shipping_fee', 'actual_amount', 'status', 'status_display',
+            'paid_at', 'created_at', 'item_count', 'thumbnails'
+        ]
+        read_only_fields = fields
+
+    def get_item_count(self, obj):
+        return sum(item.quantity for item in obj.items.all())
+
+    def get_thumbnails(self, obj):
+        return [item.product_image for item in obj.items.all()[:self.THUMBNAIL_LIMIT]]
+
+
 class CreateOrderSerializer(serializers.Serializer):
     """
     Create order serializer.
@@ -63,59 +94,42 @@ class CreateOrderSerializer(serializers.Serializer):
         from apps.users.models import Address
         try:
             address = Address.objects.get(id=value)
-            if address.user != self.context['request'].user:
+            if address.user_id != self.context['request'].user.id:
                 raise serializers.ValidationError("Invalid address")
             return value
         except Address.DoesNotExist:
             raise serializers.ValidationError("Address not found")
 
     def validate_cart_item_ids(self, value):
-        from apps.cart.models import CartItem
+        from apps.cart.storage import get_cart_store
         user = self.context['request'].user
-        cart_items = CartItem.objects.filter(
-            id__in=value,
-            user=user
-        )
-        if cart_items.count() != len(value):
+        cart_items = get_cart_store().items(user, value)
+        if len(cart_items) != len(value):
             raise serializers.ValidationError("Some cart items are invalid")
         return value
 
     def create(self, validated_data):
-        from apps.cart.models import CartItem
-        from decimal import Decimal
-
         user = self.context['request'].user
-        address_id = validated_data['address_id']
-        remarks = validated_data.get('remarks', '')
-        cart_item_ids = validated_data['cart_item_ids']
-
-        # Get cart items
-        cart_items = CartItem.objects.filter(id__in=cart_item_ids, user=user)
-
-        # Calculate total amount
-        total_amount = sum(item.subtotal for item in cart_items)
-
-        # Create order
-        order = Order.objects.create(
-            user=user,
-            address_id=address_id,
-            total_amount=total_amount,
-            actual_amount=total_amount,
-            remarks=remarks
-        )
-
-        # Create order items
-        for cart_item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                product_name=cart_item.product.name,
-                product_image=cart_item.product.main_image,
-                price=cart_item.product.price,
-                quantity=cart_item.quantity
+        try:
+            return place_order(
+                user,
+                validated_data['address_id'],
+                validated_data['cart_item_ids'],
+                remarks=validated_data.get('remarks', '')
             )
+        except OrderPlacementError as exc:
+            raise serializers.ValidationError({'cart_item_ids': [str(exc)]})
 
-        # Clear cart items
-        cart_items.delete()
 
-        return order
+class BulkOrderIdsSerializer(serializers.Serializer):
+    """
+    Order ids for a bulk transition.
+    """
+    order_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=MAX_BULK_ORDERS
+    )
+
+    def validate_order_ids(self, value):
+        return list(dict.fromkeys(value))
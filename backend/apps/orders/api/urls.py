@@ -7,16 +7,19 @@ from .views import (
     OrderListView,
     OrderDetailView,
     CreateOrderView,
+    bulk_ship_orders,
     cancel_order
 )
-from .payment_views import create_payment, simulate_payment, payment_status
+from .payment_views import create_payment, simulate_payment, payment_status, payment_notify
 
 urlpatterns = [
     path('orders/', OrderListView.as_view(), name='order_list'),
     path('orders/create/', CreateOrderView.as_view(), name='create_order'),
+    path('orders/bulk-ship/', bulk_ship_orders, name='bulk_ship_orders'),
     path('orders/<uuid:id>/', OrderDetailView.as_view(), name='order_detail'),
     path('orders/<uuid:id>/cancel/', cancel_order, name='cancel_order'),
     path('orders/<uuid:order_id>/payment/', create_payment, name='create_payment'),
     path('orders/<uuid:order_id>/pay/', simulate_payment, name='simulate_payment'),
     path('orders/<uuid:order_id>/payment/status/', payment_status, name='payment_status'),
+    path('payments/notify/', payment_notify, name='payment_notify'),
 ]
@@ -4,22 +4,34 @@ API views for orders.
 
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from ..models import Order
-from .serializers import OrderSerializer, CreateOrderSerializer
+from django.db.models import Prefetch
+from ..models import Order, OrderItem
+from .. import services, state_machine
+from .serializers import (
+    BulkOrderIdsSerializer,
+    CreateOrderSerializer,
+    OrderListSerializer,
+    OrderSerializer,
+)
 
 
 class OrderListView(generics.ListAPIView):
     """
-    List current user's orders.
+    List current user's orders (paginated, summary only).
     """
-    serializer_class = OrderSerializer
+    serializer_class = OrderListSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = None
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        # Ordered so the thumbnails taken from the first items are stable
+        items = OrderItem.objects.only('id', 'order_id', 'product_image', 'quantity').order_by('id')
+        return (
+            Order.objects
+            .filter(user=self.request.user)
+            .prefetch_related(Prefetch('items', queryset=items))
+        )
 
 
 class OrderDetailView(generics.RetrieveAPIView):
@@ -31,7 +43,12 @@ class OrderDetailView(generics.RetrieveAPIView):
     lookup_field = 'id'
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return (
+            Order.objects
+            .filter(user=self.request.user)
+            .select_related('address')
+            .prefetch_related('items__product__category')
+        )
 
 
 class CreateOrderView(generics.CreateAPIView):
@@ -45,6 +62,13 @@ class CreateOrderView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         order = serializer.save()
+        # Reload with relations so rendering stays constant in queries
+        order = (
+            Order.objects
+            .select_related('address')
+            .prefetch_related('items__product__category')
+            .get(pk=order.pk)
+        )
         return Response(
             OrderSerializer(order).data,
             status=status.HTTP_201_CREATED
@@ -57,8 +81,6 @@ def cancel_order(request, id):
     """
     Cancel an order (only pending orders).
     """
-    from django.utils import timezone
-
     try:
         order = Order.objects.get(id=id, user=request.user)
     except Order.DoesNotExist:
@@ -67,16 +89,31 @@ def cancel_order(request, id):
             status=status.HTTP_404_NOT_FOUND
         )
 
-    if order.status != 'pending':
+    # Conditional update so stock is released at most once
+    if not services.cancel_order(order):
         return Response(
             {'error': 'Only pending orders can be cancelled'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    order.status = 'cancelled'
-    order.cancelled_at = timezone.now()
-    order.save()
+    return Response(OrderSerializer(order).data)
 
-    # Restore product stock (optional - if you want to implement stock management)
 
-    return Response(OrderSerializer(order).data)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_ship_orders(request):
+    """
+    Mark up to ``MAX_BULK_ORDERS`` paid orders as shipped in one UPDATE.
+
+    Orders that are not paid are skipped.
+    """
+    serializer = BulkOrderIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    order_ids = serializer.validated_data['order_ids']
+
+    shipped = state_machine.bulk_transition(state_machine.SHIP, order_ids)
+    return Response({
+        'requested': len(order_ids),
+        'shipped': shipped,
+        'skipped': len(order_ids) - shipped,
+    })
@@ -0,0 +1,218 @@
+"""
+Idempotency keys for unsafe API calls.
+
+A client sends an ``Idempotency-Key`` header with a POST; the first
+request with a given key runs the view and its response is stored, and
+any repeat of the same key replays that response without running the
+view again. Stored responses live in the cache (Redis) for fast replay,
+backed by the ``IdempotencyKey`` table, whose unique constraint is also
+what serializes concurrent first attempts: only the request that inserts
+the row runs the view, the others get 409 until it finishes. A claim still in flight
+after ``CLAIM_TIMEOUT`` seconds is taken to belong to a killed process
+and is handed to the next request with that key.
+
+Requests without the header are processed as before. Keys are kept for
+``CACHE_TIMEOUT``; ``purge_expired_keys`` (run by Celery beat) deletes
+older rows.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+CACHE_KEY_PREFIX = 'idem:'
+MAX_KEY_LENGTH = 255
+
+DEFAULT_SETTINGS = {
+    'CACHE_TIMEOUT': 60 * 60 * 24,
+    'CLAIM_TIMEOUT': 60,
+    'PURGE_BATCH_SIZE': 1000,
+}
+
+
+def get_idempotency_settings():
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'IDEMPOTENCY', {}))
+    return options
+
+
+def _cache_key(scope, user_id, key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'{CACHE_KEY_PREFIX}{scope}:{user_id}:{digest}'
+
+
+def _request_hash(request, kwargs):
+    payload = json.dumps(
+        {'path': request.path, 'kwargs': kwargs, 'data': request.data},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_get(cache_key):
+    try:
+        return cache.get(cache_key)
+    except Exception:
+        logger.warning('Idempotency cache read failed', exc_info=True)
+        return None
+
+
+def _cache_set(cache_key, record):
+    try:
+        cache.set(cache_key, record, get_idempotency_settings()['CACHE_TIMEOUT'])
+    except Exception:
+        logger.warning('Idempotency cache write failed', exc_info=True)
+
+
+def _replay(record, request_hash):
+    if record['request_hash'] != request_hash:
+        return Response(
+            {'error': '幂等键已用于不同的请求'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if record['status_code'] is None:
+        return Response(
+            {'error': '相同请求正在处理中'},
+            status=status.HTTP_409_CONFLICT
+        )
+    response = Response(record['response'], status=record['status_code'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _record(entry):
+    return {
+        'request_hash': entry.request_hash,
+        'status_code': entry.status_code,
+        'response': entry.response,
+    }
+
+
+def _reclaim(entry, request_hash, now):
+    """
+    Take over ``entry`` if its claim is older than ``CLAIM_TIMEOUT``.
+    Only one of several concurrent retries wins.
+    """
+    cutoff = now - timedelta(seconds=get_idempotency_settings()['CLAIM_TIMEOUT'])
+    if entry.claimed_at >= cutoff:
+        return False
+    taken = IdempotencyKey.objects.filter(
+        id=entry.id, status_code__isnull=True, claimed_at=entry.claimed_at
+    ).update(claimed_at=now, request_hash=request_hash)
+    if taken:
+        entry.claimed_at = now
+        entry.request_hash = request_hash
+    return bool(taken)
+
+
+def purge_expired_keys(batch_size=None):
+    """
+    Delete keys older than ``CACHE_TIMEOUT`` in batches of
+    ``PURGE_BATCH_SIZE`` rows. Returns the number of keys deleted.
+    """
+    options = get_idempotency_settings()
+    batch_size = batch_size or options['PURGE_BATCH_SIZE']
+    cutoff = timezone.now() - timedelta(seconds=options['CACHE_TIMEOUT'])
+    total = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects
+            .filter(created_at__lt=cutoff)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        deleted, _ = IdempotencyKey.objects.filter(id__in=ids).delete()
+        total += deleted
+
+
+def idempotent(scope):
+    """
+    Make a function-based API view honour ``Idempotency-Key``.
+
+    Responses below 500 are stored and replayed; server errors and
+    exceptions release the key so the client can retry with it. Both
+    only touch the row while this request still holds the claim.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = request.META.get(HEADER, '').strip()
+            if not key or not request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {'error': '幂等键过长'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            user_id = request.user.pk
+            request_hash = _request_hash(request, kwargs)
+            cache_key = _cache_key(scope, user_id, key)
+
+            record = _cache_get(cache_key)
+            if record is not None:
+                return _replay(record, request_hash)
+
+            now = timezone.now()
+            try:
+                with transaction.atomic():
+                    entry = IdempotencyKey.objects.create(
+                        user_id=user_id,
+                        scope=scope,
+                        key=key,
+                        request_hash=request_hash,
+                        claimed_at=now,
+                    )
+            except IntegrityError:
+                # Claimed before: finished (replay) or still in flight
+                entry = IdempotencyKey.objects.filter(user_id=user_id, scope=scope, key=key).first()
+                if entry is None:
+                    # Released by a failed attempt in the meantime
+                    return Response(
+                        {'error': '相同请求正在处理中'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                if entry.status_code is not None:
+                    _cache_set(cache_key, _record(entry))
+                    return _replay(_record(entry), request_hash)
+                if not _reclaim(entry, request_hash, now):
+                    return _replay(_record(entry), request_hash)
+
+            claim = IdempotencyKey.objects.filter(id=entry.id, claimed_at=entry.claimed_at)
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception:
+                claim.delete()
+                raise
+
+            if response.status_code >= 500:
+                claim.delete()
+                return response
+
+            entry.status_code = response.status_code
+            entry.response = response.data
+            if claim.update(status_code=entry.status_code, response=entry.response):
+                _cache_set(cache_key, _record(entry))
+            else:
+                logger.warning('Idempotency key %s/%s was reclaimed while in flight', scope, entry.id)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,62 @@
+"""
+Cancel unpaid pending orders, once or continuously.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.orders import services
+from apps.orders.tasks import get_expiry_settings
+
+
+class Command(BaseCommand):
+    help = 'Cancel pending orders older than the payment timeout and release their stock'
+
+    def add_arguments(self, parser):
+        defaults = get_expiry_settings()
+        parser.add_argument(
+            '--timeout-minutes',
+            type=int,
+            default=defaults['TIMEOUT_MINUTES'],
+            help='Cancel pending orders older than this',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=defaults['BATCH_SIZE'],
+            help='Orders claimed per transaction',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, sweeping every --interval seconds',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30.0,
+            help='Seconds to sleep between sweeps with --loop',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size must be positive')
+
+        while True:
+            expired = self.sweep(options['timeout_minutes'], options['batch_size'])
+            if expired:
+                self.stdout.write(f'{timezone.now():%Y-%m-%d %H:%M:%S} cancelled {expired} orders')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def sweep(self, timeout_minutes, batch_size):
+        cutoff = timezone.now() - timedelta(minutes=timeout_minutes)
+        total = 0
+        while True:
+            expired = services.expire_pending_orders(cutoff, batch_size)
+            total += expired
+            if expired < batch_size:
+                return total
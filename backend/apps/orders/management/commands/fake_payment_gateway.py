@@ -0,0 +1,182 @@
+"""
+Stand-in payment gateway: create pending payments and fire signed
+callbacks for them at a fixed rate, then wait for the notification
+workers to settle them.
+"""
+
+import json
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from core.id_generator import next_id
+from apps.orders.models import Order, Payment
+from apps.orders.notifications import get_notification_settings, sign
+from apps.users.models import Address
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Fire signed payment callbacks at a configurable rate and measure end-to-end settlement'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/v1/payments/notify/',
+                            help='Callback endpoint')
+        parser.add_argument('--payments', type=int, default=1000, help='Pending payments to create')
+        parser.add_argument('--rate', type=float, default=200.0,
+                            help='Callbacks per second (0 = as fast as possible)')
+        parser.add_argument('--concurrency', type=int, default=32, help='Parallel HTTP senders')
+        parser.add_argument('--duplicate-ratio', type=float, default=0.1,
+                            help='Share of callbacks delivered twice, like gateway retries')
+        parser.add_argument('--failure-ratio', type=float, default=0.05,
+                            help='Share of payments reported as failed')
+        parser.add_argument('--wait', type=float, default=60.0,
+                            help='Seconds from the first callback until every payment must be settled')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated orders and payments')
+
+    def handle(self, *args, **options):
+        secret = get_notification_settings()['SECRET']
+        if not secret:
+            raise CommandError('PAYMENT_NOTIFICATIONS["SECRET"] is not set')
+        if options['payments'] <= 0 or options['concurrency'] <= 0:
+            raise CommandError('--payments and --concurrency must be positive')
+
+        user, payments = self.create_payments(options['payments'])
+        try:
+            events = self.build_events(payments, options['duplicate_ratio'], options['failure_ratio'])
+            expected_paid = len({event['payment_no'] for event in events if event['status'] == 'succeeded'})
+
+            start = time.monotonic()
+            results = self.send(events, options['url'], secret, options['rate'], options['concurrency'])
+            sent_in = time.monotonic() - start
+            self.report_delivery(results, sent_in)
+
+            settled_in = self.wait_settled(payments, start, options['wait'])
+            paid = Order.objects.filter(user=user, status='paid').count()
+            succeeded = Payment.objects.filter(order__user=user, status='succeeded').count()
+            self.stdout.write(f'orders_paid={paid} payments_succeeded={succeeded} expected={expected_paid}')
+            if settled_in is None:
+                raise CommandError(f'Payments still pending after {options["wait"]:.0f}s')
+            if paid != expected_paid or succeeded != expected_paid:
+                raise CommandError('Settled state does not match the callbacks sent')
+            self.stdout.write(self.style.SUCCESS(
+                f'Settled {len(payments)} payments in {settled_in:.2f}s '
+                f'({len(payments) / settled_in:.0f}/s end to end)'
+            ))
+        finally:
+            if not options['keep']:
+                Order.objects.filter(user=user).delete()
+                user.delete()
+
+    def create_payments(self, count):
+        run_id = uuid.uuid4().hex[:8]
+        user = User.objects.create(username=f'gateway-{run_id}', password='!')
+        address = Address.objects.create(
+            user=user,
+            receiver_name='gateway',
+            receiver_phone='13800000000',
+            province='北京市',
+            city='北京市',
+            district='朝阳区',
+            detail='gateway',
+        )
+        orders = Order.objects.bulk_create([
+            Order(
+                user=user,
+                address=address,
+                order_no=f'ORD{next_id()}',
+                total_amount=amount,
+                actual_amount=amount,
+            )
+            for amount in (Decimal(random.randint(100, 100000)) / 100 for _ in range(count))
+        ], batch_size=1000)
+        payments = Payment.objects.bulk_create([
+            Payment(
+                order=order,
+                payment_no=f'PAY{next_id()}',
+                method=random.choice(Payment.METHOD_CHOICES)[0],
+                amount=order.actual_amount,
+            )
+            for order in orders
+        ], batch_size=1000)
+        self.stdout.write(f'Created {len(payments)} pending payments for {user.username}')
+        return user, payments
+
+    def build_events(self, payments, duplicate_ratio, failure_ratio):
+        events = [
+            {
+                'payment_no': payment.payment_no,
+                'status': 'failed' if random.random() < failure_ratio else 'succeeded',
+                'amount': str(payment.amount),
+                'transaction_id': f'TXN{uuid.uuid4().hex[:20].upper()}',
+            }
+            for payment in payments
+        ]
+        # A retry arrives some time after the original
+        retries = [
+            (random.randint(index + 1, len(events)), event)
+            for index, event in enumerate(events)
+            if random.random() < duplicate_ratio
+        ]
+        for position, event in sorted(retries, key=lambda retry: retry[0], reverse=True):
+            events.insert(position, event)
+        return events
+
+    def send(self, events, url, secret, rate, concurrency):
+        def deliver(event):
+            body = json.dumps(event).encode()
+            request = urllib.request.Request(url, data=body, method='POST', headers={
+                'Content-Type': 'application/json',
+                'X-Payment-Signature': sign(body, secret),
+            })
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    code = response.status
+            except urllib.error.HTTPError as exc:
+                code = exc.code
+            except OSError as exc:
+                code = exc.__class__.__name__
+            return code, (time.perf_counter() - start) * 1000
+
+        interval = 1 / rate if rate > 0 else 0
+        start = time.monotonic()
+        futures = []
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for index, event in enumerate(events):
+                delay = start + index * interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(pool.submit(deliver, event))
+        return [future.result() for future in futures]
+
+    def report_delivery(self, results, elapsed):
+        latencies = sorted(latency for _, latency in results)
+        failures = [code for code, _ in results if code != 200]
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f'sent={len(results)} in {elapsed:.2f}s ({len(results) / elapsed:.0f}/s) '
+            f'non_2xx={len(failures)} ack p50={statistics.median(latencies):.1f}ms '
+            f'p95={p95:.1f}ms max={latencies[-1]:.1f}ms'
+        )
+        if failures:
+            self.stdout.write(self.style.WARNING(f'First failures: {failures[:5]}'))
+
+    def wait_settled(self, payments, start, timeout):
+        ids = [payment.id for payment in payments]
+        while True:
+            pending = Payment.objects.filter(id__in=ids, status='pending').count()
+            elapsed = time.monotonic() - start
+            if not pending:
+                return elapsed
+            if elapsed > timeout:
+                return None
+            time.sleep(0.2)
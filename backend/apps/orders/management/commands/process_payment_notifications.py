@@ -0,0 +1,74 @@
+"""
+Run a pool of payment notification consumers.
+"""
+
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from apps.orders import notifications
+
+
+class Command(BaseCommand):
+    help = 'Apply queued payment gateway notifications with a pool of stream consumers'
+
+    def add_arguments(self, parser):
+        defaults = notifications.get_notification_settings()
+        parser.add_argument('--workers', type=int, default=4, help='Consumer threads')
+        parser.add_argument('--batch-size', type=int, default=defaults['BATCH_SIZE'],
+                            help='Entries read per batch')
+        parser.add_argument('--drain', action='store_true',
+                            help='Exit once the stream has no new entries instead of running forever')
+
+    def handle(self, *args, **options):
+        if options['workers'] <= 0 or options['batch_size'] <= 0:
+            raise CommandError('--workers and --batch-size must be positive')
+
+        stream_options = notifications.get_notification_settings()
+        stream_options['BATCH_SIZE'] = options['batch_size']
+        notifications.ensure_group(stream_options)
+
+        stop = threading.Event()
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+        prefix = f'{socket.gethostname()}-{os.getpid()}'
+        applied = [0] * options['workers']
+
+        def run(index):
+            consumer = f'{prefix}-{index}'
+            try:
+                while not stop.is_set():
+                    count = notifications.consume(consumer, stream_options, block=not options['drain'])
+                    applied[index] += count
+                    if options['drain'] and not count:
+                        break
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(index,), daemon=True) for index in range(options['workers'])]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+
+        last_total = 0
+        while True:
+            alive = [thread for thread in threads if thread.is_alive()]
+            if not alive:
+                break
+            alive[0].join(timeout=5)
+            total = sum(applied)
+            if total != last_total:
+                elapsed = time.monotonic() - start
+                self.stdout.write(f'applied={total} ({total / elapsed:.0f}/s)')
+                last_total = total
+
+        elapsed = time.monotonic() - start
+        total = sum(applied)
+        self.stdout.write(self.style.SUCCESS(
+            f'Applied {total} notifications in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f}/s)'
+        ))
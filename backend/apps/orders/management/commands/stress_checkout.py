@@ -0,0 +1,99 @@
+"""
+Fire many parallel checkouts against a single product and verify that
+stock is never oversold.
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from apps.cart.models import CartItem
+from apps.orders.models import Order
+from apps.orders.services import place_order, OrderPlacementError
+from apps.products.models import Category, Product
+from apps.users.models import Address
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Run concurrent checkouts against one product and check the stock invariant'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=200, help='Number of parallel buyers')
+        parser.add_argument('--stock', type=int, default=50, help='Initial stock of the product')
+        parser.add_argument('--workers', type=int, default=32, help='Thread pool size')
+
+    def handle(self, *args, **options):
+        buyers = options['buyers']
+        stock = options['stock']
+        run_id = uuid.uuid4().hex[:8]
+
+        category = Category.objects.create(name=f'stress-{run_id}')
+        product = Product.objects.create(
+            name=f'stress-{run_id}',
+            description='stress test product',
+            price=Decimal('9.90'),
+            stock=stock,
+            category=category,
+            main_image='https://placehold.co/800x800',
+        )
+
+        users = User.objects.bulk_create([
+            User(username=f'stress-{run_id}-{i}', password='!') for i in range(buyers)
+        ])
+        addresses = Address.objects.bulk_create([
+            Address(
+                user=user,
+                receiver_name='stress',
+                receiver_phone='13800000000',
+                province='北京市',
+                city='北京市',
+                district='朝阳区',
+                detail='stress',
+            )
+            for user in users
+        ])
+        cart_items = CartItem.objects.bulk_create([
+            CartItem(user=user, product=product, quantity=1) for user in users
+        ])
+
+        def checkout(args):
+            user, address, cart_item = args
+            try:
+                place_order(user, address.id, [cart_item.id])
+                return 'ok'
+            except OrderPlacementError:
+                return 'rejected'
+            except Exception as exc:
+                return f'error: {exc.__class__.__name__}'
+            finally:
+                connection.close()
+
+        try:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                results = list(pool.map(checkout, zip(users, addresses, cart_items)))
+
+            product.refresh_from_db()
+            placed = results.count('ok')
+            rejected = results.count('rejected')
+            errors = len(results) - placed - rejected
+            orders = Order.objects.filter(items__product=product).count()
+
+            self.stdout.write(
+                f'buyers={buyers} stock={stock} placed={placed} rejected={rejected} '
+                f'errors={errors} orders={orders} remaining_stock={product.stock}'
+            )
+            if product.stock < 0 or placed != orders or stock - placed != product.stock:
+                raise CommandError('Stock invariant violated')
+            if placed > stock:
+                raise CommandError('Oversold')
+            self.stdout.write(self.style.SUCCESS('No overselling detected'))
+        finally:
+            Order.objects.filter(user__in=users).delete()
+            User.objects.filter(id__in=[user.id for user in users]).delete()
+            product.delete()
+            category.delete()
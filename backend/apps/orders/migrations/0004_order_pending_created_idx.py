@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_user_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(
+                condition=models.Q(status='pending'),
+                fields=['created_at'],
+                name='orders_pending_created_idx',
+            ),
+        ),
+    ]
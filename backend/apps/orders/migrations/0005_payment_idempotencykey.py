@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0004_order_pending_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('payment_no', models.CharField(max_length=50, unique=True, verbose_name='支付单号')),
+                ('method', models.CharField(choices=[('alipay', '支付宝'), ('wechat', '微信支付')], default='alipay', max_length=20, verbose_name='支付方式')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='支付金额')),
+                ('status', models.CharField(choices=[('pending', '待支付'), ('succeeded', '支付成功'), ('failed', '支付失败')], default='pending', max_length=20, verbose_name='支付状态')),
+                ('transaction_id', models.CharField(blank=True, max_length=100, null=True, verbose_name='渠道交易号')),
+                ('paid_at', models.DateTimeField(blank=True, null=True, verbose_name='支付时间')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='orders.order', verbose_name='订单')),
+            ],
+            options={
+                'verbose_name': '支付记录',
+                'verbose_name_plural': '支付记录',
+                'db_table': 'payments',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('scope', models.CharField(max_length=50, verbose_name='接口')),
+                ('key', models.CharField(max_length=255, verbose_name='幂等键')),
+                ('request_hash', models.CharField(max_length=64, verbose_name='请求摘要')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='响应状态码')),
+                ('response', models.JSONField(blank=True, null=True, verbose_name='响应内容')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_keys', to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+            ],
+            options={
+                'verbose_name': '幂等键',
+                'verbose_name_plural': '幂等键',
+                'db_table': 'idempotency_keys',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(condition=models.Q(status='succeeded'), fields=('order',), name='payments_one_succeeded_per_order'),
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('user', 'scope', 'key'), name='idempotency_keys_user_scope_key_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='idempotencykey',
+            index=models.Index(fields=['created_at'], name='idempotency_keys_created_idx'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_paid_at_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(choices=[('pending', '待支付'), ('succeeded', '支付成功'), ('failed', '支付失败'), ('refund_pending', '待退款')], default='pending', max_length=20, verbose_name='支付状态'),
+        ),
+    ]
@@ -3,9 +3,11 @@ Order models.
 """
 
 from django.db import models
+from django.utils import timezone
 import uuid
 from apps.users.models import User, Address
 from apps.products.models import Product
+from core.id_generator import next_id
 
 
 class Order(models.Model):
@@ -71,6 +73,16 @@ class Order(models.Model):
             models.Index(fields=['order_no']),
             models.Index(fields=['-created_at']),
             models.Index(fields=['status']),
+            # Per-user listing in keyset order
+            models.Index(fields=['user', '-created_at', '-id'], name='orders_user_created_id_idx'),
+            # Expiry sweeper: only pending orders, oldest first
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='pending'),
+                name='orders_pending_created_idx',
+            ),
+            # Sales rollups read paid orders by payment time
+            models.Index(fields=['paid_at'], name='orders_paid_at_idx'),
         ]
 
     def __str__(self):
@@ -79,11 +91,7 @@ class Order(models.Model):
     def save(self, *args, **kwargs):
         # Generate order number if not exists
         if not self.order_no:
-            import random
-            import time
-            timestamp = str(int(time.time()))[-6:]
-            random_str = str(random.randint(100, 999))
-            self.order_no = f'ORD{timestamp}{random_str}'
+            self.order_no = f'ORD{next_id()}'
         super().save(*args, **kwargs)
 
 
@@ -122,3 +130,105 @@ class OrderItem(models.Model):
         # Calculate subtotal
         self.subtotal = self.price * self.quantity
         super().save(*args, **kwargs)
+
+
+class Payment(models.Model):
+    """
+    Payment attempt for an order.
+    """
+    METHOD_CHOICES = [
+        ('alipay', '支付宝'),
+        ('wechat', '微信支付'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', '待支付'),
+        ('succeeded', '支付成功'),
+        ('failed', '支付失败'),
+        # Money taken but the order was already paid or closed
+        ('refund_pending', '待退款'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='payments',
+        verbose_name='订单'
+    )
+    payment_no = models.CharField(max_length=50, unique=True, verbose_name='支付单号')
+    method = models.CharField(
+        max_length=20,
+        choices=METHOD_CHOICES,
+        default='alipay',
+        verbose_name='支付方式'
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='支付金额')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='支付状态'
+    )
+    transaction_id = models.CharField(max_length=100, blank=True, null=True, verbose_name='渠道交易号')
+    paid_at = models.DateTimeField(null=True, blank=True, verbose_name='支付时间')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        db_table = 'payments'
+        verbose_name = '支付记录'
+        verbose_name_plural = '支付记录'
+        ordering = ['-created_at']
+        constraints = [
+            # An order is paid at most once, however many attempts it has
+            models.UniqueConstraint(
+                fields=['order'],
+                condition=models.Q(status='succeeded'),
+                name='payments_one_succeeded_per_order',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.payment_no} - {self.get_status_display()}'
+
+    def save(self, *args, **kwargs):
+        if not self.payment_no:
+            self.payment_no = f'PAY{next_id()}'
+        super().save(*args, **kwargs)
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored response for a client-supplied ``Idempotency-Key``.
+
+    ``status_code`` stays empty while the first request is in flight;
+    ``claimed_at`` is when that request took the key.
+    """
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys',
+        verbose_name='用户'
+    )
+    scope = models.CharField(max_length=50, verbose_name='接口')
+    key = models.CharField(max_length=255, verbose_name='幂等键')
+    request_hash = models.CharField(max_length=64, verbose_name='请求摘要')
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name='响应状态码')
+    response = models.JSONField(null=True, blank=True, verbose_name='响应内容')
+    claimed_at = models.DateTimeField(default=timezone.now, verbose_name='占用时间')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        verbose_name = '幂等键'
+        verbose_name_plural = '幂等键'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'scope', 'key'], name='idempotency_keys_user_scope_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_keys_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope}:{self.key}'
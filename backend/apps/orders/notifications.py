@@ -0,0 +1,243 @@
+"""
+Asynchronous payment notifications (gateway callbacks).
+
+The callback endpoint only verifies the gateway signature and appends
+the event to a Redis stream, so the gateway gets its acknowledgement in
+one round trip. Consumers in the ``PAYMENT_NOTIFICATIONS['GROUP']``
+consumer group read the stream in batches and apply them with
+``services.apply_payment_notifications``; an entry is acknowledged only
+after its batch committed, and entries left pending by a crashed
+consumer are reclaimed after ``CLAIM_IDLE_MS``. An entry that still
+fails after ``MAX_DELIVERIES`` deliveries (per ``XPENDING``) is moved
+to ``DEAD_LETTER_STREAM`` and acknowledged, so one poison message can't
+be retried forever.
+
+Consumers run in the ``process_payment_notifications`` Celery task
+(scheduled in ``CELERY_BEAT_SCHEDULE``) or, for a dedicated worker
+pool, the management command of the same name.
+
+Callbacks are signed like ``X-Payment-Signature: t=<unix time>,v1=<hex>``
+where ``v1`` is HMAC-SHA256 of ``"<t>.<raw body>"`` with the shared
+``SECRET``.
+"""
+
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+
+from . import services
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'HTTP_X_PAYMENT_SIGNATURE'
+NOTIFICATION_STATUSES = ('succeeded', 'failed')
+
+DEFAULT_SETTINGS = {
+    'SECRET': '',
+    'SIGNATURE_TOLERANCE': 300,
+    'STREAM': 'payments:notifications',
+    'GROUP': 'payment-workers',
+    'STREAM_MAXLEN': 100000,
+    'BATCH_SIZE': 200,
+    'BLOCK_MS': 1000,
+    'CLAIM_IDLE_MS': 60000,
+    'MAX_BATCHES': 50,
+    'MAX_DELIVERIES': 5,
+    'DEAD_LETTER_STREAM': 'payments:notifications:dead',
+}
+
+
+def get_notification_settings():
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'PAYMENT_NOTIFICATIONS', {}))
+    return options
+
+
+class InvalidNotification(Exception):
+    """Raised for a callback with a bad signature or payload."""
+
+
+def sign(body, secret, timestamp=None):
+    """Signature header value for a raw callback ``body`` (bytes)."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+def verify_signature(body, header, options=None):
+    """Raise ``InvalidNotification`` unless ``header`` signs ``body``."""
+    options = options or get_notification_settings()
+    if not options['SECRET']:
+        raise InvalidNotification('Payment notifications are not configured')
+
+    parts = dict(part.split('=', 1) for part in (header or '').split(',') if '=' in part)
+    try:
+        timestamp = int(parts['t'])
+        signature = parts['v1']
+    except (KeyError, ValueError):
+        raise InvalidNotification('Malformed signature')
+
+    if abs(time.time() - timestamp) > options['SIGNATURE_TOLERANCE']:
+        raise InvalidNotification('Signature expired')
+    expected = sign(body, options['SECRET'], timestamp).split('v1=', 1)[1]
+    if not hmac.compare_digest(expected, signature):
+        raise InvalidNotification('Signature mismatch')
+
+
+def parse_notification(data):
+    """Validate a decoded callback payload into stream fields."""
+    if not isinstance(data, dict):
+        raise InvalidNotification('Payload must be an object')
+    payment_no = str(data.get('payment_no') or '')
+    status = data.get('status')
+    if not payment_no or status not in NOTIFICATION_STATUSES:
+        raise InvalidNotification('payment_no and status are required')
+    try:
+        amount = Decimal(str(data.get('amount')))
+    except InvalidOperation:
+        raise InvalidNotification('Invalid amount')
+    return {
+        'payment_no': payment_no,
+        'status': status,
+        'amount': str(amount),
+        'transaction_id': str(data.get('transaction_id') or ''),
+    }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import redis
+
+                _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+def enqueue_notification(fields, options=None):
+    """Append a parsed notification to the stream; returns the entry id."""
+    options = options or get_notification_settings()
+    return _get_client().xadd(
+        options['STREAM'], fields, maxlen=options['STREAM_MAXLEN'], approximate=True
+    )
+
+
+def ensure_group(options=None):
+    import redis
+
+    options = options or get_notification_settings()
+    try:
+        _get_client().xgroup_create(options['STREAM'], options['GROUP'], id='0', mkstream=True)
+    except redis.ResponseError as exc:
+        if 'BUSYGROUP' not in str(exc):
+            raise
+
+
+def _decode(fields):
+    return {
+        'payment_no': fields['payment_no'],
+        'status': fields['status'],
+        'amount': Decimal(fields['amount']),
+        'transaction_id': fields.get('transaction_id') or None,
+    }
+
+
+def _delivery_counts(client, entry_ids, options):
+    """How many times each pending entry has been delivered to the group."""
+    counts = {}
+    for entry_id in entry_ids:
+        pending = client.xpending_range(options['STREAM'], options['GROUP'], min=entry_id, max=entry_id, count=1)
+        counts[entry_id] = pending[0]['times_delivered'] if pending else 0
+    return counts
+
+
+def _dead_letter(client, entries, options):
+    """Copy entries to the dead-letter stream and ack them in one MULTI."""
+    pipe = client.pipeline()
+    for entry_id, fields in entries:
+        pipe.xadd(options['DEAD_LETTER_STREAM'], {**fields, 'source_id': entry_id})
+    pipe.xack(options['STREAM'], options['GROUP'], *[entry_id for entry_id, _ in entries])
+    pipe.execute()
+
+
+def _apply(entries, options):
+    """Apply and acknowledge stream entries; returns how many were acked."""
+    client = _get_client()
+    failed = []
+    try:
+        services.apply_payment_notifications([_decode(fields) for _, fields in entries])
+        acked = [entry_id for entry_id, _ in entries]
+    except Exception:
+        # Isolate the bad entries; they stay pending and get reclaimed
+        logger.exception('Payment notification batch failed, retrying one by one')
+        acked = []
+        for entry_id, fields in entries:
+            try:
+                services.apply_payment_notifications([_decode(fields)])
+                acked.append(entry_id)
+            except Exception:
+                logger.exception('Payment notification %s failed', entry_id)
+                failed.append((entry_id, fields))
+    if acked:
+        client.xack(options['STREAM'], options['GROUP'], *acked)
+
+    if failed:
+        counts = _delivery_counts(client, [entry_id for entry_id, _ in failed], options)
+        dead = [(entry_id, fields) for entry_id, fields in failed if counts[entry_id] >= options['MAX_DELIVERIES']]
+        if dead:
+            logger.error(
+                'Moving payment notifications %s to %s after %d deliveries',
+                [entry_id for entry_id, _ in dead], options['DEAD_LETTER_STREAM'], options['MAX_DELIVERIES']
+            )
+            _dead_letter(client, dead, options)
+    return len(acked)
+
+
+def consume(consumer, options=None, block=True):
+    """
+    Read one batch as ``consumer`` and apply it: reclaimed stale entries
+    first, then new ones. Returns the number of entries applied.
+    """
+    options = options or get_notification_settings()
+    client = _get_client()
+
+    _, entries, *_ = client.xautoclaim(
+        options['STREAM'], options['GROUP'], consumer,
+        min_idle_time=options['CLAIM_IDLE_MS'], start_id='0-0', count=options['BATCH_SIZE'],
+    )
+    if not entries:
+        response = client.xreadgroup(
+            options['GROUP'], consumer, {options['STREAM']: '>'},
+            count=options['BATCH_SIZE'], block=options['BLOCK_MS'] if block else None,
+        )
+        entries = response[0][1] if response else []
+    if not entries:
+        return 0
+    return _apply(entries, options)
+
+
+def stream_backlog(options=None):
+    """``{'length': ..., 'pending': ..., 'lag': ..., 'dead': ...}`` for the stream and group."""
+    options = options or get_notification_settings()
+    client = _get_client()
+    ensure_group(options)
+    group = next(
+        (group for group in client.xinfo_groups(options['STREAM']) if group['name'] == options['GROUP']),
+        {},
+    )
+    return {
+        'length': client.xlen(options['STREAM']),
+        'pending': group.get('pending', 0),
+        'lag': group.get('lag'),
+        'dead': client.xlen(options['DEAD_LETTER_STREAM']),
+    }
@@ -0,0 +1,263 @@
+"""
+Order services: placement, cancellation and payment.
+"""
+
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, CharField, Value, When
+from django.utils import timezone
+
+from apps.cart.storage import get_cart_store
+from apps.products.inventory import InsufficientStock, reserve_stock
+from . import state_machine
+from .models import Order, OrderItem, Payment
+
+logger = logging.getLogger(__name__)
+
+
+class OrderPlacementError(Exception):
+    """Raised when an order cannot be placed from the given cart items."""
+
+
+def place_order(user, address_id, cart_item_ids, remarks=''):
+    """
+    Turn the user's selected cart items into an order and reserve stock.
+
+    Runs in one transaction with a constant number of queries regardless
+    of cart size: one locked fetch of cart items joined to products, one
+    cart removal, the stock reservation, one order INSERT and one bulk
+    INSERT of order items. Cart lines are read through the configured
+    cart store and claimed (removed, all or none) before anything else
+    is written, so of two concurrent checkouts of the same lines only
+    one proceeds. A Redis cart doesn't roll back with the database, so
+    claimed lines are handed back to the store if the order fails.
+    """
+    cart_item_ids = list(cart_item_ids)
+    store = get_cart_store()
+    claimed = []
+
+    try:
+        with transaction.atomic():
+            cart_items = store.items(user, cart_item_ids, for_update=True)
+            if not cart_items or len(cart_items) != len(set(cart_item_ids)):
+                raise OrderPlacementError('Some cart items are invalid')
+
+            # A concurrent checkout of the same lines claimed them first
+            if not store.claim(user, cart_items):
+                raise OrderPlacementError('Some cart items are invalid')
+            claimed = cart_items
+
+            lines = []
+            total_amount = Decimal('0')
+            for cart_item in cart_items:
+                product = cart_item.product
+                subtotal = product.price * cart_item.quantity
+                total_amount += subtotal
+                lines.append((cart_item, product, subtotal))
+
+            try:
+                reserve_stock((item.product_id, item.quantity) for item in cart_items)
+            except InsufficientStock as exc:
+                raise OrderPlacementError(str(exc))
+
+            order = Order.objects.create(
+                user=user,
+                address_id=address_id,
+                total_amount=total_amount,
+                actual_amount=total_amount,
+                remarks=remarks
+            )
+
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product=product,
+                    product_name=product.name,
+                    product_image=product.main_image,
+                    price=product.price,
+                    quantity=cart_item.quantity,
+                    subtotal=subtotal
+                )
+                for cart_item, product, subtotal in lines
+            ])
+    except BaseException:
+        store.restore(user, claimed)
+        raise
+
+    return order
+
+
+def cancel_order(order):
+    """
+    Cancel a pending order and release its reserved stock.
+
+    Returns False if the order was no longer pending.
+    """
+    return state_machine.transition(order, state_machine.CANCEL)
+
+
+def mark_order_paid(order):
+    """
+    Mark a pending order as paid and record product sales.
+
+    Returns False if the order was no longer pending.
+    """
+    return state_machine.transition(order, state_machine.PAY)
+
+
+def pay_order(order, method, payment_no=None, transaction_id=None):
+    """
+    Settle a pending order and record the successful payment.
+
+    The order transition is the conditional UPDATE in ``mark_order_paid``,
+    so of any number of concurrent calls for one order exactly one wins.
+    The winner settles the pending payment ``payment_no`` if given
+    (creating one otherwise). Returns the payment, or None if the order
+    was no longer pending.
+    """
+    with transaction.atomic():
+        if not mark_order_paid(order):
+            return None
+
+        updated = 0
+        if payment_no:
+            updated = Payment.objects.filter(
+                order=order, payment_no=payment_no, status='pending'
+            ).update(
+                method=method,
+                status='succeeded',
+                transaction_id=transaction_id,
+                paid_at=order.paid_at,
+                updated_at=order.paid_at
+            )
+        if updated:
+            return Payment.objects.get(order=order, payment_no=payment_no)
+        return Payment.objects.create(
+            order=order,
+            method=method,
+            amount=order.actual_amount,
+            status='succeeded',
+            transaction_id=transaction_id,
+            paid_at=order.paid_at
+        )
+
+
+def _settle_payments(settled, status, now):
+    """Give pending ``(payment, notification)`` pairs ``status`` and their transaction ids."""
+    return Payment.objects.filter(
+        payment_no__in=[payment.payment_no for payment, _ in settled], status='pending'
+    ).update(
+        status=status,
+        transaction_id=Case(
+            *[When(payment_no=payment.payment_no, then=Value(notification['transaction_id']))
+              for payment, notification in settled],
+            output_field=CharField(),
+        ),
+        paid_at=now,
+        updated_at=now
+    )
+
+
+def apply_payment_notifications(notifications):
+    """
+    Apply a batch of gateway notifications in one transaction.
+
+    Each notification is a dict with ``payment_no``, ``status``
+    (``succeeded`` or ``failed``), ``amount`` and ``transaction_id``.
+    Pending orders of succeeded payments are locked and moved to paid
+    with one UPDATE, their sales recorded together, and the payments
+    settled with one more UPDATE; failed payments are marked failed.
+    A successful payment that can't pay its order (a second payment of
+    the same order, or an order that is no longer pending) has taken the
+    customer's money, so it is marked ``refund_pending``. Duplicates and
+    notifications for payments that are no longer pending change
+    nothing, so redelivery is harmless.
+
+    Returns ``{'paid': ..., 'failed': ..., 'refund': ..., 'ignored': ...}``.
+    """
+    latest = {}
+    for notification in notifications:
+        previous = latest.get(notification['payment_no'])
+        # A success is final; never let a stale failure override it
+        if previous is None or previous['status'] != 'succeeded':
+            latest[notification['payment_no']] = notification
+
+    payments = Payment.objects.filter(payment_no__in=list(latest), status='pending').in_bulk(field_name='payment_no')
+
+    winners = {}
+    refunds = []
+    failed = []
+    for payment_no, notification in latest.items():
+        payment = payments.get(payment_no)
+        if payment is None:
+            continue
+        if notification['status'] == 'failed':
+            failed.append(payment_no)
+        elif notification['amount'] != payment.amount:
+            logger.warning('Payment %s amount mismatch: %s != %s', payment_no, notification['amount'], payment.amount)
+            failed.append(payment_no)
+        elif payment.order_id in winners:
+            logger.warning(
+                'Payment %s succeeded for order %s already paid by %s in this batch, needs a refund',
+                payment_no, payment.order_id, winners[payment.order_id][0].payment_no
+            )
+            refunds.append((payment, notification))
+        else:
+            winners[payment.order_id] = (payment, notification)
+
+    with transaction.atomic():
+        now = timezone.now()
+        order_ids = list(
+            Order.objects
+            .select_for_update()
+            .filter(id__in=list(winners), status='pending')
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+        for order_id in set(winners) - set(order_ids):
+            # Paid through another payment, or expired
+            logger.warning(
+                'Payment %s succeeded for order %s that is no longer pending, needs a refund',
+                winners[order_id][0].payment_no, order_id
+            )
+            refunds.append(winners[order_id])
+
+        if order_ids:
+            state_machine.bulk_transition(state_machine.PAY, order_ids)
+            _settle_payments([winners[order_id] for order_id in order_ids], 'succeeded', now)
+        if refunds:
+            _settle_payments(refunds, 'refund_pending', now)
+        if failed:
+            Payment.objects.filter(payment_no__in=failed, status='pending').update(status='failed', updated_at=now)
+
+    return {
+        'paid': len(order_ids),
+        'failed': len(failed),
+        'refund': len(refunds),
+        'ignored': len(notifications) - len(order_ids) - len(failed) - len(refunds),
+    }
+
+
+def expire_pending_orders(cutoff, batch_size=500):
+    """
+    Cancel up to ``batch_size`` pending orders created before ``cutoff``
+    and release their stock. Returns the number of orders cancelled.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``, so
+    several sweepers can run at once without waiting on each other, and
+    an order being paid concurrently is either skipped here or no longer
+    pending when ``mark_order_paid`` gets to it.
+    """
+    with transaction.atomic():
+        ids = list(
+            Order.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', created_at__lt=cutoff)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        return state_machine.bulk_transition(state_machine.CANCEL, ids)
@@ -0,0 +1,128 @@
+"""
+Order state machine.
+
+    pending --pay--> paid --ship--> shipped --complete--> completed
+       |
+       +--cancel--> cancelled
+
+Every transition is a conditional UPDATE on the source statuses that
+writes only ``status``, the transition's timestamp and ``updated_at``,
+so concurrent transitions of the same order can't both win and no other
+column is overwritten. Transitions with stock side effects (``pay``
+records sales, ``cancel`` releases reserved stock) lock the affected
+rows first so the side effect is applied exactly for the orders that
+moved.
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from apps.products.inventory import order_lines, record_sales, release_stock
+from .models import Order, OrderItem
+
+PAY = 'pay'
+SHIP = 'ship'
+COMPLETE = 'complete'
+CANCEL = 'cancel'
+
+# Largest batch a bulk transition accepts from the API
+MAX_BULK_ORDERS = 5000
+
+
+class InvalidTransition(Exception):
+    """Raised for an unknown transition name."""
+
+
+# ``stock_effect`` takes ``(product_id, quantity)`` pairs of the moved orders
+Transition = namedtuple('Transition', 'name sources target timestamp_field stock_effect')
+
+
+def _fields(spec, now):
+    return {'status': spec.target, spec.timestamp_field: now, 'updated_at': now}
+
+
+TRANSITIONS = {
+    transition.name: transition
+    for transition in (
+        Transition(PAY, ('pending',), 'paid', 'paid_at', record_sales),
+        Transition(SHIP, ('paid',), 'shipped', 'shipped_at', None),
+        Transition(COMPLETE, ('shipped',), 'completed', 'completed_at', None),
+        Transition(CANCEL, ('pending',), 'cancelled', 'cancelled_at', release_stock),
+    )
+}
+
+
+def get_transition(name):
+    try:
+        return TRANSITIONS[name]
+    except KeyError:
+        raise InvalidTransition(f'Unknown order transition: {name}')
+
+
+def available_transitions(order):
+    """Names of the transitions allowed from the order's current status."""
+    return [name for name, transition in TRANSITIONS.items() if order.status in transition.sources]
+
+
+def can_transition(order, name):
+    return order.status in get_transition(name).sources
+
+
+def transition(order, name):
+    """
+    Apply transition ``name`` to one order.
+
+    Returns False, changing nothing, if the order is not (or no longer)
+    in a source status. On success the in-memory ``order`` is updated.
+    """
+    spec = get_transition(name)
+    if order.status not in spec.sources:
+        return False
+
+    with transaction.atomic():
+        now = timezone.now()
+        fields = _fields(spec, now)
+        moved = Order.objects.filter(id=order.id, status__in=spec.sources).update(**fields)
+        if not moved:
+            return False
+        if spec.stock_effect is not None:
+            spec.stock_effect(order_lines(order))
+
+    for field, value in fields.items():
+        setattr(order, field, value)
+    return True
+
+
+def _id_filter(orders):
+    if isinstance(orders, QuerySet):
+        return {'id__in': orders.order_by().values('id')}
+    return {'id__in': list(orders)}
+
+
+def bulk_transition(name, orders):
+    """
+    Apply transition ``name`` to many orders at once.
+
+    ``orders`` is a queryset or an iterable of ids. Orders not in a
+    source status are skipped. Transitions without side effects run as
+    one conditional UPDATE; the others lock the matching rows, update
+    them together and apply the stock effect for all of their items in
+    one statement. Returns the number of orders moved.
+    """
+    spec = get_transition(name)
+    now = timezone.now()
+    candidates = Order.objects.filter(status__in=spec.sources, **_id_filter(orders))
+
+    if spec.stock_effect is None:
+        return candidates.update(**_fields(spec, now))
+
+    with transaction.atomic():
+        ids = list(candidates.select_for_update().order_by('id').values_list('id', flat=True))
+        if not ids:
+            return 0
+        Order.objects.filter(id__in=ids).update(**_fields(spec, now))
+        spec.stock_effect(OrderItem.objects.filter(order_id__in=ids).values_list('product_id', 'quantity'))
+    return len(ids)
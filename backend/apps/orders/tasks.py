@@ -0,0 +1,63 @@
+"""
+Celery tasks for orders app.
+"""
+
+import os
+import socket
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from . import idempotency, notifications, services
+
+
+def get_expiry_settings():
+    options = {'TIMEOUT_MINUTES': 30, 'BATCH_SIZE': 500, 'MAX_BATCHES': 20}
+    options.update(getattr(settings, 'ORDER_EXPIRY', {}))
+    return options
+
+
+@shared_task
+def expire_pending_orders():
+    """
+    Cancel pending orders older than ``ORDER_EXPIRY['TIMEOUT_MINUTES']``.
+
+    Works through at most ``MAX_BATCHES`` batches per run so one run
+    can't hog a worker; the next beat tick picks up the rest.
+    """
+    options = get_expiry_settings()
+    cutoff = timezone.now() - timedelta(minutes=options['TIMEOUT_MINUTES'])
+    total = 0
+    for _ in range(options['MAX_BATCHES']):
+        expired = services.expire_pending_orders(cutoff, options['BATCH_SIZE'])
+        total += expired
+        if expired < options['BATCH_SIZE']:
+            break
+    return total
+
+
+@shared_task
+def process_payment_notifications():
+    """
+    Drain queued payment notifications, at most ``MAX_BATCHES`` batches
+    per run. Dedicated consumers (``process_payment_notifications``
+    command) share the same consumer group.
+    """
+    options = notifications.get_notification_settings()
+    notifications.ensure_group(options)
+    consumer = f'celery-{socket.gethostname()}-{os.getpid()}'
+    total = 0
+    for _ in range(options['MAX_BATCHES']):
+        applied = notifications.consume(consumer, options, block=False)
+        total += applied
+        if not applied:
+            break
+    return total
+
+
+@shared_task
+def purge_idempotency_keys():
+    """Delete idempotency keys older than ``IDEMPOTENCY['CACHE_TIMEOUT']``."""
+    return idempotency.purge_expired_keys()
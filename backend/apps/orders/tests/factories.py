@@ -0,0 +1,20 @@
+"""
+Factories for order models.
+"""
+
+from decimal import Decimal
+
+import factory
+
+from apps.orders.models import Order
+from apps.users.tests.factories import AddressFactory
+
+
+class OrderFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Order
+
+    address = factory.SubFactory(AddressFactory)
+    user = factory.SelfAttribute('address.user')
+    total_amount = Decimal('99.00')
+    actual_amount = Decimal('99.00')
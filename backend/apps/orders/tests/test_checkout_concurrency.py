@@ -0,0 +1,62 @@
+"""
+Stock must never be oversold, however checkouts interleave.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+
+from apps.cart.models import CartItem
+from apps.orders.models import Order
+from apps.orders.services import OrderPlacementError, place_order
+from apps.products.tests.factories import ProductFactory
+from apps.users.tests.factories import AddressFactory
+
+STOCK = 5
+BUYERS = 20
+
+
+class CheckoutStockTests(TransactionTestCase):
+
+    def setUp(self):
+        self.product = ProductFactory(stock=STOCK)
+        self.buyers = []
+        for _ in range(BUYERS):
+            address = AddressFactory()
+            item = CartItem.objects.create(user=address.user, product=self.product, quantity=1)
+            self.buyers.append((address, item))
+
+    def checkout(self, buyer):
+        address, item = buyer
+        try:
+            place_order(address.user, address.id, [item.id])
+            return 'placed'
+        except OrderPlacementError:
+            return 'rejected'
+
+    def assert_not_oversold(self, results):
+        self.product.refresh_from_db()
+        self.assertEqual(results.count('placed'), STOCK)
+        self.assertEqual(results.count('rejected'), BUYERS - STOCK)
+        self.assertEqual(self.product.stock, 0)
+        self.assertEqual(Order.objects.filter(items__product=self.product).count(), STOCK)
+
+    def test_sequential_checkouts_stop_at_zero_stock(self):
+        self.assert_not_oversold([self.checkout(buyer) for buyer in self.buyers])
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_parallel_checkouts_never_oversell(self):
+        start = threading.Barrier(BUYERS)
+
+        def checkout(buyer):
+            try:
+                start.wait()
+                return self.checkout(buyer)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=BUYERS) as pool:
+            results = list(pool.map(checkout, self.buyers))
+        self.assert_not_oversold(results)
@@ -0,0 +1,97 @@
+"""
+Tests for applying payment gateway notifications.
+"""
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from apps.orders import notifications
+from apps.orders.models import Payment
+from apps.orders.services import apply_payment_notifications
+from .factories import OrderFactory
+
+
+def succeeded(payment, transaction_id='TXN1'):
+    return {
+        'payment_no': payment.payment_no,
+        'status': 'succeeded',
+        'amount': payment.amount,
+        'transaction_id': transaction_id,
+    }
+
+
+class ApplyPaymentNotificationsTests(TestCase):
+
+    def setUp(self):
+        self.order = OrderFactory()
+
+    def pending_payment(self):
+        return Payment.objects.create(order=self.order, amount=self.order.actual_amount)
+
+    def test_second_successful_payment_is_recorded_for_refund(self):
+        first, second = self.pending_payment(), self.pending_payment()
+        result = apply_payment_notifications([succeeded(first, 'TXN1'), succeeded(second, 'TXN2')])
+
+        self.assertEqual(result, {'paid': 1, 'failed': 0, 'refund': 1, 'ignored': 0})
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'paid')
+        statuses = dict(Payment.objects.filter(order=self.order).values_list('transaction_id', 'status'))
+        self.assertEqual(statuses, {'TXN1': 'succeeded', 'TXN2': 'refund_pending'})
+
+    def test_success_for_an_order_no_longer_pending_is_recorded_for_refund(self):
+        payment = self.pending_payment()
+        self.order.status = 'cancelled'
+        self.order.save(update_fields=['status'])
+
+        result = apply_payment_notifications([succeeded(payment)])
+
+        self.assertEqual(result['refund'], 1)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'refund_pending')
+
+    def test_redelivery_changes_nothing(self):
+        payment = self.pending_payment()
+        apply_payment_notifications([succeeded(payment)])
+        result = apply_payment_notifications([succeeded(payment)])
+        self.assertEqual(result, {'paid': 0, 'failed': 0, 'refund': 0, 'ignored': 1})
+
+
+@override_settings(PAYMENT_NOTIFICATIONS={'MAX_DELIVERIES': 3})
+class DeadLetterTests(TestCase):
+
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.client.xpending_range.side_effect = lambda stream, group, min, max, count: [
+            {'message_id': min, 'times_delivered': self.deliveries[min]}
+        ]
+        patcher = mock.patch.object(notifications, '_get_client', return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entry_failing_max_deliveries_moves_to_dead_letter_stream(self):
+        self.deliveries = {'1-0': 3, '2-0': 1}
+        entries = [
+            ('1-0', {'payment_no': 'PAY1', 'status': 'succeeded', 'amount': 'bad'}),
+            ('2-0', {'payment_no': 'PAY2', 'status': 'succeeded', 'amount': 'bad'}),
+        ]
+        options = notifications.get_notification_settings()
+
+        self.assertEqual(notifications._apply(entries, options), 0)
+
+        pipe = self.client.pipeline.return_value
+        pipe.xadd.assert_called_once_with(
+            options['DEAD_LETTER_STREAM'], {**entries[0][1], 'source_id': '1-0'}
+        )
+        pipe.xack.assert_called_once_with(options['STREAM'], options['GROUP'], '1-0')
+        pipe.execute.assert_called_once_with()
+        self.client.xack.assert_not_called()
+
+    def test_entries_below_the_limit_stay_pending(self):
+        self.deliveries = {'1-0': 2}
+        entries = [('1-0', {'payment_no': 'PAY1', 'status': 'succeeded', 'amount': 'bad'})]
+
+        notifications._apply(entries, notifications.get_notification_settings())
+
+        self.client.pipeline.assert_not_called()
+        self.client.xack.assert_not_called()
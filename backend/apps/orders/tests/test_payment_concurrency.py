@@ -0,0 +1,62 @@
+"""
+Paying one order many times at once must settle it exactly once.
+"""
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.models import Payment
+from .factories import OrderFactory
+
+CALLS = 20
+
+
+class PayOrderOnceTests(TransactionTestCase):
+
+    def setUp(self):
+        self.order = OrderFactory()
+        self.url = reverse('simulate_payment', kwargs={'order_id': self.order.id})
+
+    def pay(self, key=None):
+        client = APIClient()
+        client.force_authenticate(self.order.user)
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        response = client.post(self.url, {'payment_method': 'alipay'}, format='json', **headers)
+        return response.status_code, response.get('Idempotent-Replayed') == 'true'
+
+    def assert_paid_once(self, results):
+        self.order.refresh_from_db()
+        fresh = [code for code, replayed in results if code == 200 and not replayed]
+        self.assertEqual(len(fresh), 1, results)
+        self.assertTrue(all(code in (200, 400, 409) for code, _ in results), results)
+        self.assertEqual(self.order.status, 'paid')
+        self.assertEqual(Payment.objects.filter(order=self.order, status='succeeded').count(), 1)
+
+    def test_repeated_pay_calls_settle_once(self):
+        keys = [uuid.uuid4().hex for _ in range(3)]
+        results = [self.pay(keys[index % len(keys)] if index % 4 else None) for index in range(CALLS)]
+        self.assert_paid_once(results)
+        self.assertTrue(any(replayed for _, replayed in results))
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_parallel_pay_calls_settle_once(self):
+        keys = [uuid.uuid4().hex for _ in range(5)]
+        start = threading.Barrier(CALLS)
+
+        def pay(index):
+            try:
+                start.wait()
+                # Every fourth call sends no key and relies on the order transition alone
+                return self.pay(keys[index % len(keys)] if index % 4 else None)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=CALLS) as pool:
+            results = list(pool.map(pay, range(CALLS)))
+        self.assert_paid_once(results)
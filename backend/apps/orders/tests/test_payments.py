@@ -0,0 +1,90 @@
+"""
+Tests for payment creation and idempotency key retention.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.orders.idempotency import purge_expired_keys
+from apps.orders.models import IdempotencyKey, Payment
+from .factories import OrderFactory
+
+
+class CreateThenPayTests(TestCase):
+
+    def setUp(self):
+        self.order = OrderFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.order.user)
+
+    def post(self, name, data, key):
+        url = reverse(name, kwargs={'order_id': self.order.id})
+        return self.client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_pay_settles_the_created_payment(self):
+        key = uuid.uuid4().hex
+        created = self.post('create_payment', {'payment_method': 'wechat'}, key)
+        # A retried create replays the same payment instead of adding one
+        self.assertEqual(self.post('create_payment', {'payment_method': 'wechat'}, key).data, created.data)
+
+        payment_no = created.data['payment_no']
+        paid = self.post('simulate_payment', {'payment_method': 'wechat', 'payment_no': payment_no}, key)
+        self.assertEqual(paid.status_code, 200)
+        self.assertEqual(paid.data['payment_no'], payment_no)
+        self.assertEqual(
+            list(Payment.objects.filter(order=self.order).values_list('payment_no', 'status')),
+            [(payment_no, 'succeeded')]
+        )
+
+
+class AbandonedClaimTests(TestCase):
+
+    def setUp(self):
+        self.order = OrderFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.order.user)
+        self.key = uuid.uuid4().hex
+        self.create_payment()
+        # As left behind by a request whose process died mid-flight
+        self.claim = IdempotencyKey.objects.get(key=self.key)
+        IdempotencyKey.objects.filter(id=self.claim.id).update(status_code=None, response=None)
+        cache.clear()
+
+    def create_payment(self):
+        url = reverse('create_payment', kwargs={'order_id': self.order.id})
+        return self.client.post(url, {'payment_method': 'wechat'}, format='json', HTTP_IDEMPOTENCY_KEY=self.key)
+
+    def test_fresh_claim_is_still_in_flight(self):
+        self.assertEqual(self.create_payment().status_code, 409)
+
+    def test_expired_claim_is_taken_over(self):
+        IdempotencyKey.objects.filter(id=self.claim.id).update(claimed_at=timezone.now() - timedelta(minutes=5))
+
+        response = self.create_payment()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.claim.refresh_from_db()
+        self.assertEqual(self.claim.status_code, 200)
+        self.assertEqual(self.claim.response, response.data)
+
+
+@override_settings(IDEMPOTENCY={'CACHE_TIMEOUT': 3600})
+class PurgeIdempotencyKeysTests(TestCase):
+
+    def test_only_keys_older_than_the_cache_timeout_are_deleted(self):
+        user = OrderFactory().user
+        keys = IdempotencyKey.objects.bulk_create([
+            IdempotencyKey(user=user, scope='simulate_payment', key=f'key-{index}', request_hash='x')
+            for index in range(5)
+        ])
+        stale = [key.id for key in keys[:3]]
+        IdempotencyKey.objects.filter(id__in=stale).update(created_at=timezone.now() - timedelta(hours=2))
+
+        self.assertEqual(purge_expired_keys(batch_size=2), 3)
+        self.assertCountEqual(IdempotencyKey.objects.values_list('id', flat=True), [key.id for key in keys[3:]])
@@ -0,0 +1,86 @@
+"""
+Tests for order placement.
+"""
+
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.cart.models import CartItem
+from apps.cart.storage import DatabaseCartStore
+from apps.orders.models import Order
+from apps.orders.services import OrderPlacementError, place_order
+from apps.products.tests.factories import CategoryFactory, ProductFactory
+from apps.users.tests.factories import AddressFactory
+
+
+class PlaceOrderQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = CategoryFactory()
+
+    def checkout(self, lines):
+        address = AddressFactory()
+        products = ProductFactory.create_batch(lines, category=self.category)
+        items = CartItem.objects.bulk_create([
+            CartItem(user=address.user, product=product, quantity=2) for product in products
+        ])
+        return lambda: place_order(address.user, address.id, [item.id for item in items])
+
+    def test_query_count_does_not_grow_with_cart_size(self):
+        checkout = self.checkout(1)
+        with CaptureQueriesContext(connection) as single:
+            checkout()
+
+        for lines in (5, 20):
+            checkout = self.checkout(lines)
+            with self.subTest(lines=lines), self.assertNumQueries(len(single)):
+                order = checkout()
+            self.assertEqual(order.items.count(), lines)
+
+
+class RecordingCartStore(DatabaseCartStore):
+
+    def __init__(self):
+        self.restored = []
+
+    def restore(self, user, items):
+        self.restored.extend(items)
+
+
+class PlaceOrderCartTests(TestCase):
+
+    def setUp(self):
+        self.address = AddressFactory()
+        self.user = self.address.user
+        self.store = RecordingCartStore()
+        patcher = mock.patch('apps.orders.services.get_cart_store', return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def add(self, stock, quantity):
+        return CartItem.objects.create(user=self.user, product=ProductFactory(stock=stock), quantity=quantity)
+
+    def test_placed_order_takes_the_cart_lines(self):
+        item = self.add(stock=5, quantity=2)
+        place_order(self.user, self.address.id, [item.id])
+        self.assertFalse(CartItem.objects.filter(id=item.id).exists())
+        self.assertEqual(self.store.restored, [])
+
+    def test_failed_order_gives_claimed_lines_back(self):
+        enough, short = self.add(stock=5, quantity=1), self.add(stock=1, quantity=3)
+        with self.assertRaises(OrderPlacementError):
+            place_order(self.user, self.address.id, [enough.id, short.id])
+        self.assertCountEqual([item.id for item in self.store.restored], [enough.id, short.id])
+        self.assertEqual(CartItem.objects.filter(user=self.user).count(), 2)
+        self.assertFalse(Order.objects.filter(user=self.user).exists())
+
+    def test_lines_claimed_by_another_checkout_are_not_restored(self):
+        item = self.add(stock=5, quantity=1)
+        with mock.patch.object(self.store, 'claim', return_value=False):
+            with self.assertRaises(OrderPlacementError):
+                place_order(self.user, self.address.id, [item.id])
+        self.assertEqual(self.store.restored, [])
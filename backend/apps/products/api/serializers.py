@@ -4,6 +4,7 @@ Serializers for products API.
 
 from rest_framework import serializers
 from ..models import Category, Product, ProductImage
+from ..category_tree import get_category_node
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -22,13 +23,19 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
     def get_children(self, obj):
-        # Get immediate children
+        # Served from the cached tree; fall back to MPTT for hidden nodes
+        node = get_category_node(obj.id)
+        if node is not None:
+            return node['children']
         children = obj.get_children()
         if children.exists():
             return CategorySerializer(children, many=True).data
         return []
 
     def get_product_count(self, obj):
+        node = get_category_node(obj.id)
+        if node is not None:
+            return node['product_count']
         return obj.products.count()
 
 
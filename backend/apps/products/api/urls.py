@@ -8,13 +8,15 @@ from .views import (
     CategoryDetailView,
     ProductListView,
     ProductDetailView,
-    FeaturedProductsView
+    FeaturedProductsView,
+    TrendingProductsView
 )
 
 urlpatterns = [
     path('categories/', CategoryListView.as_view(), name='category_list'),
     path('categories/<uuid:id>/', CategoryDetailView.as_view(), name='category_detail'),
     path('products/featured/', FeaturedProductsView.as_view(), name='featured_products'),
+    path('products/trending/', TrendingProductsView.as_view(), name='trending_products'),
     path('products/', ProductListView.as_view(), name='product_list'),
     path('products/<uuid:id>/', ProductDetailView.as_view(), name='product_detail'),
 ]
@@ -2,25 +2,68 @@
 API views for products app.
 """
 
+import logging
+
+from redis.exceptions import RedisError
 from rest_framework import generics, filters
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import AllowAny, IsAdminUser
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404
+from core.mixins import ConditionalGetMixin
 from ..models import Category, Product
+from ..category_tree import get_category_node, get_category_tree
+from ..detail_cache import get_product_detail
+from ..facets import spec_facet_counts
+from ..feeds import FEATURED, TRENDING, FeedNotReady, get_feed, get_feed_settings, rank_products
+from ..filters import ProductFilter
+from ..search import ProductSearchFilter
+from ..versioning import CATALOG, CATEGORIES, get_version
 from .serializers import (
     CategorySerializer,
     ProductListSerializer,
     ProductDetailSerializer
 )
 
+logger = logging.getLogger(__name__)
+
+
+class CatalogVersionMixin(ConditionalGetMixin):
+    """
+    Conditional GET keyed on a catalog version counter.
+    """
+    catalog_version = CATALOG
+
+    def _get_version(self):
+        if not hasattr(self, '_version'):
+            self._version = get_version(self.catalog_version)
+        return self._version
+
+    def get_etag(self, request, *args, **kwargs):
+        return f'{self.catalog_version}-{self._get_version()[0]}'
+
+    def get_last_modified(self, request, *args, **kwargs):
+        return self._get_version()[1]
 
-class CategoryListView(generics.ListAPIView):
+
+class CategoryListView(CatalogVersionMixin, generics.ListAPIView):
     """
     List all categories (tree structure).
     """
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
+    use_read_replica = True
+    pagination_class = None
+    catalog_version = CATEGORIES
+    cache_control = {'public': True, 'max_age': 300}
+
+    def list(self, request, *args, **kwargs):
+        """
+        Return root categories with nested children from the cached tree
+        """
+        return Response(get_category_tree())
 
 
 class CategoryDetailView(generics.RetrieveAPIView):
@@ -30,46 +73,159 @@ class CategoryDetailView(generics.RetrieveAPIView):
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
+    use_read_replica = True
     lookup_field = 'id'
 
 
-class ProductListView(generics.ListAPIView):
+class ProductListView(CatalogVersionMixin, generics.ListAPIView):
     """
     List all products with filtering and search.
     """
     queryset = Product.objects.filter(is_active=True)
     serializer_class = ProductListSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'is_featured']
+    use_read_replica = True
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ProductSearchFilter]
+    filterset_class = ProductFilter
     search_fields = ['name', 'description']
     ordering_fields = ['price', 'sales', 'created_at']
     ordering = ['-created_at']
+    cache_control = {'public': True, 'max_age': 30}
+
+    def list(self, request, *args, **kwargs):
+        """
+        Pass ?facets=true to add per-value counts of specification keys
+        over the filtered result set.
+        """
+        response = super().list(request, *args, **kwargs)
+        wants_facets = request.query_params.get('facets', '').lower() in ('1', 'true')
+        if wants_facets and isinstance(response.data, dict):
+            response.data['facets'] = spec_facet_counts(self.filter_queryset(self.get_queryset()))
+        return response
 
 
-class ProductDetailView(generics.RetrieveAPIView):
+class ProductDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """
     Retrieve a product detail.
     """
     queryset = Product.objects.filter(is_active=True)
     serializer_class = ProductDetailSerializer
     permission_classes = [AllowAny]
+    use_read_replica = True
     lookup_field = 'id'
+    cache_control = {'public': True, 'max_age': 60}
+
+    def _get_entry(self):
+        """Cached ``{'updated_at', 'data'}`` for the product, or None."""
+        if not hasattr(self, '_entry'):
+            self._entry, self._versions, self._cache_status = get_product_detail(
+                self.kwargs[self.lookup_field], self._build_entry
+            )
+        return self._entry
+
+    def _build_entry(self):
+        # Rebuild from the primary so a lagging replica can't be cached
+        # under the new version
+        instance = (
+            self.get_queryset()
+            .using(DEFAULT_DB_ALIAS)
+            .select_related('category')
+            .prefetch_related('images')
+            .filter(id=self.kwargs[self.lookup_field])
+            .first()
+        )
+        if instance is None:
+            return None
+        return {
+            'updated_at': instance.updated_at,
+            'data': dict(self.get_serializer(instance).data),
+        }
+
+    def get_etag(self, request, *args, **kwargs):
+        entry = self._get_entry()
+        if entry is None:
+            return None
+        # The nested category (children, product counts) changes
+        # without touching the product row
+        categories_version = self._versions[1]
+        return f'{kwargs[self.lookup_field]}-{entry["updated_at"].timestamp():.6f}-{categories_version}'
 
+    def get_last_modified(self, request, *args, **kwargs):
+        entry = self._get_entry()
+        return entry['updated_at'] if entry else None
 
-class FeaturedProductsView(generics.ListAPIView):
+    def retrieve(self, request, *args, **kwargs):
+        entry = self._get_entry()
+        if entry is None:
+            raise Http404
+        data = entry['data']
+        # The cached entry is keyed on the product alone; take the nested
+        # category from the current tree
+        node = get_category_node(data['category']['id'])
+        if node is not None:
+            data = {**data, 'category': node}
+        response = Response(data)
+        response['X-Cache'] = self._cache_status.upper()
+        return response
+
+
+class ProductFeedView(ConditionalGetMixin, generics.ListAPIView):
     """
-    List featured products.
+    Serve a precomputed product feed from Redis (see ``feeds``).
+
+    Falls back to a database query until the feed has been computed or
+    while Redis is unreachable.
     """
-    queryset = Product.objects.filter(is_active=True, is_featured=True)[:8]
     serializer_class = ProductListSerializer
     permission_classes = [AllowAny]
-    ordering = ['-sales']
+    use_read_replica = True
+    pagination_class = None
+    cache_control = {'public': True, 'max_age': 30}
+    feed_name = None
+    default_limit = 8
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        return max(1, min(limit, get_feed_settings()['SIZE']))
+
+    def _get_feed(self):
+        if not hasattr(self, '_feed'):
+            try:
+                self._feed = get_feed(self.feed_name, self.get_limit())
+            except FeedNotReady:
+                self._feed = None
+            except RedisError:
+                # Serve from the database while Redis is unreachable
+                logger.warning('Could not read the %s feed, ranking from the database', self.feed_name, exc_info=True)
+                self._feed = None
+        return self._feed
+
+    def get_etag(self, request, *args, **kwargs):
+        feed = self._get_feed()
+        return f'{self.feed_name}-{feed[0]}' if feed else None
 
     def list(self, request, *args, **kwargs):
-        """
-        Override list to return products directly without pagination
-        """
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        feed = self._get_feed()
+        if feed is not None:
+            return Response(feed[1])
+        products = [product for product, _ in rank_products(self.feed_name)[:self.get_limit()]]
+        return Response(self.get_serializer(products, many=True).data)
+
+
+class FeaturedProductsView(ProductFeedView):
+    """
+    List featured products.
+    """
+    queryset = Product.objects.filter(is_active=True, is_featured=True)
+    feed_name = FEATURED
+
+
+class TrendingProductsView(ProductFeedView):
+    """
+    List trending products (recent sales velocity).
+    """
+    queryset = Product.objects.filter(is_active=True)
+    feed_name = TRENDING
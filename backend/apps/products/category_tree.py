@@ -0,0 +1,129 @@
+"""
+Category tree service.
+
+Builds the whole category forest from a single query over the MPTT
+columns and keeps the serialized result in the default cache.
+"""
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Exists, OuterRef, Subquery
+
+from .models import Category
+
+CATEGORY_TREE_CACHE_KEY = 'products:category_tree'
+CATEGORY_TREE_CACHE_TIMEOUT = 60 * 60
+
+
+def build_category_tree():
+    """
+    Load all active categories in tree order and nest them in memory.
+
+    Returns a dict with the list of root nodes and a flat index of every
+    node by id. Each node has the same shape as ``CategorySerializer``.
+    """
+    # Always read the primary so a lagging replica can't repopulate the
+    # cache with a tree that was just invalidated.
+    rows = (
+        Category.objects
+        .using(DEFAULT_DB_ALIAS)
+        .filter(is_active=True)
+        .annotate(product_count=Count('products'))
+        .order_by('tree_id', 'lft')
+        .values(
+            'id', 'name', 'parent_id', 'image', 'icon', 'description',
+            'order', 'is_active', 'level', 'product_count'
+        )
+    )
+
+    roots = []
+    nodes = {}
+    for row in rows:
+        node_id = str(row['id'])
+        parent_id = str(row['parent_id']) if row['parent_id'] else None
+        node = {
+            'id': node_id,
+            'name': row['name'],
+            'parent': parent_id,
+            'image': row['image'],
+            'icon': row['icon'],
+            'description': row['description'],
+            'order': row['order'],
+            'is_active': row['is_active'],
+            'children': [],
+            'product_count': row['product_count'],
+        }
+
+        if parent_id is None:
+            roots.append(node)
+        elif parent_id in nodes:
+            nodes[parent_id]['children'].append(node)
+        else:
+            # Parent is inactive, so the whole branch is hidden.
+            continue
+        nodes[node_id] = node
+
+    return {'roots': roots, 'nodes': nodes}
+
+
+def get_cached_category_tree():
+    """Return the category tree, building and caching it on a miss."""
+    tree = cache.get(CATEGORY_TREE_CACHE_KEY)
+    if tree is None:
+        tree = build_category_tree()
+        cache.set(CATEGORY_TREE_CACHE_KEY, tree, CATEGORY_TREE_CACHE_TIMEOUT)
+    return tree
+
+
+def get_category_tree():
+    """Return the serialized list of root categories with nested children."""
+    return get_cached_category_tree()['roots']
+
+
+def get_category_node(category_id):
+    """Return the serialized node for a category, or None if it is hidden."""
+    return get_cached_category_tree()['nodes'].get(str(category_id))
+
+
+def get_descendant_ids(category_id):
+    """
+    Ids of a category and all of its visible descendants, read from the
+    cached tree. Returns None if the category is hidden or unknown.
+    """
+    node = get_category_node(category_id)
+    if node is None:
+        return None
+    ids = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        ids.append(node['id'])
+        stack.extend(node['children'])
+    return ids
+
+
+def descendant_ids_query(category_id):
+    """
+    Subquery of ids of a category and its visible descendants, using the
+    MPTT ``tree_id``/``lft``/``rght`` interval so it stays one indexed
+    range scan however deep the branch is. Like the cached tree, it skips
+    inactive categories and everything below them.
+    """
+    bounds = Category.objects.filter(id=category_id)
+    hidden_by = Category.objects.filter(
+        tree_id=OuterRef('tree_id'),
+        lft__lte=OuterRef('lft'),
+        rght__gte=OuterRef('rght'),
+        is_active=False,
+    )
+    return Category.objects.filter(
+        ~Exists(hidden_by),
+        tree_id=Subquery(bounds.values('tree_id')[:1]),
+        lft__gte=Subquery(bounds.values('lft')[:1]),
+        rght__lte=Subquery(bounds.values('rght')[:1]),
+    ).values('id')
+
+
+def invalidate_category_tree():
+    """Drop the cached tree so the next read rebuilds it."""
+    cache.delete(CATEGORY_TREE_CACHE_KEY)
@@ -0,0 +1,130 @@
+"""
+Product detail response cache.
+
+Serialized product details are stored in Redis under a key made of the
+product id and the product's version counter. Bumping the counter (see
+``signals`` and ``inventory``) makes old entries unreachable, so there
+is no explicit delete. The nested category (children, product counts)
+is not part of the key; the view refreshes it from the cached category
+tree on every response. A small in-process LRU sits in front of Redis;
+since its keys are versioned too, it never serves a stale entry once
+the new version is visible.
+
+On a miss only one process rebuilds an entry: the first one takes a
+short lock in Redis, the others wait for the entry to appear (up to
+``LOCK_WAIT`` seconds) before falling back to building it themselves.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import LocalTTLCache
+
+from .versioning import CATEGORIES, get_versions, product_version
+
+DETAIL_CACHE_PREFIX = 'products:detail:'
+
+_settings = getattr(settings, 'PRODUCT_DETAIL_CACHE', {})
+DETAIL_CACHE_TTL = _settings.get('TTL', 600)
+LOCK_TIMEOUT = _settings.get('LOCK_TIMEOUT', 10)
+LOCK_WAIT = _settings.get('LOCK_WAIT', 2.0)
+LOCK_POLL_INTERVAL = 0.05
+
+_local_entries = LocalTTLCache(
+    maxsize=_settings.get('LOCAL_MAXSIZE', 1000),
+    ttl=_settings.get('LOCAL_TTL', 60),
+)
+
+HIT_LOCAL = 'hit-local'
+HIT = 'hit'
+MISS = 'miss'
+
+_stats_lock = threading.Lock()
+_stats = {'hits_local': 0, 'hits': 0, 'misses': 0, 'lock_waits': 0, 'lock_timeouts': 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_stats():
+    """Counters for this process."""
+    with _stats_lock:
+        data = dict(_stats)
+    lookups = data['hits_local'] + data['hits'] + data['misses']
+    data['hit_ratio'] = round((data['hits_local'] + data['hits']) / lookups, 4) if lookups else None
+    return data
+
+
+def get_detail_versions(product_id):
+    """
+    ``(product_version, categories_version)`` for a product's response;
+    only the first keys the cached entry.
+    """
+    name = product_version(product_id)
+    versions = get_versions(name, CATEGORIES)
+    return versions[name][0], versions[CATEGORIES][0]
+
+
+def get_product_detail(product_id, build):
+    """
+    Return ``(entry, versions, status)`` for a product.
+
+    ``build()`` is called on a miss and must return the entry to cache
+    (any picklable value) or None if the product doesn't exist; None is
+    not cached. ``versions`` is the result of ``get_detail_versions`` and
+    ``status`` is one of ``HIT_LOCAL``, ``HIT`` or ``MISS``.
+    """
+    versions = get_detail_versions(product_id)
+    entry, status = _lookup(f'{DETAIL_CACHE_PREFIX}{product_id}:{versions[0]}', build)
+    return entry, versions, status
+
+
+def _lookup(key, build):
+    """Local tier, then Redis, then ``build`` under the stampede lock."""
+    entry = _local_entries.get(key)
+    if entry is not None:
+        _count('hits_local')
+        return entry, HIT_LOCAL
+
+    entry = cache.get(key)
+    if entry is not None:
+        _count('hits')
+        _local_entries.set(key, entry)
+        return entry, HIT
+
+    _count('misses')
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            entry = _build_and_store(key, build)
+        finally:
+            cache.delete(lock_key)
+        return entry, MISS
+
+    # Someone else is rebuilding this entry
+    _count('lock_waits')
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            _local_entries.set(key, entry)
+            return entry, HIT
+        if not cache.get(lock_key):
+            break
+    else:
+        _count('lock_timeouts')
+    return _build_and_store(key, build), MISS
+
+
+def _build_and_store(key, build):
+    entry = build()
+    if entry is not None:
+        cache.set(key, entry, DETAIL_CACHE_TTL)
+        _local_entries.set(key, entry)
+    return entry
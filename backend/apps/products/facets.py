@@ -0,0 +1,73 @@
+"""
+Facet counts over ``Product.specifications``.
+"""
+
+from collections import defaultdict
+
+from django.db import connections
+
+# Specification keys reported in the ``facets`` block
+SPEC_FACETS = ('brand', 'origin', 'warranty')
+MAX_FACET_VALUES = 20
+
+FACET_SQL = """
+    SELECT spec.key, spec.value, COUNT(*)
+    FROM products
+    CROSS JOIN LATERAL jsonb_each_text(
+        CASE WHEN jsonb_typeof(products.specifications) = 'object'
+             THEN products.specifications ELSE '{{}}'::jsonb END
+    ) AS spec
+    WHERE products.id IN ({subquery}) AND spec.key = ANY(%s)
+    GROUP BY spec.key, spec.value
+"""
+
+
+def _facet_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    return str(value)
+
+
+def _counts_from_rows(rows):
+    counts = defaultdict(lambda: defaultdict(int))
+    for key, value, count in rows:
+        counts[key][value] += count
+    return counts
+
+
+def spec_facet_counts(queryset, keys=SPEC_FACETS, limit=MAX_FACET_VALUES):
+    """
+    Count products in ``queryset`` per value of each specification key,
+    in a single query.
+
+    Returns ``{key: [{'value': ..., 'count': ...}, ...]}`` with the most
+    common values first.
+    """
+    keys = list(keys)
+    connection = connections[queryset.db]
+    ids = queryset.order_by().values('pk')
+
+    if connection.vendor == 'postgresql':
+        subquery, params = ids.query.get_compiler(using=queryset.db).as_sql()
+        with connection.cursor() as cursor:
+            cursor.execute(FACET_SQL.format(subquery=subquery), (*params, keys))
+            counts = _counts_from_rows(cursor.fetchall())
+    else:
+        # No set-returning JSON function to join against; count in Python
+        rows = []
+        for specifications in queryset.order_by().values_list('specifications', flat=True):
+            for key in keys:
+                value = _facet_value((specifications or {}).get(key))
+                if value is not None:
+                    rows.append((key, value, 1))
+        counts = _counts_from_rows(rows)
+
+    return {
+        key: [
+            {'value': value, 'count': count}
+            for value, count in sorted(counts[key].items(), key=lambda item: (-item[1], item[0]))[:limit]
+        ]
+        for key in keys
+    }
@@ -0,0 +1,183 @@
+"""
+Precomputed product feeds (featured, trending).
+
+``refresh_feed`` ranks candidate products and stores the result in
+Redis: a sorted set of product ids by score, a hash of serialized list
+items and a generation id. ``get_feed`` reads all three with one Lua
+call, so serving a feed needs no database queries. Feeds are refreshed
+by the ``refresh_product_feeds`` Celery task (scheduled in
+``CELERY_BEAT_SCHEDULE``) or management command.
+
+Score = ``VELOCITY`` * log1p(units sold in the last ``VELOCITY_DAYS``)
+      + ``SALES`` * log1p(lifetime sales)
+      + ``STOCK`` * min(stock, ``STOCK_CAP``) / ``STOCK_CAP``
+      + ``FEATURED`` if the product is flagged ``is_featured``.
+"""
+
+import json
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.orders.models import OrderItem
+from .api.serializers import ProductListSerializer
+from .models import Product
+
+FEATURED = 'featured'
+TRENDING = 'trending'
+FEEDS = (FEATURED, TRENDING)
+
+FEED_KEY_PREFIX = 'products:feed:'
+
+DEFAULT_SETTINGS = {
+    'SIZE': 50,
+    'VELOCITY_DAYS': 7,
+    'STOCK_CAP': 50,
+    'WEIGHTS': {
+        'VELOCITY': 3.0,
+        'SALES': 1.0,
+        'STOCK': 1.0,
+        'FEATURED': 2.0,
+    },
+}
+
+# Orders whose items count as sold
+SOLD_STATUSES = ('paid', 'shipped', 'completed')
+
+READ_FEED_SCRIPT = """
+local ids = redis.call('ZREVRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+local generation = redis.call('GET', KEYS[3]) or false
+if #ids == 0 then
+    return {generation, {}}
+end
+return {generation, redis.call('HMGET', KEYS[2], unpack(ids))}
+"""
+
+
+def get_feed_settings():
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'PRODUCT_FEEDS', {}))
+    options['WEIGHTS'] = {**DEFAULT_SETTINGS['WEIGHTS'], **options.get('WEIGHTS', {})}
+    return options
+
+
+class FeedNotReady(Exception):
+    """Raised when a feed has not been computed yet."""
+
+
+_client = None
+_read_script = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    global _client, _read_script
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import redis
+
+                client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+                _read_script = client.register_script(READ_FEED_SCRIPT)
+                _client = client
+    return _client
+
+
+def _keys(name):
+    key = f'{FEED_KEY_PREFIX}{name}'
+    return key, f'{key}:items', f'{key}:generation'
+
+
+def _velocity(product_ids, days):
+    since = timezone.now() - timedelta(days=days)
+    queryset = (
+        OrderItem.objects
+        .filter(order__status__in=SOLD_STATUSES, order__paid_at__gte=since)
+        .values('product_id')
+        .annotate(units=Sum('quantity'))
+        .values_list('product_id', 'units')
+    )
+    if product_ids is not None:
+        queryset = queryset.filter(product_id__in=product_ids)
+    return dict(queryset)
+
+
+def score_product(product, velocity, options):
+    weights = options['WEIGHTS']
+    stock_cap = options['STOCK_CAP']
+    return (
+        weights['VELOCITY'] * math.log1p(velocity)
+        + weights['SALES'] * math.log1p(max(product.sales, 0))
+        + weights['STOCK'] * min(max(product.stock, 0), stock_cap) / stock_cap
+        + (weights['FEATURED'] if product.is_featured else 0)
+    )
+
+
+def rank_products(name, options=None):
+    """Return ``[(product, score), ...]`` for a feed, best first."""
+    options = options or get_feed_settings()
+    size = options['SIZE']
+    products = Product.objects.filter(is_active=True).select_related('category')
+
+    if name == FEATURED:
+        candidates = list(products.filter(is_featured=True).order_by('-sales')[:size * 20])
+        velocity = _velocity([product.id for product in candidates], options['VELOCITY_DAYS'])
+    elif name == TRENDING:
+        # Everything that sold recently, plus the best sellers overall
+        velocity = _velocity(None, options['VELOCITY_DAYS'])
+        top_ids = set(
+            products.filter(stock__gt=0).order_by('-sales').values_list('id', flat=True)[:size * 4]
+        )
+        candidates = list(products.filter(stock__gt=0, id__in=top_ids | set(velocity)))
+    else:
+        raise ValueError(f'Unknown feed: {name}')
+
+    ranked = [
+        (product, score_product(product, velocity.get(product.id, 0), options))
+        for product in candidates
+    ]
+    ranked.sort(key=lambda pair: pair[1], reverse=True)
+    return ranked[:size]
+
+
+def refresh_feed(name, options=None):
+    """Recompute a feed and replace it in Redis. Returns the item count."""
+    ranked = rank_products(name, options)
+    items = ProductListSerializer([product for product, _ in ranked], many=True).data
+
+    key, items_key, generation_key = _keys(name)
+    pipe = _get_client().pipeline(transaction=True)
+    pipe.delete(key, items_key)
+    if ranked:
+        pipe.zadd(key, {str(product.id): score for product, score in ranked})
+        pipe.hset(items_key, mapping={
+            str(item['id']): json.dumps(item, cls=JSONEncoder, ensure_ascii=False)
+            for item in items
+        })
+    pipe.set(generation_key, str(time.time_ns()))
+    pipe.execute()
+    return len(ranked)
+
+
+def refresh_feeds():
+    options = get_feed_settings()
+    return {name: refresh_feed(name, options) for name in FEEDS}
+
+
+def get_feed(name, limit):
+    """
+    Return ``(generation, items)`` for the top ``limit`` products of a
+    feed. Raises ``FeedNotReady`` if it was never computed.
+    """
+    _get_client()
+    key, items_key, generation_key = _keys(name)
+    generation, items = _read_script(keys=[key, items_key, generation_key], args=[limit])
+    if generation is None:
+        raise FeedNotReady(name)
+    return generation, [json.loads(item) for item in items if item is not None]
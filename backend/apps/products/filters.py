@@ -0,0 +1,135 @@
+"""
+Filter sets for products API.
+"""
+
+import re
+
+import django_filters
+from django.db import connections
+from django.db.models import Q
+
+from .category_tree import descendant_ids_query, get_descendant_ids
+from .models import Product
+
+SPEC_PARAM_PREFIX = 'spec.'
+MAX_SPEC_FILTERS = 10
+
+# Keys end up in ORM lookups, so no ``__`` (it would chain a transform)
+SPEC_KEY_RE = re.compile(r'[A-Za-z0-9_]+')
+
+NUMBER_RE = re.compile(r'-?\d{1,15}(\.\d{1,15})?')
+
+
+def is_valid_spec_key(key):
+    return bool(SPEC_KEY_RE.fullmatch(key)) and '__' not in key
+
+
+def spec_params(params):
+    return [param for param in params if param.startswith(SPEC_PARAM_PREFIX)]
+
+
+def invalid_spec_keys(params):
+    """Keys of ``spec.<key>`` parameters that can't be filtered on."""
+    return [
+        param[len(SPEC_PARAM_PREFIX):]
+        for param in spec_params(params)
+        if not is_valid_spec_key(param[len(SPEC_PARAM_PREFIX):])
+    ]
+
+
+def spec_filters(params):
+    """
+    ``{key: [values]}`` from ``spec.<key>=<value>`` query parameters.
+    Repeating a parameter matches any of its values; invalid keys are
+    skipped.
+    """
+    specs = {}
+    for param in params:
+        if not param.startswith(SPEC_PARAM_PREFIX):
+            continue
+        key = param[len(SPEC_PARAM_PREFIX):]
+        if not is_valid_spec_key(key):
+            continue
+        values = [value for value in params.getlist(param) if value != '']
+        if key and values:
+            specs[key] = values
+    return specs
+
+
+def spec_values(value):
+    """
+    JSON values a query value matches: the string itself and, if it
+    reads as a number, that number (``spec.ram=16`` matches ``16`` and
+    ``"16"``).
+    """
+    values = [value]
+    if NUMBER_RE.fullmatch(value):
+        number = float(value)
+        values.append(int(number) if number.is_integer() else number)
+    return values
+
+
+def filter_specifications(queryset, specs):
+    """
+    Restrict ``queryset`` to products whose ``specifications`` match every
+    key in ``specs`` (any of its values, as strings or numbers).
+
+    On PostgreSQL this uses JSONB containment (``@>``), which is served by
+    the ``products_specifications_gin`` index; other databases compare
+    the extracted key instead.
+    """
+    containment = connections[queryset.db].features.supports_json_field_contains
+    for key, values in specs.items():
+        condition = Q()
+        for value in values:
+            for candidate in spec_values(value):
+                if containment:
+                    condition |= Q(specifications__contains={key: candidate})
+                else:
+                    condition |= Q(**{f'specifications__{key}': candidate})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+class ProductFilter(django_filters.FilterSet):
+    """
+    Product list filters.
+
+    Besides the declared fields, ``spec.<key>=<value>`` parameters filter
+    on ``Product.specifications``; keys are limited to letters, digits
+    and single underscores, and at most ``MAX_SPEC_FILTERS`` keys are
+    accepted.
+    """
+    category_tree = django_filters.UUIDFilter(method='filter_category_tree')
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+
+    class Meta:
+        model = Product
+        fields = ['category', 'is_featured']
+
+    def is_valid(self):
+        valid = super().is_valid()
+        invalid = invalid_spec_keys(self.data)
+        if invalid:
+            self.form.add_error(None, f'Invalid specification keys: {", ".join(invalid)}')
+            return False
+        if len(spec_params(self.data)) > MAX_SPEC_FILTERS:
+            self.form.add_error(None, f'At most {MAX_SPEC_FILTERS} specification filters are allowed')
+            return False
+        return valid
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        specs = spec_filters(self.data)
+        if specs:
+            queryset = filter_specifications(queryset, specs)
+        return queryset
+
+    def filter_category_tree(self, queryset, name, value):
+        """Products in a category or any of its subcategories."""
+        ids = get_descendant_ids(value)
+        if ids is None:
+            # Not in the cached tree (hidden, or the cache predates it); resolve through MPTT
+            return queryset.filter(category_id__in=descendant_ids_query(value))
+        return queryset.filter(category_id__in=ids)
@@ -0,0 +1,96 @@
+"""
+Inventory operations.
+
+Stock moves happen in one UPDATE per call using CASE expressions over
+the affected product ids. Reservations lock the product rows first, in
+ascending id order so concurrent checkouts can't deadlock, and the
+``products_stock_non_negative`` check constraint is the final guard
+against overselling on databases without row locks.
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, When
+from django.db.models.functions import Now
+
+from .models import Product
+from .versioning import CATALOG, bump_version_on_commit, product_version
+
+
+class InsufficientStock(Exception):
+    """Raised when a reservation asks for more than is in stock."""
+
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        super().__init__(f'Only {product.stock} items of {product.name} available in stock')
+
+
+def _aggregate(lines):
+    """Sum ``(product_id, quantity)`` pairs per product."""
+    quantities = Counter()
+    for product_id, quantity in lines:
+        quantities[product_id] += quantity
+    return quantities
+
+
+def _adjust(field, quantities, sign):
+    if not quantities:
+        return 0
+    updated = Product.objects.filter(id__in=list(quantities)).update(
+        updated_at=Now(),
+        **{field: Case(
+            *[When(id=product_id, then=F(field) + sign * quantity)
+              for product_id, quantity in quantities.items()],
+            default=F(field),
+        )},
+    )
+    # Stock and sales are shown in listings and product details
+    bump_version_on_commit(CATALOG, *(product_version(product_id) for product_id in quantities))
+    return updated
+
+
+def reserve_stock(lines):
+    """
+    Take stock for ``(product_id, quantity)`` pairs.
+
+    Must run inside the caller's transaction so the reservation rolls
+    back with it. Raises ``InsufficientStock`` if any product is short.
+    """
+    quantities = _aggregate(lines)
+    products = (
+        Product.objects
+        .select_for_update()
+        .filter(id__in=list(quantities))
+        .order_by('id')
+        .only('id', 'name', 'stock')
+    )
+    for product in products:
+        if product.stock < quantities[product.id]:
+            raise InsufficientStock(product, quantities[product.id])
+
+    try:
+        with transaction.atomic():
+            _adjust('stock', quantities, -1)
+    except IntegrityError:
+        # Lost a race on a database that ignores SELECT ... FOR UPDATE
+        for product in Product.objects.filter(id__in=list(quantities)).only('id', 'name', 'stock'):
+            if product.stock < quantities[product.id]:
+                raise InsufficientStock(product, quantities[product.id])
+        raise
+
+
+def release_stock(lines):
+    """Return reserved stock for ``(product_id, quantity)`` pairs."""
+    return _adjust('stock', _aggregate(lines), 1)
+
+
+def record_sales(lines):
+    """Move ``sales`` forward for ``(product_id, quantity)`` pairs."""
+    return _adjust('sales', _aggregate(lines), 1)
+
+
+def order_lines(order):
+    """``(product_id, quantity)`` pairs for an order's items."""
+    return list(order.items.values_list('product_id', 'quantity'))
@@ -0,0 +1,121 @@
+"""
+Benchmark filtering products by a whole category branch.
+"""
+
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from apps.products.category_tree import (
+    descendant_ids_query,
+    get_descendant_ids,
+    invalidate_category_tree,
+)
+from apps.products.models import Category, Product
+
+BENCH_CATEGORY_NAME = '__benchmark_tree__'
+
+
+class Command(BaseCommand):
+    help = 'Compare per-leaf requests, the MPTT interval subquery and the cached tree for branch filtering'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fanout', type=int, default=10, help='Children per category')
+        parser.add_argument('--depth', type=int, default=3, help='Levels below the benchmark root')
+        parser.add_argument('--products-per-leaf', type=int, default=20, help='Products in each leaf category')
+        parser.add_argument('--queries', type=int, default=30, help='Branches filtered per strategy')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated categories and products')
+
+    def handle(self, *args, **options):
+        if options['fanout'] <= 0 or options['depth'] <= 0:
+            raise CommandError('--fanout and --depth must be positive')
+
+        root, levels = self.build_tree(options['fanout'], options['depth'], options['products_per_leaf'])
+        try:
+            # Branches one level below the root: the "top-level category" case
+            branches = [random.choice(levels[1]) for _ in range(options['queries'])]
+            leaves_by_branch = {
+                branch.id: list(
+                    branch.get_descendants().filter(lft=F('rght') - 1).values_list('id', flat=True)
+                )
+                for branch in set(branches)
+            }
+            get_descendant_ids(root.id)  # warm the cached tree
+
+            self.report('per-leaf requests', self.measure(branches, lambda branch: [
+                list(Product.objects.filter(is_active=True, category_id=leaf_id)[:20])
+                for leaf_id in leaves_by_branch[branch.id]
+            ]))
+            self.report('MPTT interval', self.measure(branches, lambda branch: list(
+                Product.objects.filter(
+                    is_active=True, category_id__in=descendant_ids_query(branch.id)
+                )[:20]
+            )))
+            self.report('cached tree IN', self.measure(branches, lambda branch: list(
+                Product.objects.filter(
+                    is_active=True, category_id__in=get_descendant_ids(branch.id)
+                )[:20]
+            )))
+        finally:
+            if not options['keep']:
+                Product.objects.filter(category__tree_id=root.tree_id).delete()
+                root.delete()
+                invalidate_category_tree()
+
+    def build_tree(self, fanout, depth, products_per_leaf):
+        total = sum(fanout ** level for level in range(1, depth + 1))
+        self.stdout.write(
+            f'Building {total} categories and {fanout ** depth * products_per_leaf} products...'
+        )
+        with transaction.atomic(), Category.objects.disable_mptt_updates():
+            root = Category.objects.create(name=BENCH_CATEGORY_NAME, parent=None, lft=0, rght=0, tree_id=0, level=0)
+            levels = [[root]]
+            for level in range(1, depth + 1):
+                nodes = [
+                    Category(name=f'{parent.name[:40]}-{index}', parent=parent, lft=0, rght=0, tree_id=0, level=0)
+                    for parent in levels[-1]
+                    for index in range(fanout)
+                ]
+                Category.objects.bulk_create(nodes, batch_size=1000)
+                levels.append(nodes)
+
+            products = [
+                Product(
+                    name=f'{leaf.name} #{index}',
+                    description='benchmark',
+                    price=Decimal(random.randint(100, 100000)) / 100,
+                    stock=random.randint(0, 100),
+                    category=leaf,
+                    main_image='https://placehold.co/800x800',
+                )
+                for leaf in levels[-1]
+                for index in range(products_per_leaf)
+            ]
+            Product.objects.bulk_create(products, batch_size=5000)
+        Category.objects.rebuild()
+        invalidate_category_tree()
+
+        root.refresh_from_db()
+        for node in levels[1]:
+            node.refresh_from_db(fields=['lft', 'rght', 'tree_id', 'level'])
+        return root, levels
+
+    def measure(self, branches, run):
+        timings = []
+        for branch in branches:
+            start = time.perf_counter()
+            run(branch)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def report(self, label, timings):
+        timings = sorted(timings)
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f'{label:<18} p50={statistics.median(timings):8.2f}ms  '
+            f'p95={p95:8.2f}ms  max={timings[-1]:8.2f}ms'
+        )
@@ -0,0 +1,64 @@
+"""
+Compare DRF's JSONRenderer with the orjson renderer on real API payloads.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from apps.orders.api.serializers import OrderListSerializer
+from apps.orders.models import Order, OrderItem
+from apps.products.api.serializers import ProductListSerializer
+from apps.products.models import Product
+from core.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark JSONRenderer vs ORJSONRenderer on product list and order list payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100, help='Products per rendered payload')
+        parser.add_argument('--orders', type=int, default=100, help='Orders per rendered payload')
+        parser.add_argument('--rounds', type=int, default=500, help='Renders per payload and renderer')
+
+    def handle(self, *args, **options):
+        if options['rounds'] <= 0:
+            raise CommandError('--rounds must be positive')
+
+        products = Product.objects.filter(is_active=True).order_by('-created_at')[:options['products']]
+        items = OrderItem.objects.only('id', 'order_id', 'product_image', 'quantity')
+        orders = (
+            Order.objects
+            .order_by('-created_at')
+            .prefetch_related(Prefetch('items', queryset=items))[:options['orders']]
+        )
+        payloads = [
+            ('product list', ProductListSerializer(products, many=True).data),
+            ('order list', OrderListSerializer(orders, many=True).data),
+        ]
+
+        for label, data in payloads:
+            if not data:
+                self.stdout.write(self.style.WARNING(f'{label}: no rows, skipped'))
+                continue
+
+            baseline = JSONRenderer().render(data)
+            fast = ORJSONRenderer().render(data)
+            if fast != baseline:
+                self.stdout.write(self.style.ERROR(f'{label}: output differs from JSONRenderer'))
+
+            results = {}
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                start = time.perf_counter()
+                for _ in range(options['rounds']):
+                    renderer.render(data)
+                results[type(renderer).__name__] = (time.perf_counter() - start) / options['rounds']
+
+            stock = results['JSONRenderer']
+            orjson = results['ORJSONRenderer']
+            self.stdout.write(
+                f'{label:<13} rows={len(data):<5} bytes={len(baseline):<8} '
+                f'JSONRenderer={stock * 1000:7.3f}ms  ORJSONRenderer={orjson * 1000:7.3f}ms  '
+                f'speedup={stock / orjson:5.1f}x'
+            )
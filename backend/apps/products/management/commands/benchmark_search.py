@@ -0,0 +1,128 @@
+"""
+Benchmark product search latency at different catalog sizes.
+"""
+
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Q
+from apps.products.models import Category, Product
+from apps.products.search import search_products, supports_trigram_search
+
+BENCH_CATEGORY_NAME = '__benchmark__'
+WORDS = [
+    '手机', '电脑', '耳机', '手表', '平板', 'Pro', 'Max', 'Ultra', 'Air', 'Lite',
+    '华为', '小米', '联想', '索尼', '苹果', '无线', '蓝牙', '降噪', '轻薄', '旗舰',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark plain ILIKE search against ranked product search at given product counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[100_000, 1_000_000],
+            help='Product counts to benchmark at',
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=50,
+            help='Number of search queries per backend and size',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='bulk_create batch size used when seeding products',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the generated benchmark products afterwards',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.all()
+        if not supports_trigram_search(queryset):
+            self.stdout.write(self.style.WARNING(
+                'Database is not PostgreSQL; searches run without trigram indexes.'
+            ))
+
+        category, _ = Category.objects.get_or_create(name=BENCH_CATEGORY_NAME, parent=None)
+        try:
+            for size in sorted(options['sizes']):
+                self.seed(category, size, options['batch_size'])
+                self.analyze()
+
+                terms = [random.choice(WORDS) for _ in range(options['queries'])]
+                ilike = self.measure(lambda term: Product.objects.filter(
+                    Q(name__icontains=term) | Q(description__icontains=term)
+                )[:20], terms)
+                self.report(size, 'ILIKE', ilike)
+
+                ranked = self.measure(lambda term: search_products(
+                    Product.objects.all(), [term]
+                ).order_by('-search_rank')[:20], terms)
+                self.report(size, 'ranked', ranked)
+        finally:
+            if not options['keep']:
+                Product.objects.filter(category=category).delete()
+                category.delete()
+
+    def seed(self, category, size, batch_size):
+        """Top up the benchmark category until the table holds ``size`` rows."""
+        missing = size - Product.objects.count()
+        if missing <= 0:
+            return
+        if batch_size <= 0:
+            raise CommandError('--batch-size must be positive')
+
+        self.stdout.write(f'Seeding {missing} products...')
+        while missing > 0:
+            chunk = min(batch_size, missing)
+            products = []
+            for _ in range(chunk):
+                # Chinese names aren't space separated, e.g. 小米平板Pro
+                name = ''.join(random.sample(WORDS, 3))
+                products.append(Product(
+                    name=name,
+                    description=' '.join(random.choices(WORDS, k=30)),
+                    price=Decimal(random.randint(100, 500000)) / 100,
+                    stock=random.randint(0, 500),
+                    category=category,
+                    main_image='https://placehold.co/800x800',
+                    specifications={'brand': random.choice(WORDS), 'origin': '国产'},
+                ))
+            with transaction.atomic():
+                Product.objects.bulk_create(products, batch_size=batch_size)
+            missing -= chunk
+
+    def analyze(self):
+        connection = connections[Product.objects.db]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE products')
+
+    def measure(self, build_query, terms):
+        timings = []
+        for term in terms:
+            start = time.perf_counter()
+            list(build_query(term))
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def report(self, size, label, timings):
+        timings = sorted(timings)
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f'{size:>10} products  {label:<10} '
+            f'p50={statistics.median(timings):8.2f}ms  p95={p95:8.2f}ms  max={timings[-1]:8.2f}ms'
+        )
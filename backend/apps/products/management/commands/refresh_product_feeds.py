@@ -0,0 +1,20 @@
+"""
+Recompute the precomputed product feeds.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.products.feeds import FEEDS, get_feed_settings, refresh_feed
+
+
+class Command(BaseCommand):
+    help = 'Rank products and store the featured/trending feeds in Redis'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--feed', choices=FEEDS, action='append', help='Feed to refresh (default: all)')
+
+    def handle(self, *args, **options):
+        settings = get_feed_settings()
+        for name in options['feed'] or FEEDS:
+            count = refresh_feed(name, settings)
+            self.stdout.write(self.style.SUCCESS(f'{name}: {count} products'))
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# icontains compiles to UPPER(col) LIKE UPPER(...) on PostgreSQL, so the
+# trigram indexes are on the same expressions (see apps.products.search)
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+    "CREATE INDEX IF NOT EXISTS products_name_trgm ON products USING gin (UPPER(name) gin_trgm_ops);",
+    "CREATE INDEX IF NOT EXISTS products_description_trgm ON products USING gin (UPPER(description) gin_trgm_ops);",
+    "CREATE INDEX IF NOT EXISTS products_specifications_trgm ON products "
+    "USING gin (UPPER((jsonb_path_query_array(specifications, '$.*'))::text) gin_trgm_ops);",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS products_name_trgm;",
+    "DROP INDEX IF EXISTS products_description_trgm;",
+    "DROP INDEX IF EXISTS products_specifications_trgm;",
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in FORWARD_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in REVERSE_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_search_trigram'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_created_a77fb9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_sales_652a81_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_price_fe467e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created_at', '-id'], name='products_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-sales', '-id'], name='products_sales_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price', 'id'], name='products_price_id_idx'),
+        ),
+    ]
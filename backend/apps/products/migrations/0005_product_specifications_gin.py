@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def create_specifications_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # jsonb_path_ops only supports @>, which is all the spec filters use,
+    # and is smaller and faster than the default jsonb_ops
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS products_specifications_gin "
+        "ON products USING gin (specifications jsonb_path_ops);"
+    )
+
+
+def drop_specifications_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS products_specifications_gin;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_stock_non_negative'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_specifications_index, drop_specifications_index),
+    ]
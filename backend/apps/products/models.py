@@ -46,6 +46,10 @@ class Category(MPTTModel):
         verbose_name = '商品分类'
         verbose_name_plural = '商品分类'
         ordering = ['order', 'name']
+        indexes = [
+            # Subtree lookups by MPTT interval (category_tree filter)
+            models.Index(fields=['tree_id', 'lft', 'rght'], name='categories_tree_interval_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -105,9 +109,13 @@ class Product(models.Model):
         verbose_name_plural = '商品'
         ordering = ['-is_featured', '-created_at']
         indexes = [
-            models.Index(fields=['-created_at']),
-            models.Index(fields=['-sales']),
-            models.Index(fields=['price']),
+            # Sort key plus id tiebreaker for keyset pagination
+            models.Index(fields=['-created_at', '-id'], name='products_created_id_idx'),
+            models.Index(fields=['-sales', '-id'], name='products_sales_id_idx'),
+            models.Index(fields=['price', 'id'], name='products_price_id_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(check=models.Q(stock__gte=0), name='products_stock_non_negative'),
         ]
 
     def __str__(self):
@@ -0,0 +1,88 @@
+"""
+Product search backend.
+
+Every search term must occur in the product's name, description or
+specification values as a case-insensitive substring. PostgreSQL's text-search parsers don't split
+Chinese text into words (``小米平板 6`` is one token plus ``6``), so the
+catalog is matched on substrings rather than tsvector lexemes. On
+PostgreSQL the ``ILIKE`` predicates are served by the ``pg_trgm`` GIN
+indexes from migration 0002 and name matches are ranked by trigram
+similarity; other databases (SQLite in development) run the same filter.
+"""
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, FloatField, Func, Q, TextField, Value, When
+from rest_framework import filters
+
+
+def supports_trigram_search(queryset):
+    """Whether the database behind ``queryset`` has ``pg_trgm``."""
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+class SpecificationValues(Func):
+    """
+    The values of ``Product.specifications`` as one string, keys left out
+    so that searching for a key name doesn't match every product. The
+    PostgreSQL expression is the one ``products_specifications_trgm``
+    indexes.
+    """
+    function = 'jsonb_path_query_array'
+    template = "(%(function)s(%(expressions)s, '$.*'))::text"
+    output_field = TextField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template="(SELECT group_concat(value, ' ') FROM json_each(%(expressions)s))",
+            **extra_context
+        )
+
+
+def search_products(queryset, terms):
+    """
+    Filter ``queryset`` to products matching every term and annotate
+    ``search_rank``. Products whose name contains every term rank first,
+    then those matching on name and description, then the ones that need
+    the specifications to match.
+    """
+    queryset = queryset.alias(specification_values=SpecificationValues('specifications'))
+    matches = Q()
+    text_matches = Q()
+    name_matches = Q()
+    for term in terms:
+        text_match = Q(name__icontains=term) | Q(description__icontains=term)
+        matches &= text_match | Q(specification_values__icontains=term)
+        text_matches &= text_match
+        name_matches &= Q(name__icontains=term)
+
+    rank = Case(
+        When(name_matches, then=Value(1.0)),
+        When(text_matches, then=Value(0.5)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    if supports_trigram_search(queryset):
+        rank = rank + TrigramSimilarity('name', ' '.join(terms))
+    return queryset.filter(matches).annotate(search_rank=rank)
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    Substring search filter for products.
+
+    Results are ordered by rank unless the client asked for an explicit
+    ``ordering``; place this backend after ``OrderingFilter``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        queryset = search_products(queryset, search_terms)
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            default_ordering = getattr(view, 'ordering', None) or []
+            queryset = queryset.order_by('-search_rank', *default_ordering)
+        return queryset
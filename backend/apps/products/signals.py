@@ -0,0 +1,56 @@
+"""
+Signal handlers for products app.
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, Product, ProductImage
+from .category_tree import invalidate_category_tree
+from .versioning import CATALOG, CATEGORIES, bump_version_on_commit, product_version
+
+
+@receiver(post_init, sender=Product)
+def remember_product_category(sender, instance, **kwargs):
+    """Keep the loaded category so a save can tell whether it moved."""
+    # Read __dict__ so a deferred category_id isn't fetched
+    instance._loaded_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """Category structure changed: the tree, listings and category ETags."""
+    invalidate_category_tree()
+    bump_version_on_commit(CATALOG, CATEGORIES)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    """
+    Listing ETags and the product's cached detail must change; the tree
+    (product counts) only when a product is added or changes category.
+    """
+    names = [CATALOG, product_version(instance.pk)]
+    loaded = instance._loaded_category_id
+    # None means category_id was deferred, and so not written by this save
+    if created or (loaded is not None and loaded != instance.category_id):
+        invalidate_category_tree()
+        names.append(CATEGORIES)
+    instance._loaded_category_id = instance.category_id
+    bump_version_on_commit(*names)
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    invalidate_category_tree()
+    bump_version_on_commit(CATALOG, CATEGORIES, product_version(instance.pk))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def touch_product_on_image_change(sender, instance, **kwargs):
+    """Images are part of the product detail (ETag and cached response)."""
+    Product.objects.filter(id=instance.product_id).update(updated_at=timezone.now())
+    bump_version_on_commit(product_version(instance.product_id))
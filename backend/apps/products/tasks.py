@@ -0,0 +1,13 @@
+"""
+Celery tasks for products app.
+"""
+
+from celery import shared_task
+
+from .feeds import refresh_feeds
+
+
+@shared_task
+def refresh_product_feeds():
+    """Recompute the featured and trending feeds in Redis."""
+    return refresh_feeds()
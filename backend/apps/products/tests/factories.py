@@ -0,0 +1,28 @@
+"""
+Factories for product models.
+"""
+
+from decimal import Decimal
+
+import factory
+
+from apps.products.models import Category, Product
+
+
+class CategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Category
+
+    name = factory.Sequence(lambda n: f'分类{n}')
+
+
+class ProductFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Product
+
+    name = factory.Sequence(lambda n: f'商品{n}')
+    description = '商品描述'
+    price = Decimal('99.00')
+    stock = 100
+    category = factory.SubFactory(CategoryFactory)
+    main_image = 'https://placehold.co/800x800'
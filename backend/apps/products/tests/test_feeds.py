@@ -0,0 +1,27 @@
+"""
+Tests for the product feed endpoints.
+"""
+
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from redis.exceptions import ConnectionError, TimeoutError
+from rest_framework.test import APIClient
+
+from .factories import ProductFactory
+
+
+class ProductFeedFallbackTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.featured = ProductFactory(is_featured=True)
+        ProductFactory(is_featured=False)
+
+    def test_unreachable_redis_falls_back_to_ranking_from_the_database(self):
+        for error in (ConnectionError('refused'), TimeoutError('timed out')):
+            with self.subTest(error=error), mock.patch('apps.products.api.views.get_feed', side_effect=error):
+                response = APIClient().get(reverse('featured_products'))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([item['id'] for item in response.data], [str(self.featured.id)])
@@ -0,0 +1,74 @@
+"""
+Tests for product list filters.
+"""
+
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.products.category_tree import invalidate_category_tree
+from apps.products.filters import MAX_SPEC_FILTERS
+from .factories import CategoryFactory, ProductFactory
+
+
+class SpecificationFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.xiaomi = ProductFactory(specifications={'brand': '小米', 'screen_size': '11', 'ram': 16})
+        ProductFactory(specifications={'brand': '华为', 'ram': 8})
+
+    def get(self, params):
+        return APIClient().get(reverse('product_list'), params)
+
+    def test_filters_on_a_specification_key(self):
+        response = self.get({'spec.brand': '小米', 'spec.screen_size': '11'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data['results']], [str(self.xiaomi.id)])
+
+    def test_numeric_specifications_match_their_text(self):
+        response = self.get({'spec.ram': '16'})
+        self.assertEqual([item['id'] for item in response.data['results']], [str(self.xiaomi.id)])
+
+    def test_too_many_specification_filters_are_rejected(self):
+        params = {f'spec.key{index}': 'x' for index in range(MAX_SPEC_FILTERS + 1)}
+        self.assertEqual(self.get(params).status_code, 400)
+
+    def test_keys_that_could_build_other_lookups_are_rejected(self):
+        for key in ('brand__contains', 'brand__0', 'brand name', '品牌', 'a-b', '__class__'):
+            with self.subTest(key=key):
+                self.assertEqual(self.get({f'spec.{key}': 'x'}).status_code, 400)
+
+
+class CategoryTreeFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.root = CategoryFactory()
+        cls.child = CategoryFactory(parent=cls.root)
+        cls.hidden = CategoryFactory(parent=cls.root, is_active=False)
+        cls.below_hidden = CategoryFactory(parent=cls.hidden)
+        cls.expected = [ProductFactory(category=cls.root), ProductFactory(category=cls.child)]
+        ProductFactory(category=cls.hidden)
+        ProductFactory(category=cls.below_hidden)
+        ProductFactory()
+
+    def setUp(self):
+        invalidate_category_tree()
+
+    def ids(self, category):
+        response = APIClient().get(reverse('product_list'), {'category_tree': str(category.id)})
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['id'] for item in response.data['results'])
+
+    def test_matches_the_visible_subtree(self):
+        self.assertEqual(self.ids(self.root), sorted(str(product.id) for product in self.expected))
+
+    def test_database_fallback_matches_the_cached_tree(self):
+        cached = self.ids(self.root)
+        with mock.patch('apps.products.filters.get_descendant_ids', return_value=None):
+            self.assertEqual(self.ids(self.root), cached)
+            self.assertEqual(self.ids(self.hidden), [])
+            self.assertEqual(self.ids(self.below_hidden), [])
@@ -0,0 +1,45 @@
+"""
+Tests for product search.
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.products.models import Product
+from apps.products.search import search_products
+from .factories import ProductFactory
+
+
+class ProductSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tablet = ProductFactory(name='小米平板 6', description='11英寸 2.8K 屏幕')
+        cls.phone = ProductFactory(name='华为 Mate 60', description='旗舰手机，支持平板协同')
+        cls.watch = ProductFactory(name='华为手表', description='运动健康')
+        cls.case = ProductFactory(name='保护壳', description='硅胶材质', specifications={'model': '小米平板'})
+
+    def search(self, term):
+        response = APIClient().get(reverse('product_list'), {'search': term})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_part_of_chinese_name_matches(self):
+        for term in ('平板', '小米', '小米平板'):
+            with self.subTest(term=term):
+                self.assertIn(str(self.tablet.id), self.search(term))
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search('华为 手表'), [str(self.watch.id)])
+
+    def test_name_matches_rank_above_description_and_specification_matches(self):
+        self.assertEqual(self.search('平板'), [str(self.tablet.id), str(self.phone.id), str(self.case.id)])
+
+    def test_specification_values_match_but_keys_do_not(self):
+        self.assertEqual(self.search('硅胶 小米'), [str(self.case.id)])
+        self.assertEqual(self.search('model'), [])
+
+    def test_search_products_annotates_rank(self):
+        results = search_products(Product.objects.all(), ['平板']).order_by('-search_rank')
+        self.assertEqual(list(results), [self.tablet, self.phone, self.case])
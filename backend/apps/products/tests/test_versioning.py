@@ -0,0 +1,70 @@
+"""
+Tests for catalog version bumps and the product detail cache keys.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.products.models import Product
+from apps.products.versioning import CATALOG, CATEGORIES, get_version, product_version
+from .factories import CategoryFactory, ProductFactory
+
+
+class VersionBumpTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.product = ProductFactory()
+
+    def save(self, product, **kwargs):
+        before = {name: get_version(name)[0] for name in (CATALOG, CATEGORIES, product_version(product.pk))}
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save(**kwargs)
+        return {name for name, version in before.items() if get_version(name)[0] != version}
+
+    def test_product_save_leaves_the_category_version_alone(self):
+        self.product.stock = 3
+        self.assertEqual(self.save(self.product), {CATALOG, product_version(self.product.pk)})
+
+    def test_moving_a_product_bumps_the_category_version(self):
+        self.product.category = CategoryFactory()
+        self.assertIn(CATEGORIES, self.save(self.product))
+
+    def test_save_of_a_deferred_load_leaves_the_category_version_alone(self):
+        product = Product.objects.only('id', 'stock').get(pk=self.product.pk)
+        product.stock = 7
+        self.assertNotIn(CATEGORIES, self.save(product))
+
+
+class ProductDetailCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.product = ProductFactory()
+        self.url = reverse('product_detail', kwargs={'id': self.product.id})
+
+    def get(self):
+        response = APIClient().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_category_rename_is_served_without_rebuilding_the_entry(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        category = self.product.category
+        category.name = '新分类名'
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save()
+
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'HIT-LOCAL')
+        self.assertEqual(response.data['category']['name'], '新分类名')
+
+    def test_new_product_in_the_category_updates_the_nested_count(self):
+        self.assertEqual(self.get().data['category']['product_count'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductFactory(category=self.product.category)
+        self.assertEqual(self.get().data['category']['product_count'], 2)
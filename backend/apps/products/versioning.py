@@ -0,0 +1,89 @@
+"""
+Catalog version counters.
+
+Cheap, cache-backed counters that change whenever catalog data does.
+They back the ETag/Last-Modified headers of listing endpoints, where
+computing a real modification time would cost as much as the response.
+
+``CATALOG`` covers anything shown in product listings (including stock
+and sales); ``CATEGORIES`` covers the category tree and its product
+counts, so it moves only when a category changes or a product is added,
+deleted or moved to another category; ``product_version(id)`` covers a
+single product's detail. Counters start from the current time in
+milliseconds, so a flushed cache never hands out a previously used
+value.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG = 'catalog'
+CATEGORIES = 'categories'
+
+VERSION_CACHE_PREFIX = 'products:version:'
+
+
+def product_version(product_id):
+    """Counter name for one product's detail data."""
+    return f'product:{product_id}'
+
+
+def _keys(name):
+    key = f'{VERSION_CACHE_PREFIX}{name}'
+    return key, f'{key}:modified'
+
+
+def get_versions(*names):
+    """
+    Return ``{name: (version, last_modified)}`` for the given counters in
+    one cache round trip, initialising missing ones.
+    """
+    keys = {name: _keys(name) for name in names}
+    all_keys = [key for pair in keys.values() for key in pair]
+    values = cache.get_many(all_keys)
+    if len(values) < len(all_keys):
+        now = time.time()
+        for key, modified_key in keys.values():
+            if key not in values:
+                cache.add(key, int(now * 1000), None)
+            if modified_key not in values:
+                cache.add(modified_key, now, None)
+        values = cache.get_many(all_keys)
+    return {
+        name: (
+            values.get(key, 0),
+            datetime.fromtimestamp(int(values.get(modified_key, 0)), tz=timezone.utc),
+        )
+        for name, (key, modified_key) in keys.items()
+    }
+
+
+def get_version(name):
+    """
+    Return ``(version, last_modified)`` for a counter, initialising it
+    on first use.
+    """
+    return get_versions(name)[name]
+
+
+def bump_version(*names):
+    """Advance the given counters now."""
+    now = time.time()
+    for name in names:
+        key, modified_key = _keys(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(now * 1000), None)
+        cache.set(modified_key, now, None)
+
+
+def bump_version_on_commit(*names):
+    """
+    Advance the counters once the current transaction commits, so a
+    concurrent reader can't tag pre-commit data with the new version.
+    """
+    transaction.on_commit(lambda: bump_version(*names))
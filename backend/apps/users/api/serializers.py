@@ -2,13 +2,20 @@
 Serializers for users API.
 """
 
+from datetime import timedelta
+
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.utils import timezone
 from ..models import Address
 
 User = get_user_model()
 
+# ``last_login`` is written at most this often per user
+LAST_LOGIN_UPDATE_INTERVAL = timedelta(hours=1)
+
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -21,6 +28,21 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class LoginSerializer(TokenObtainPairSerializer):
+    """
+    Token pair login that records ``last_login`` without a write on
+    every login (use with ``SIMPLE_JWT['UPDATE_LAST_LOGIN'] = False``).
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        now = timezone.now()
+        last_login = self.user.last_login
+        if last_login is None or now - last_login >= LAST_LOGIN_UPDATE_INTERVAL:
+            User.objects.filter(pk=self.user.pk).update(last_login=now)
+        return data
+
+
 class UserDetailSerializer(serializers.ModelSerializer):
     """
     Detailed user serializer.
@@ -9,6 +9,7 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from .serializers import (
+    LoginSerializer,
     RegisterSerializer,
     UserSerializer,
     UserDetailSerializer,
@@ -41,6 +42,8 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Custom login view that returns user data along with tokens.
     """
+    serializer_class = LoginSerializer
+
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
         if response.status_code == 200:
@@ -66,7 +69,8 @@ def current_user(request):
     """
     Get current logged in user details.
     """
-    serializer = UserDetailSerializer(request.user)
+    # request.user is a cached snapshot; load the full row in one query
+    serializer = UserDetailSerializer(User.objects.get(pk=request.user.pk))
     return Response(serializer.data)
 
 
@@ -77,7 +81,7 @@ def update_profile(request):
     Update current user profile.
     """
     serializer = UserDetailSerializer(
-        request.user,
+        User.objects.get(pk=request.user.pk),
         data=request.data,
         partial=request.method == 'PATCH'
     )
@@ -0,0 +1,69 @@
+"""
+Compare request throughput with plain and cached JWT authentication.
+"""
+
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.cart.api.views import cart_summary
+from apps.orders.api.views import OrderListView
+from core.authentication import CachedJWTAuthentication, invalidate_user_snapshot
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark cart/order endpoints with JWTAuthentication vs CachedJWTAuthentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint and auth class')
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        user = User.objects.create_user(username=f'bench-{uuid.uuid4().hex[:8]}', password=None)
+        token = str(AccessToken.for_user(user))
+        factory = RequestFactory()
+        endpoints = [
+            ('GET /cart/', cart_summary, '/api/v1/cart/'),
+            ('GET /orders/', OrderListView.as_view(), '/api/v1/orders/'),
+        ]
+
+        def build_request(path):
+            return factory.get(path, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        originals = [view.cls.__dict__.get('authentication_classes') for _, view, _ in endpoints]
+        try:
+            for label, view, path in endpoints:
+                for auth_class in (JWTAuthentication, CachedJWTAuthentication):
+                    invalidate_user_snapshot(user.pk)
+                    view.cls.authentication_classes = [auth_class]
+
+                    # Warm up (fills the snapshot cache for the cached class)
+                    view(build_request(path))
+                    with CaptureQueriesContext(connection) as queries:
+                        view(build_request(path))
+
+                    start = time.perf_counter()
+                    for _ in range(count):
+                        response = view(build_request(path))
+                    elapsed = time.perf_counter() - start
+
+                    self.stdout.write(
+                        f'{label:<14} {auth_class.__name__:<24} '
+                        f'{count / elapsed:8.0f} req/s  {len(queries)} queries/request  '
+                        f'status={response.status_code}'
+                    )
+        finally:
+            for (_, view, _), original in zip(endpoints, originals):
+                if original is None:
+                    del view.cls.authentication_classes
+                else:
+                    view.cls.authentication_classes = original
+            user.delete()
@@ -1,8 +1,11 @@
 """
 Generate fake data for development and testing.
+
+``--bulk`` (or ``--scale``) switches to the bulk seeding engine in
+``core.seeding`` for load-test sized data sets.
 """
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
 from faker import Faker
 import random
@@ -10,6 +13,7 @@ from decimal import Decimal
 from apps.users.models import Address
 from apps.products.models import Category, Product, ProductImage
 from apps.cart.models import CartItem
+from core.seeding import SCALES, BulkSeeder
 
 User = get_user_model()
 fake = Faker(['zh_CN'])
@@ -22,8 +26,8 @@ class Command(BaseCommand):
         parser.add_argument(
             '--users',
             type=int,
-            default=10,
-            help='Number of users to create',
+            default=None,
+            help='Number of users to create (default: 10, or the --scale preset)',
         )
         parser.add_argument(
             '--categories',
@@ -37,9 +41,53 @@ class Command(BaseCommand):
             default=50,
             help='Number of products to create per subcategory',
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Use the bulk seeding engine (chunked bulk_create, process pool)',
+        )
+        parser.add_argument(
+            '--scale',
+            choices=sorted(SCALES),
+            help='Bulk preset: ' + ', '.join(
+                f'{name}={preset["products"]:,} products/{preset["order_items"]:,} order items'
+                for name, preset in SCALES.items()
+            ),
+        )
+        parser.add_argument(
+            '--total-products',
+            type=int,
+            help='Bulk mode: total number of products (overrides the preset)',
+        )
+        parser.add_argument(
+            '--order-items',
+            type=int,
+            help='Bulk mode: total number of order items (overrides the preset)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Bulk mode: rows per worker task and per bulk_create transaction',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Bulk mode: Faker worker processes (default: CPU count)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Bulk mode: random seed for reproducible data',
+        )
 
     def handle(self, *args, **options):
-        num_users = options['users']
+        if options['bulk'] or options['scale']:
+            return self.handle_bulk(options)
+
+        num_users = options['users'] if options['users'] is not None else 10
         num_categories = options['categories']
         num_products = options['products']
 
@@ -63,6 +111,32 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS('Data generation completed!'))
 
+    def handle_bulk(self, options):
+        preset = SCALES[options['scale'] or 'small']
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size must be positive')
+
+        def pick(option, key):
+            return options[option] if options[option] is not None else preset[key]
+
+        seeder = BulkSeeder(
+            users=pick('users', 'users'),
+            products=pick('total_products', 'products'),
+            order_items=pick('order_items', 'order_items'),
+            category_fanout=preset['category_fanout'],
+            num_categories=options['categories'],
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Bulk seeding {seeder.users:,} users, {seeder.products:,} products, '
+            f'{seeder.order_items:,} order items with {seeder.workers} workers...'
+        ))
+        seeder.seed_all()
+        self.stdout.write(self.style.SUCCESS('Data generation completed!'))
+
     def generate_categories(self, num_categories):
         """Generate category tree structure."""
         category_data = [
@@ -2,7 +2,7 @@
 User models.
 """
 
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
 from django.db import models
 import uuid
 
@@ -12,6 +12,28 @@ def user_avatar_path(instance, filename):
     return f'avatars/user_{instance.id}/{filename}'
 
 
+class UserQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        """
+        Bulk updates don't send ``post_save``, so drop the cached auth
+        snapshots of the affected users here when a snapshot field
+        (e.g. ``is_active``) changes.
+        """
+        from core.authentication import USER_SNAPSHOT_FIELDS, invalidate_user_snapshots
+
+        if not set(kwargs) & set(USER_SNAPSHOT_FIELDS):
+            return super().update(**kwargs)
+        user_ids = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        invalidate_user_snapshots(user_ids)
+        return updated
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
+
+
 class User(AbstractUser):
     """
     Custom user model with additional fields.
@@ -21,6 +43,8 @@ class User(AbstractUser):
     avatar = models.URLField(blank=True, null=True, verbose_name='头像')
     nickname = models.CharField(max_length=50, blank=True, null=True, verbose_name='昵称')
 
+    objects = UserManager()
+
     class Meta:
         db_table = 'users'
         verbose_name = '用户'
@@ -0,0 +1,23 @@
+"""
+Signal handlers for users app.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.authentication import USER_SNAPSHOT_FIELDS, invalidate_user_snapshot
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_snapshot_on_save(sender, instance, update_fields=None, **kwargs):
+    """Drop the cached auth snapshot unless only unrelated fields changed."""
+    if update_fields is not None and not set(update_fields) & set(USER_SNAPSHOT_FIELDS):
+        # e.g. update_last_login only touches last_login
+        return
+    invalidate_user_snapshot(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_snapshot_on_delete(sender, instance, **kwargs):
+    invalidate_user_snapshot(instance.pk)
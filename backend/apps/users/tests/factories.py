@@ -0,0 +1,29 @@
+"""
+Factories for user models.
+"""
+
+import factory
+from django.contrib.auth import get_user_model
+
+from apps.users.models import Address
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = get_user_model()
+
+    username = factory.Sequence(lambda n: f'user{n}')
+    password = factory.django.Password('password')
+
+
+class AddressFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Address
+
+    user = factory.SubFactory(UserFactory)
+    receiver_name = '张三'
+    receiver_phone = '13800000000'
+    province = '北京市'
+    city = '北京市'
+    district = '朝阳区'
+    detail = '建国路 1 号'
@@ -0,0 +1,90 @@
+"""
+Tests for cached JWT authentication and login.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import CachedJWTAuthentication
+from .factories import UserFactory
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        token = AccessToken.for_user(self.user)
+        self.request = Request(RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+    def authenticate(self):
+        user, _ = CachedJWTAuthentication().authenticate(self.request)
+        return user
+
+    def test_repeat_requests_skip_the_user_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate().pk, self.user.pk)
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertEqual(
+            (user.pk, user.username, user.is_active, user.is_staff, user.is_superuser),
+            (self.user.pk, self.user.username, True, False, False)
+        )
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_bulk_deactivation_is_rejected(self):
+        self.authenticate()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_unrelated_saves_keep_the_snapshot(self):
+        self.authenticate()
+        self.user.nickname = '新昵称'
+        self.user.save(update_fields=['nickname'])
+
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+
+class LoginTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+
+    def login(self):
+        response = APIClient().post(
+            reverse('login'), {'username': self.user.username, 'password': 'password'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        return self.user.last_login
+
+    def test_first_login_records_last_login(self):
+        self.assertIsNotNone(self.login())
+
+    def test_recent_last_login_is_not_rewritten(self):
+        first = self.login()
+        self.assertEqual(self.login(), first)
+
+    def test_stale_last_login_is_refreshed(self):
+        stale = timezone.now() - timedelta(days=1)
+        User.objects.filter(pk=self.user.pk).update(last_login=stale)
+        self.assertGreater(self.login(), stale)
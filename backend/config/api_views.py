@@ -2,9 +2,12 @@
 API Root view
 """
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 
+from apps.products.detail_cache import cache_stats as product_detail_cache_stats
+from core.db.pool import pool_stats
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -27,11 +30,13 @@ def api_root(request):
                 'list': '/api/v1/products/',
                 'detail': '/api/v1/products/{id}/',
                 'featured': '/api/v1/products/featured/',
+                'trending': '/api/v1/products/trending/',
                 'categories': '/api/v1/categories/',
             },
             'cart': {
                 'list': '/api/v1/cart/',
                 'add_item': '/api/v1/cart/items/',
+                'batch': '/api/v1/cart/batch/',
                 'update_item': '/api/v1/cart/items/{id}/',
                 'delete_item': '/api/v1/cart/items/{id}/',
             },
@@ -40,7 +45,32 @@ def api_root(request):
                 'create': '/api/v1/orders/create/',
                 'detail': '/api/v1/orders/{id}/',
             },
+            'analytics': {
+                'sales': '/api/v1/analytics/sales/',
+                'top_products': '/api/v1/analytics/top-products/',
+                'categories': '/api/v1/analytics/categories/',
+            },
             'admin': '/admin/',
         },
         'documentation': 'See API documentation for more details',
     })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_pool_stats(request):
+    """
+    当前进程的数据库连接池统计（checkouts / waits / timeouts 等）
+    """
+    return Response(pool_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def response_cache_stats(request):
+    """
+    当前进程的响应缓存命中统计
+    """
+    return Response({
+        'product_detail': product_detail_cache_stats(),
+    })
@@ -0,0 +1,156 @@
+"""
+Database router that sends catalog reads to read replicas.
+
+Only requests handled by views marked with ``use_read_replica = True``
+(and only for models in ``READ_REPLICAS['APPS']``) read from a replica;
+everything else, including Celery tasks and management commands, uses
+the primary. ``ReplicaRoutingMiddleware`` provides the per-request
+state and the read-your-writes guard: after a request writes, the
+client (by cookie) and the authenticated user (by cache key) are pinned
+to the primary for ``STICKY_SECONDS``.
+
+Settings::
+
+    DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+    READ_REPLICAS = {
+        'ALIASES': ['replica1'],   # entries in DATABASES
+        'APPS': ['products'],      # app labels that may be read from replicas
+        'STICKY_SECONDS': 10,
+        'COOKIE_NAME': 'db_pin',
+    }
+"""
+
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_CACHE_PREFIX = 'db:pin:'
+
+DEFAULT_SETTINGS = {
+    'ALIASES': [],
+    'APPS': ['products'],
+    'STICKY_SECONDS': 10,
+    'COOKIE_NAME': 'db_pin',
+}
+
+_current_state = contextvars.ContextVar('replica_routing', default=None)
+
+
+def get_replica_settings():
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'READ_REPLICAS', {}))
+    return options
+
+
+class RoutingState:
+    """Per-request routing flags set up by ``ReplicaRoutingMiddleware``."""
+
+    __slots__ = ('request', 'use_replica', 'pinned', 'wrote')
+
+    def __init__(self, request):
+        self.request = request
+        self.use_replica = False
+        # None until first checked, then True/False
+        self.pinned = None
+        self.wrote = False
+
+    def is_pinned(self, options):
+        if self.pinned is None:
+            self.pinned = bool(self.request.COOKIES.get(options['COOKIE_NAME']))
+            if not self.pinned:
+                # DRF copies the authenticated user onto the Django request
+                user = getattr(self.request, 'user', None)
+                if user is not None and user.is_authenticated:
+                    self.pinned = bool(cache.get(f'{PIN_CACHE_PREFIX}{user.pk}'))
+        return self.pinned
+
+
+class ReplicaRouter:
+    """
+    Route reads of catalog models to a random replica and everything
+    else to the primary.
+    """
+
+    def __init__(self):
+        options = get_replica_settings()
+        self.replicas = list(options['ALIASES'])
+        self.apps = set(options['APPS'])
+        self.options = options
+
+    def db_for_read(self, model, **hints):
+        state = _current_state.get()
+        if (
+            not self.replicas
+            or state is None
+            or not state.use_replica
+            or state.wrote
+            or model._meta.app_label not in self.apps
+            or state.is_pinned(self.options)
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _current_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Track routing state for each request and pin recent writers to the
+    primary database.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_replica_settings()
+
+    def __call__(self, request):
+        state = RoutingState(request)
+        token = _current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_state.reset(token)
+
+        if state.wrote or request.method not in self.SAFE_METHODS:
+            self._pin(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _current_state.get()
+        if state is None or request.method not in self.SAFE_METHODS:
+            return None
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        state.use_replica = bool(
+            getattr(view_class, 'use_read_replica', False)
+            or getattr(view_func, 'use_read_replica', False)
+        )
+        return None
+
+    def _pin(self, request, response):
+        seconds = self.options['STICKY_SECONDS']
+        if not seconds:
+            return
+        response.set_cookie(
+            self.options['COOKIE_NAME'], '1',
+            max_age=seconds, httponly=True, samesite='Lax',
+            secure=request.is_secure(),
+        )
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            cache.set(f'{PIN_CACHE_PREFIX}{user.pk}', 1, seconds)
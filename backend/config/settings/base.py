@@ -3,7 +3,8 @@ Base Django settings for ecommerce project.
 """
 
 from pathlib import Path
-from decouple import config
+from corsheaders.defaults import default_headers
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -42,15 +43,18 @@ INSTALLED_APPS = [
     'apps.products',
     'apps.cart',
     'apps.orders',
+    'apps.analytics',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'config.db_router.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,6 +94,16 @@ DATABASES = {
     }
 }
 
+# Catalog reads from views marked ``use_read_replica`` go to these
+# DATABASES aliases (see config.db_router); writers stick to the primary.
+DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+READ_REPLICAS = {
+    'ALIASES': config('DB_READ_REPLICAS', default='', cast=Csv()),
+    'APPS': ['products', 'analytics'],
+    'STICKY_SECONDS': config('DB_REPLICA_STICKY_SECONDS', default=10, cast=int),
+    'COOKIE_NAME': 'db_pin',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -142,7 +156,7 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -152,10 +166,17 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Keyset pagination; pass ?page= to opt into StandardResultsSetPagination
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
+    # orjson-backed drop-ins for JSONRenderer / JSONParser
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.ORJSONRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
 }
 
@@ -167,7 +188,8 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # The login view throttles last_login writes itself (LoginSerializer)
+    'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -176,6 +198,25 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Cached user snapshots for JWT authentication (core.authentication)
+# LOCAL_TTL bounds how long other processes may still accept a user who
+# was just deactivated
+AUTH_USER_CACHE = {
+    'TTL': 300,
+    'LOCAL_TTL': 5,
+    'LOCAL_MAXSIZE': 10000,
+}
+
+# Serialized product detail cache (apps.products.detail_cache)
+PRODUCT_DETAIL_CACHE = {
+    'TTL': 600,
+    'LOCAL_TTL': 60,
+    'LOCAL_MAXSIZE': 1000,
+    # Stampede guard: one rebuild per entry, others wait up to LOCK_WAIT
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2.0,
+}
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -187,6 +228,8 @@ CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', default=True, cast=boo
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+
 # Redis settings
 REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 
@@ -205,3 +248,108 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+
+# ID generator settings (order and payment numbers)
+# Leave ID_WORKER_ID unset to lease a unique worker id per process from Redis;
+# leases expire LEASE_TIMEOUT seconds after a process stops renewing them
+ID_GENERATOR = {
+    'BACKEND': 'core.id_generator.SnowflakeGenerator',
+    'WORKER_ID': config('ID_WORKER_ID', default=None, cast=lambda v: int(v) if v not in (None, '') else None),
+    'LEASE_TIMEOUT': 60,
+}
+
+# Cart storage settings
+# Switch BACKEND to 'apps.cart.storage.RedisCartStore' to keep carts in Redis
+# with write-behind to the CartItem table (flushed by Celery beat)
+CART_STORE = {
+    'BACKEND': config('CART_STORE_BACKEND', default='apps.cart.storage.DatabaseCartStore'),
+}
+
+CELERY_BEAT_SCHEDULE = {
+    'flush-dirty-carts': {
+        'task': 'apps.cart.tasks.flush_dirty_carts',
+        'schedule': 5.0,
+    },
+    'refresh-product-feeds': {
+        'task': 'apps.products.tasks.refresh_product_feeds',
+        'schedule': 300.0,
+    },
+    'expire-pending-orders': {
+        'task': 'apps.orders.tasks.expire_pending_orders',
+        'schedule': 60.0,
+    },
+    'purge-idempotency-keys': {
+        'task': 'apps.orders.tasks.purge_idempotency_keys',
+        'schedule': 3600.0,
+    },
+    'process-payment-notifications': {
+        'task': 'apps.orders.tasks.process_payment_notifications',
+        'schedule': 2.0,
+    },
+    'update-sales-rollups': {
+        'task': 'apps.analytics.tasks.update_sales_rollups',
+        'schedule': 60.0,
+    },
+}
+
+# Unpaid order expiry (apps.orders.tasks.expire_pending_orders)
+ORDER_EXPIRY = {
+    'TIMEOUT_MINUTES': config('ORDER_PAYMENT_TIMEOUT_MINUTES', default=30, cast=int),
+    'BATCH_SIZE': 500,
+    'MAX_BATCHES': 20,
+}
+
+# Idempotency-Key replay for payment endpoints (apps.orders.idempotency)
+# Stored keys older than CACHE_TIMEOUT are purged hourly; in-flight claims
+# older than CLAIM_TIMEOUT are treated as abandoned
+IDEMPOTENCY = {
+    'CACHE_TIMEOUT': 60 * 60 * 24,
+    'CLAIM_TIMEOUT': 60,
+    'PURGE_BATCH_SIZE': 1000,
+}
+
+# Payment gateway callbacks (apps.orders.notifications)
+PAYMENT_NOTIFICATIONS = {
+    'SECRET': config('PAYMENT_GATEWAY_SECRET', default=''),
+    'SIGNATURE_TOLERANCE': 300,
+    'STREAM': 'payments:notifications',
+    'GROUP': 'payment-workers',
+    'STREAM_MAXLEN': 100000,
+    'BATCH_SIZE': 200,
+    'BLOCK_MS': 1000,
+    'CLAIM_IDLE_MS': 60000,
+    'MAX_BATCHES': 50,
+    # Entries failing this many deliveries move to DEAD_LETTER_STREAM
+    'MAX_DELIVERIES': 5,
+    'DEAD_LETTER_STREAM': 'payments:notifications:dead',
+}
+
+# Sales rollups (apps.analytics.rollups)
+ANALYTICS = {
+    # Paid orders younger than this wait for the next run
+    'LAG_SECONDS': 120,
+    'MAX_WINDOW_HOURS': 24,
+    'BACKFILL_CHUNK_DAYS': 7,
+    'BACKFILL_LOCK_TIMEOUT': 6 * 3600,
+}
+
+# Precomputed featured/trending feeds (apps.products.feeds)
+PRODUCT_FEEDS = {
+    'SIZE': 50,
+    'VELOCITY_DAYS': 7,
+    'STOCK_CAP': 50,
+    'WEIGHTS': {
+        'VELOCITY': 3.0,
+        'SALES': 1.0,
+        'STOCK': 1.0,
+        'FEATURED': 2.0,
+    },
+}
+
+# Request metrics (core.middleware.RequestMetricsMiddleware)
+REQUEST_METRICS = {
+    'ENABLED': config('REQUEST_METRICS_ENABLED', default=True, cast=bool),
+    'LOG_SAMPLE_RATE': config('REQUEST_METRICS_LOG_SAMPLE_RATE', default=1.0, cast=float),
+    'SQL_SAMPLE_RATE': config('REQUEST_METRICS_SQL_SAMPLE_RATE', default=0.0, cast=float),
+    'SLOW_REQUEST_MS': config('REQUEST_METRICS_SLOW_REQUEST_MS', default=500, cast=int),
+}
@@ -15,6 +15,15 @@ DATABASES = {
     }
 }
 
+# Local replicas for DB_READ_REPLICAS, e.g. DB_READ_REPLICAS=replica uses
+# db.replica.sqlite3 (copy db.sqlite3 there to simulate a replica)
+for _alias in READ_REPLICAS['ALIASES']:
+    DATABASES[_alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db.{_alias}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+
 # Uncomment below to use PostgreSQL instead
 # DATABASES = {
 #     'default': {
@@ -27,6 +36,9 @@ DATABASES = {
 #     }
 # }
 
+# Fixed gateway secret so fake_payment_gateway works without configuration
+PAYMENT_NOTIFICATIONS['SECRET'] = PAYMENT_NOTIFICATIONS['SECRET'] or 'dev-payment-gateway-secret'
+
 # Email backend for development
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
@@ -7,17 +7,40 @@ from .base import *
 DEBUG = False
 
 # Database
+# Connections come from a per-process pool (core.db.pool); with
+# CONN_MAX_AGE = 0 each request returns its connection to the pool.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': config('DB_ENGINE', default='core.db.backends.postgresql_pool'),
         'NAME': config('DB_NAME'),
         'USER': config('DB_USER'),
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'SIZE': config('DB_POOL_SIZE', default=10, cast=int),
+            'MAX_OVERFLOW': config('DB_POOL_MAX_OVERFLOW', default=10, cast=int),
+            'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+            'HEALTH_CHECK_AFTER': config('DB_POOL_HEALTH_CHECK_AFTER', default=30, cast=float),
+        },
     }
 }
 
+# Read replicas: one alias per host in DB_REPLICA_HOSTS, same credentials
+for _index, _host in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    DATABASES[f'replica{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'TEST': {'MIRROR': 'default'},
+    }
+READ_REPLICAS = {
+    **READ_REPLICAS,
+    'ALIASES': [alias for alias in DATABASES if alias.startswith('replica')],
+}
+
 # Security settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -35,3 +58,10 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
+
+# Log a sample of requests; slow requests are always logged
+REQUEST_METRICS = {
+    **REQUEST_METRICS,
+    'LOG_SAMPLE_RATE': config('REQUEST_METRICS_LOG_SAMPLE_RATE', default=0.1, cast=float),
+    'SQL_SAMPLE_RATE': config('REQUEST_METRICS_SQL_SAMPLE_RATE', default=0.01, cast=float),
+}
@@ -0,0 +1,48 @@
+"""
+Test settings for ecommerce project.
+
+Tests run on SQLite unless ``TEST_DB_ENGINE=postgresql``; the concurrency
+tests need PostgreSQL (row locks) and are skipped on SQLite.
+"""
+
+from .base import *
+
+if config('TEST_DB_ENGINE', default='sqlite') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='ecommerce_dev'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default='postgres'),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.test.sqlite3',
+        }
+    }
+
+# A replica that mirrors the test database; routing to it is only enabled
+# by the router tests (core/tests/test_db_router.py)
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+READ_REPLICAS['ALIASES'] = []
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+CELERY_TASK_ALWAYS_EAGER = True
+
+ID_GENERATOR['WORKER_ID'] = 1
+
+PAYMENT_NOTIFICATIONS['SECRET'] = 'test-payment-gateway-secret'
+
+REQUEST_METRICS['ENABLED'] = False
@@ -6,15 +6,18 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenRefreshView
-from config.api_views import api_root
+from config.api_views import api_root, db_pool_stats, response_cache_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', api_root, name='api-root'),
+    path('api/v1/internal/db-pool/', db_pool_stats, name='db-pool-stats'),
+    path('api/v1/internal/cache-stats/', response_cache_stats, name='cache-stats'),
     path('api/v1/auth/', include('apps.users.api.urls')),
     path('api/v1/', include('apps.products.api.urls')),
     path('api/v1/', include('apps.cart.api.urls')),
     path('api/v1/', include('apps.orders.api.urls')),
+    path('api/v1/', include('apps.analytics.api.urls')),
     path('api/v1/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
 
@@ -2,8 +2,27 @@
 Custom authentication utilities.
 """
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import LocalTTLCache
+
+USER_SNAPSHOT_FIELDS = ('id', 'username', 'is_active', 'is_staff', 'is_superuser')
+# Bump the version when the snapshot layout changes
+USER_SNAPSHOT_CACHE_PREFIX = 'auth:user:v2:'
+
+_auth_settings = getattr(settings, 'AUTH_USER_CACHE', {})
+USER_SNAPSHOT_TTL = _auth_settings.get('TTL', 300)
+_local_snapshots = LocalTTLCache(
+    maxsize=_auth_settings.get('LOCAL_MAXSIZE', 10000),
+    ttl=_auth_settings.get('LOCAL_TTL', 5),
+)
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -23,3 +42,101 @@ class CookieJWTAuthentication(JWTAuthentication):
             return f'Bearer {access_token}'
 
         return None
+
+
+def _snapshot_key(user_id):
+    return f'{USER_SNAPSHOT_CACHE_PREFIX}{user_id}'
+
+
+def snapshot_fields():
+    """``USER_SNAPSHOT_FIELDS`` in model field order, as ``Model.from_db`` expects."""
+    return [
+        field.attname
+        for field in get_user_model()._meta.concrete_fields
+        if field.attname in USER_SNAPSHOT_FIELDS
+    ]
+
+
+def get_user_snapshot(user_id):
+    """
+    Return the ``snapshot_fields()`` values of a user, or None if the
+    user does not exist. Checks local memory, then Redis, then the DB.
+    """
+    key = _snapshot_key(user_id)
+    snapshot = _local_snapshots.get(key)
+    if snapshot is None:
+        snapshot = cache.get(key)
+        if snapshot is None:
+            values = (
+                get_user_model().objects
+                .filter(id=user_id)
+                .values_list(*snapshot_fields())
+                .first()
+            )
+            if values is None:
+                return None
+            snapshot = values
+            cache.set(key, snapshot, USER_SNAPSHOT_TTL)
+        _local_snapshots.set(key, snapshot)
+    return snapshot
+
+
+def invalidate_user_snapshot(user_id):
+    """Drop a user's cached snapshot (this process and Redis)."""
+    invalidate_user_snapshots([user_id])
+
+
+def invalidate_user_snapshots(user_ids):
+    """Drop the cached snapshots of several users (this process and Redis)."""
+    keys = [_snapshot_key(user_id) for user_id in user_ids]
+    for key in keys:
+        _local_snapshots.delete(key)
+    cache.delete_many(keys)
+
+
+class CachedUserMixin:
+    """
+    Build ``request.user`` from a cached snapshot instead of loading the
+    full user row on every request.
+
+    The returned instance is a real ``User`` with every other field
+    deferred, so it can be used in queries and lazily loads anything
+    else on access; ``save()`` only writes fields that were loaded or
+    assigned. Snapshots are invalidated when a ``User`` is saved or
+    deleted (see ``apps.users.signals``) and by ``User.objects.update()``
+    of a snapshot field. Raw SQL bypasses both, and other processes may
+    keep a stale local copy, so a deactivated user can still authenticate
+    for up to ``AUTH_USER_CACHE['LOCAL_TTL']`` seconds (``TTL`` for raw
+    SQL).
+    """
+
+    def get_user(self, validated_token):
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            # Revocation needs the password hash, which is not cached
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        snapshot = get_user_snapshot(user_id)
+        if snapshot is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        user = self.user_model.from_db(DEFAULT_DB_ALIAS, snapshot_fields(), snapshot)
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+
+class CachedJWTAuthentication(CachedUserMixin, JWTAuthentication):
+    """
+    JWT authentication backed by the user snapshot cache.
+    """
+
+
+class CachedCookieJWTAuthentication(CachedUserMixin, CookieJWTAuthentication):
+    """
+    Cookie-aware JWT authentication backed by the user snapshot cache.
+    """
@@ -0,0 +1,78 @@
+"""
+PostgreSQL backend that checks connections out of a per-process pool.
+
+Configure with ``'ENGINE': 'core.db.backends.postgresql_pool'`` and an
+optional ``POOL`` dict next to ``OPTIONS`` in the database settings::
+
+    'POOL': {
+        'SIZE': 10,             # idle connections kept per process
+        'MAX_OVERFLOW': 10,     # extra connections opened under load
+        'TIMEOUT': 10,          # seconds to wait for a free connection
+        'MAX_LIFETIME': 3600,   # recycle connections older than this
+        'HEALTH_CHECK_AFTER': 30,  # ping connections idle longer than this
+    }
+
+Keep ``CONN_MAX_AGE = 0`` so Django hands the connection back to the
+pool at the end of every request instead of holding it per thread.
+"""
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from core.db.pool import ConnectionPool, get_pool
+
+try:
+    from psycopg2.extensions import (
+        TRANSACTION_STATUS_IDLE,
+        TRANSACTION_STATUS_UNKNOWN,
+    )
+except ImportError:  # psycopg 3
+    from psycopg.pq import TransactionStatus
+
+    TRANSACTION_STATUS_IDLE = TransactionStatus.IDLE
+    TRANSACTION_STATUS_UNKNOWN = TransactionStatus.UNKNOWN
+
+
+def _transaction_status(connection):
+    if hasattr(connection, 'get_transaction_status'):
+        return connection.get_transaction_status()
+    return connection.info.transaction_status
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    _pool = None
+
+    def _get_pool(self, conn_params):
+        options = {key.lower(): value for key, value in self.settings_dict.get('POOL', {}).items()}
+
+        def connect():
+            return super(DatabaseWrapper, self).get_new_connection(conn_params)
+
+        return get_pool(self.alias, lambda: ConnectionPool(connect, **options))
+
+    def get_new_connection(self, conn_params):
+        # Normally set by the parent when it opens a connection
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', IsolationLevel.READ_COMMITTED
+        )
+        self._pool = self._get_pool(conn_params)
+        return self._pool.getconn()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self._pool is None:
+            return super()._close()
+
+        connection = self.connection
+        discard = bool(connection.closed)
+        if not discard:
+            status = _transaction_status(connection)
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except Exception:
+                    discard = True
+        self._pool.putconn(connection, discard=discard)
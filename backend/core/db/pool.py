@@ -0,0 +1,184 @@
+"""
+Thread-safe database connection pool.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of DB-API connections.
+
+    Keeps up to ``size`` idle connections and opens up to
+    ``max_overflow`` extra ones under load, which are closed as soon as
+    they are returned. Callers wait up to ``timeout`` seconds for a free
+    connection. Idle connections older than ``max_lifetime`` are
+    recycled, and ones idle for more than ``health_check_after`` seconds
+    are pinged before being handed out.
+    """
+
+    def __init__(self, connect, size=10, max_overflow=10, timeout=10.0,
+                 max_lifetime=3600.0, health_check_after=30.0):
+        self._connect = connect
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+
+        self._cond = threading.Condition()
+        # (connection, created_at, returned_at)
+        self._idle = deque()
+        self._created_at = {}
+        self._open = 0
+        self.stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_closed': 0,
+            'health_check_failures': 0,
+        }
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        waited_from = None
+        with self._cond:
+            self.stats['checkouts'] += 1
+            while True:
+                while self._idle:
+                    connection, created_at, returned_at = self._idle.pop()
+                    if self._is_expired(connection, created_at):
+                        self._discard(connection)
+                        continue
+                    if (time.monotonic() - returned_at > self.health_check_after
+                            and not self._ping(connection)):
+                        self.stats['health_check_failures'] += 1
+                        self._discard(connection)
+                        continue
+                    self._record_wait(waited_from)
+                    return connection
+
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    break
+
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                    self.stats['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    self._record_wait(waited_from)
+                    raise PoolTimeout(
+                        f'No database connection available within {self.timeout}s '
+                        f'(size={self.size}, max_overflow={self.max_overflow})'
+                    )
+                self._cond.wait(remaining)
+            self._record_wait(waited_from)
+
+        # Open the new connection outside the lock
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats['connections_created'] += 1
+            self._created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def putconn(self, connection, discard=False):
+        with self._cond:
+            created_at = self._created_at.get(id(connection), time.monotonic())
+            if (discard or len(self._idle) >= self.size
+                    or self._is_expired(connection, created_at)):
+                self._discard(connection)
+            else:
+                self._idle.append((connection, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                connection, _, _ = self._idle.pop()
+                self._discard(connection)
+            self._cond.notify_all()
+
+    def snapshot(self):
+        """Counters plus current gauges, safe to serialize."""
+        with self._cond:
+            data = dict(self.stats)
+            data.update({
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+            })
+        data['wait_time'] = round(data['wait_time'], 4)
+        return data
+
+    def _record_wait(self, waited_from):
+        if waited_from is not None:
+            self.stats['wait_time'] += time.monotonic() - waited_from
+
+    def _is_expired(self, connection, created_at):
+        return bool(getattr(connection, 'closed', False)) or (
+            self.max_lifetime and time.monotonic() - created_at > self.max_lifetime
+        )
+
+    def _discard(self, connection):
+        """Close a connection and release its slot; caller holds the lock."""
+        self._open -= 1
+        self._created_at.pop(id(connection), None)
+        self.stats['connections_closed'] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _ping(connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except Exception:
+            return False
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def get_pool(alias, factory):
+    """Return this process's pool for ``alias``, creating it with ``factory``."""
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Never share sockets with a parent process after fork
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = factory()
+        return pool
+
+
+def pool_stats():
+    """Snapshot of every pool in this process, keyed by database alias."""
+    with _pools_lock:
+        pools = dict(_pools) if _pools_pid == os.getpid() else {}
+    return {alias: pool.snapshot() for alias, pool in pools.items()}
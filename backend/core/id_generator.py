@@ -0,0 +1,241 @@
+"""
+Unique, roughly time-ordered ID generation.
+
+The default ``SnowflakeGenerator`` packs a millisecond timestamp, a
+worker id and a per-millisecond sequence into a 63-bit integer, so IDs
+are monotonic within a process and unique across processes as long as
+each process has its own worker id. The backend is chosen with the
+``ID_GENERATOR`` setting.
+
+Without a configured ``WORKER_ID`` each process leases one: it claims
+the first free ``id_generator:worker:<id>`` cache key with ``cache.add``
+and a ``LEASE_TIMEOUT`` TTL, and a daemon thread renews the lease every
+third of the TTL. A process that dies stops renewing and its id frees
+up after the TTL; when all 1024 ids are leased, ``WorkerIdUnavailable``
+is raised instead of sharing one. IDs are only issued while the lease is
+known to be held: once a lease outlives its last successful renewal, the
+next ``next_id()`` leases again (and raises if the cache is down) rather
+than risk sharing an id another process has taken over. Leasing needs a
+cache shared by every process (Redis); with a process-local one (locmem,
+dummy) every process can end up with the same id, so set ``WORKER_ID``.
+"""
+
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# 2026-01-01T00:00:00Z in milliseconds
+DEFAULT_EPOCH_MS = 1767225600000
+
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+WORKER_LEASE_KEY_PREFIX = 'id_generator:worker:'
+DEFAULT_LEASE_TIMEOUT = 60
+
+# Cache backends whose keys other processes can't see
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class WorkerIdUnavailable(RuntimeError):
+    """Raised when every worker id is leased by another process."""
+
+
+class SnowflakeGenerator:
+    """
+    Snowflake-style generator: 41 bits of milliseconds since ``epoch_ms``,
+    10 bits of worker id and 12 bits of sequence (4096 IDs/ms/worker).
+
+    ``worker_id`` comes from settings; when it is None, each process
+    leases one from the default cache on first use so gunicorn/celery
+    workers sharing a settings file don't collide.
+    """
+
+    def __init__(self, worker_id=None, epoch_ms=DEFAULT_EPOCH_MS, lease_timeout=DEFAULT_LEASE_TIMEOUT):
+        if worker_id is not None and not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f'worker_id must be between 0 and {MAX_WORKER_ID}')
+        self.configured_worker_id = worker_id
+        self.epoch_ms = epoch_ms
+        self.lease_timeout = lease_timeout
+        self._lock = threading.Lock()
+        self._reset()
+        atexit.register(self.release)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._worker_id = None
+        self._lease_token = None
+        # time.monotonic() until which the lease is known to be ours
+        self._lease_deadline = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    @property
+    def worker_id(self):
+        if self._lease_token is not None and time.monotonic() >= self._lease_deadline:
+            # Renewals failed for a whole TTL: the id may be someone else's now
+            logger.error('Lease on worker id %s expired without renewal', self._worker_id)
+            self._worker_id = None
+            self._lease_token = None
+        if self._worker_id is None:
+            if self.configured_worker_id is not None:
+                self._worker_id = self.configured_worker_id
+            else:
+                self._worker_id = self._lease_worker_id()
+        return self._worker_id
+
+    def _lease_worker_id(self):
+        """Claim a free worker id and start renewing its lease."""
+        if isinstance(caches[DEFAULT_CACHE_ALIAS], PROCESS_LOCAL_CACHES):
+            logger.warning(
+                'Leasing an ID generator worker id from a process-local cache; '
+                'other processes may get the same id. Set ID_GENERATOR["WORKER_ID"].'
+            )
+        token = uuid.uuid4().hex
+        # Start at a random id so restarting processes don't all probe from 0
+        offset = random.randrange(MAX_WORKER_ID + 1)
+        for step in range(MAX_WORKER_ID + 1):
+            worker_id = (offset + step) & MAX_WORKER_ID
+            started = time.monotonic()
+            if cache.add(self._lease_key(worker_id), token, timeout=self.lease_timeout):
+                self._lease_token = token
+                self._lease_deadline = started + self.lease_timeout
+                threading.Thread(
+                    target=self._keep_lease, args=(worker_id, token), daemon=True, name='id-generator-lease'
+                ).start()
+                return worker_id
+        raise WorkerIdUnavailable(f'All {MAX_WORKER_ID + 1} worker ids are leased')
+
+    @staticmethod
+    def _lease_key(worker_id):
+        return f'{WORKER_LEASE_KEY_PREFIX}{worker_id}'
+
+    def _renew_lease(self, worker_id, token):
+        """Extend our lease; re-take it if it just expired. False if lost."""
+        key = self._lease_key(worker_id)
+        if cache.get(key) == token and cache.touch(key, self.lease_timeout):
+            return True
+        return cache.add(key, token, timeout=self.lease_timeout)
+
+    def _holds(self, pid, token):
+        return self._pid == pid and self._lease_token == token
+
+    def _keep_lease(self, worker_id, token):
+        pid = os.getpid()
+        while True:
+            time.sleep(self.lease_timeout / 3)
+            if not self._refresh_lease(pid, worker_id, token):
+                return
+
+    def _refresh_lease(self, pid, worker_id, token):
+        """
+        One renewal round of ``_keep_lease``; False once the lease is no
+        longer ours. The cache round-trip runs without ``_lock`` so a
+        slow cache doesn't stall ``next_id()``.
+        """
+        with self._lock:
+            if not self._holds(pid, token):
+                return False
+        started = time.monotonic()
+        try:
+            renewed = self._renew_lease(worker_id, token)
+        except Exception:
+            # Keep trying; next_id() stops using the id once the deadline passes
+            logger.exception('Could not renew worker id %s lease', worker_id)
+            return True
+        with self._lock:
+            if not self._holds(pid, token):
+                return False
+            if renewed:
+                self._lease_deadline = started + self.lease_timeout
+                return True
+            # Another process holds the id now; lease a new one on next use
+            logger.error('Lost the lease on worker id %s', worker_id)
+            self._worker_id = None
+            self._lease_token = None
+            return False
+
+    def release(self):
+        """Give a leased worker id back, e.g. at interpreter exit."""
+        with self._lock:
+            if self._lease_token is None or self._pid != os.getpid():
+                return
+            key = self._lease_key(self._worker_id)
+            try:
+                if cache.get(key) == self._lease_token:
+                    cache.delete(key)
+            except Exception:
+                logger.warning('Could not release worker id %s', self._worker_id, exc_info=True)
+            self._worker_id = None
+            self._lease_token = None
+
+    def _now_ms(self):
+        return time.time_ns() // 1_000_000
+
+    def next_id(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: the child must not reuse the parent's worker id
+                self._reset()
+            worker_id = self.worker_id
+
+            now = self._now_ms()
+            if now < self._last_ms:
+                # Clock moved backwards; never hand out an ID twice
+                now = self._wait_until(self._last_ms)
+
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    now = self._wait_until(self._last_ms + 1)
+            else:
+                self._sequence = 0
+
+            self._last_ms = now
+            return (
+                ((now - self.epoch_ms) << (WORKER_ID_BITS + SEQUENCE_BITS))
+                | (worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+    def _wait_until(self, target_ms):
+        now = self._now_ms()
+        while now < target_ms:
+            time.sleep(0.0001)
+            now = self._now_ms()
+        return now
+
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def get_id_generator():
+    """Return the process-wide generator configured in ``ID_GENERATOR``."""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                options = dict(getattr(settings, 'ID_GENERATOR', {}))
+                backend = import_string(options.pop('BACKEND', 'core.id_generator.SnowflakeGenerator'))
+                _generator = backend(**{key.lower(): value for key, value in options.items()})
+    return _generator
+
+
+def next_id():
+    """Return the next unique ID from the configured generator."""
+    return get_id_generator().next_id()
@@ -0,0 +1,169 @@
+"""
+Request instrumentation middleware.
+"""
+
+import contextvars
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+logger = logging.getLogger('core.metrics')
+
+_current_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    # Fraction of requests that emit a structured log line
+    'LOG_SAMPLE_RATE': 1.0,
+    # Fraction of requests that also capture SQL text (expensive)
+    'SQL_SAMPLE_RATE': 0.0,
+    # Requests slower than this are always logged, with SQL if sampled
+    'SLOW_REQUEST_MS': 500,
+    'MAX_CAPTURED_QUERIES': 50,
+    'SERVER_TIMING_HEADER': True,
+}
+
+
+def get_metrics_settings():
+    options = dict(DEFAULT_SETTINGS)
+    options.update(getattr(settings, 'REQUEST_METRICS', {}))
+    return options
+
+
+class RequestMetrics:
+    """Per-request counters collected by ``RequestMetricsMiddleware``."""
+
+    __slots__ = ('query_count', 'db_time', 'serializer_time', 'serializer_depth', 'queries', 'capture_sql')
+
+    def __init__(self, capture_sql=False):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.queries = [] if capture_sql else None
+        self.capture_sql = capture_sql
+
+
+def _timed_data(original):
+    """Wrap a serializer ``data`` property to time the outermost call."""
+
+    def data(self):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return original.fget(self)
+        metrics.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            metrics.serializer_depth -= 1
+            if metrics.serializer_depth == 0:
+                metrics.serializer_time += time.perf_counter() - start
+
+    return property(data)
+
+
+def _install_serializer_timing():
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(cls.data.fget, '_request_metrics', False):
+            wrapped = _timed_data(cls.data)
+            wrapped.fget._request_metrics = True
+            cls.data = wrapped
+
+
+class RequestMetricsMiddleware:
+    """
+    Record DB query count, DB time, serializer time and total latency
+    for each request.
+
+    Metrics are emitted as a ``Server-Timing`` header and as a JSON log
+    line on the ``core.metrics`` logger. Query counting uses database
+    execute wrappers, so it works with ``DEBUG = False``; SQL text is
+    only kept for the ``SQL_SAMPLE_RATE`` fraction of requests.
+    Configure with the ``REQUEST_METRICS`` setting.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_metrics_settings()
+        if self.options['ENABLED']:
+            _install_serializer_timing()
+
+    def __call__(self, request):
+        if not self.options['ENABLED']:
+            return self.get_response(request)
+
+        capture_sql = random.random() < self.options['SQL_SAMPLE_RATE']
+        metrics = RequestMetrics(capture_sql=capture_sql)
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self._make_wrapper(metrics)))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        total = time.perf_counter() - start
+
+        if self.options['SERVER_TIMING_HEADER']:
+            response['Server-Timing'] = self.server_timing(metrics, total)
+        self.log(request, response, metrics, total)
+        return response
+
+    def _make_wrapper(self, metrics):
+        max_queries = self.options['MAX_CAPTURED_QUERIES']
+
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration = time.perf_counter() - start
+                metrics.query_count += 1
+                metrics.db_time += duration
+                if metrics.capture_sql and len(metrics.queries) < max_queries:
+                    metrics.queries.append({
+                        'sql': sql,
+                        'duration_ms': round(duration * 1000, 3),
+                        'db': context['connection'].alias,
+                    })
+
+        return wrapper
+
+    @staticmethod
+    def server_timing(metrics, total):
+        app_time = max(total - metrics.db_time - metrics.serializer_time, 0)
+        return ', '.join([
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.query_count} queries"',
+            f'serialize;dur={metrics.serializer_time * 1000:.2f}',
+            f'app;dur={app_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+    def log(self, request, response, metrics, total):
+        total_ms = total * 1000
+        slow = total_ms >= self.options['SLOW_REQUEST_MS']
+        if not slow and random.random() >= self.options['LOG_SAMPLE_RATE']:
+            return
+
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'db_queries': metrics.query_count,
+            'serializer_ms': round(metrics.serializer_time * 1000, 2),
+        }
+        if metrics.queries is not None:
+            record['queries'] = metrics.queries
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record, ensure_ascii=False))
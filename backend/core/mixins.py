@@ -0,0 +1,45 @@
+"""
+Reusable view mixins.
+"""
+
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Answer conditional GETs with 304 before the view does any work.
+
+    Subclasses implement ``get_etag`` and/or ``get_last_modified``; both
+    receive the view arguments and should be much cheaper than building
+    the response. ``cache_control`` is passed to ``patch_cache_control``
+    on 200 and 304 responses.
+    """
+    cache_control = None
+
+    def get_etag(self, request, *args, **kwargs):
+        return None
+
+    def get_last_modified(self, request, *args, **kwargs):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request, *args, **kwargs)
+        etag = quote_etag(etag) if etag else None
+        last_modified = self.get_last_modified(request, *args, **kwargs)
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            if etag and not response.has_header('ETag'):
+                response['ETag'] = etag
+            if timestamp is not None and not response.has_header('Last-Modified'):
+                response['Last-Modified'] = http_date(timestamp)
+            if self.cache_control:
+                patch_cache_control(response, **self.cache_control)
+        return response
@@ -2,7 +2,19 @@
 Custom pagination classes.
 """
 
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -21,3 +33,209 @@ class SmallResultsSetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 50
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination without COUNT(*) or OFFSET.
+
+    Pages follow the queryset's ordering with ``id`` appended as a unique
+    tiebreaker; the cursor stores the last row's sort key and the next
+    page is fetched with ``WHERE (key, id) > (cursor)``. Requests that
+    pass ``page``, or querysets ordered by something that can't be
+    seeked (nullable fields, annotations), fall back to
+    ``fallback_pagination_class``.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    fallback_query_param = 'page'
+    fallback_pagination_class = StandardResultsSetPagination
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.fallback = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = self.get_ordering(queryset)
+        if ordering is None or self.fallback_query_param in request.query_params:
+            self.fallback = self.fallback_pagination_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.model = queryset.model
+        self.ordering = ordering
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        cursor = self.decode_cursor(request)
+        reverse = False
+        if cursor is not None:
+            reverse = cursor.get('r', False)
+            queryset = queryset.filter(self.seek_filter(cursor['k'], reverse))
+
+        if reverse:
+            queryset = queryset.order_by(*[self._invert(field) for field in ordering])
+        else:
+            queryset = queryset.order_by(*ordering)
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.page = results
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """
+        Return the queryset ordering with an ``id`` tiebreaker appended,
+        or None if the ordering cannot be used as a keyset.
+        """
+        query = queryset.query
+        ordering = list(query.order_by or query.get_meta().ordering or [])
+        if not ordering:
+            ordering = ['-id']
+
+        model = queryset.model
+        keyset = []
+        for field_name in ordering:
+            if not isinstance(field_name, str) or '__' in field_name:
+                return None
+            name = field_name.lstrip('-')
+            if name == 'pk':
+                name = model._meta.pk.name
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if field.null or not field.concrete:
+                return None
+            keyset.append(('-' if field_name.startswith('-') else '') + name)
+            if field.primary_key:
+                return keyset
+
+        # Unique tiebreaker in the same direction as the last sort key
+        last_desc = keyset[-1].startswith('-')
+        keyset.append('-id' if last_desc else 'id')
+        return keyset
+
+    def seek_filter(self, values, reverse):
+        """
+        Build ``(f1, f2, ...) > (v1, v2, ...)`` respecting each field's
+        direction, expanded to ORs so mixed directions work.
+        """
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = Q()
+        for field_name, value in zip(self.ordering, values):
+            name = field_name.lstrip('-')
+            value = self.to_python(name, value)
+            descending = field_name.startswith('-') != reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def to_python(self, name, value):
+        """Convert a cursor value to the field's type; a tampered cursor is a 404."""
+        if value is None or isinstance(value, (dict, list)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return self.model._meta.get_field(name).to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_key(self, instance):
+        return [_encode_value(getattr(instance, field.lstrip('-'))) for field in self.ordering]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(cursor, dict) or not isinstance(cursor.get('k'), list):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(cursor.get('r', False), bool):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, key, reverse=False):
+        payload = {'k': key}
+        if reverse:
+            payload['r'] = True
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.fallback is not None:
+            return self.fallback.get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_key(self.page[-1]))
+
+    def get_previous_link(self):
+        if self.fallback is not None:
+            return self.fallback.get_previous_link()
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_key(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response_schema(schema)
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    @staticmethod
+    def _invert(field_name):
+        return field_name[1:] if field_name.startswith('-') else f'-{field_name}'
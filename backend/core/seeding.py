@@ -0,0 +1,480 @@
+"""
+Bulk seeding engine for ``generate_fake_data --bulk``.
+
+Faker rows are generated in a process pool, a chunk at a time, and the
+parent process inserts each chunk with ``bulk_create`` in its own
+transaction as results stream back. Primary keys are UUIDs generated in
+the workers, so later phases can reference earlier rows without reading
+them back. Every user shares one precomputed password hash, categories
+are inserted with MPTT updates disabled and rebuilt in one pass, and
+``created_at``/``updated_at`` keep the generated historical values.
+Each table and chunk draws from its own seed derived from ``seed``, so
+runs are reproducible without tables repeating each other's sequences.
+
+Pending orders are only generated inside the payment timeout and take
+their stock like a real checkout, so the expiry sweeper releases exactly
+what they reserved; one that doesn't fit the remaining stock is seeded
+as cancelled instead.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+from faker import Faker
+
+from apps.cart.models import CartItem
+from apps.orders.models import Order, OrderItem
+from apps.orders.tasks import get_expiry_settings
+from apps.products.category_tree import invalidate_category_tree
+from apps.products.inventory import reserve_stock
+from apps.products.models import Category, Product, ProductImage
+from apps.products.versioning import CATALOG, CATEGORIES, bump_version
+from apps.users.models import Address
+from core.id_generator import next_id
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = 'password123'
+
+# Presets for --scale; category_fanout adds a third category level
+SCALES = {
+    'small': {'users': 100, 'products': 1_000, 'order_items': 5_000, 'category_fanout': 0},
+    'medium': {'users': 10_000, 'products': 100_000, 'order_items': 500_000, 'category_fanout': 5},
+    'large': {'users': 100_000, 'products': 1_000_000, 'order_items': 3_000_000, 'category_fanout': 10},
+    'xlarge': {'users': 200_000, 'products': 1_000_000, 'order_items': 10_000_000, 'category_fanout': 10},
+}
+
+# Products referenced by generated order items and carts
+ORDER_PRODUCT_SAMPLE = 50_000
+ORDER_HISTORY_DAYS = 180
+AVERAGE_ITEMS_PER_ORDER = 3
+
+CATEGORY_DATA = [
+    {'name': '电子产品', 'icon': '📱', 'subcategories': ['手机', '电脑', '平板', '耳机', '智能手表']},
+    {'name': '服装鞋帽', 'icon': '👕', 'subcategories': ['男装', '女装', '运动鞋', '箱包', '配饰']},
+    {'name': '家居用品', 'icon': '🏠', 'subcategories': ['厨房用品', '卫浴用品', '家具', '家纺', '装饰']},
+    {'name': '食品饮料', 'icon': '🍔', 'subcategories': ['零食', '饮料', '生鲜', '粮油', '调味品']},
+    {'name': '图书文具', 'icon': '📚', 'subcategories': ['文学', '教材', '办公用品', '美术用品', '数码配件']},
+    {'name': '美妆护肤', 'icon': '💄', 'subcategories': ['面部护理', '彩妆', '香水', '美妆工具', '身体护理']},
+]
+
+PROVINCES = ['北京市', '上海市', '广东省', '浙江省', '江苏省']
+
+ORDER_STATUS_WEIGHTS = [
+    ('pending', 10),
+    ('paid', 20),
+    ('shipped', 20),
+    ('completed', 40),
+    ('cancelled', 10),
+]
+
+
+# -- Worker side -------------------------------------------------------------
+
+_context = {}
+_fake = None
+
+
+def _init_worker(context):
+    _context.clear()
+    _context.update(context)
+
+
+def _derive_seed(seed, table, start):
+    """Seed for the ``table`` chunk starting at ``start``, distinct per table and chunk."""
+    digest = hashlib.sha256(f'{seed}:{table}:{start}'.encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def _generators(seed, table, start):
+    """Deterministic Faker/random pair for the ``table`` chunk starting at ``start``."""
+    global _fake
+    if _fake is None:
+        # Loading the zh_CN providers is slow; do it once per process
+        _fake = Faker(['zh_CN'])
+    chunk_seed = _derive_seed(seed, table, start)
+    _fake.seed_instance(chunk_seed)
+    return _fake, random.Random(chunk_seed)
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _past(rng, now, days):
+    return now - timedelta(seconds=rng.randint(0, days * 24 * 3600))
+
+
+def generate_users(task):
+    """Rows for ``count`` users and their 1-2 addresses."""
+    start, count = task
+    fake, rng = _generators(_context['seed'], 'users', start)
+    now = _context['now']
+    users, addresses = [], []
+    for index in range(start, start + count):
+        user_id = _uuid(rng)
+        joined = _past(rng, now, 365)
+        users.append({
+            'id': user_id,
+            'username': f'seed_{_context["run"]}_{index}',
+            'email': fake.email(),
+            'nickname': fake.name(),
+            'phone': fake.phone_number()[:11],
+            'date_joined': joined,
+        })
+        for position in range(rng.randint(1, 2)):
+            addresses.append({
+                'id': _uuid(rng),
+                'user_id': user_id,
+                'receiver_name': fake.name(),
+                'receiver_phone': fake.phone_number()[:11],
+                'province': rng.choice(PROVINCES),
+                'city': fake.city_name(),
+                'district': fake.street_name()[:50],
+                'detail': fake.street_address()[:200],
+                'postal_code': fake.postcode(),
+                'is_default': position == 0,
+                'created_at': joined,
+                'updated_at': joined,
+            })
+    return users, addresses
+
+
+def generate_products(task):
+    """Rows for ``count`` products and their 2-5 images."""
+    start, count = task
+    fake, rng = _generators(_context['seed'], 'products', start)
+    now = _context['now']
+    leaves = _context['leaves']
+    products, images = [], []
+    for _ in range(count):
+        category_id, category_name = rng.choice(leaves)
+        name = f'{category_name} {fake.word()} {rng.randint(100, 9999)}'
+        price = Decimal(rng.randint(500, 500000)) / 100
+        original_price = (price * Decimal(rng.randint(110, 150)) / 100).quantize(Decimal('0.01')) \
+            if rng.random() < 0.5 else None
+        sales = rng.randint(0, 1000)
+        created_at = _past(rng, now, 365)
+        product_id = _uuid(rng)
+        products.append({
+            'id': product_id,
+            'name': name[:200],
+            'description': fake.text(max_nb_chars=500),
+            'price': price,
+            'original_price': original_price,
+            'stock': rng.randint(0, 500),
+            'sales': sales,
+            'category_id': category_id,
+            'main_image': f'https://placehold.co/800x800/f3f4f6/1f2937?text={product_id.hex[:8]}',
+            'is_featured': sales > 100 and rng.random() < 0.2,
+            'weight': Decimal(rng.randint(1, 100)) / 10,
+            'specifications': {
+                'brand': fake.company(),
+                'model': f'Model-{rng.randint(1000, 9999)}',
+                'origin': rng.choice(['国产', '进口', '合资']),
+                'warranty': f'{rng.randint(1, 3)}年',
+            },
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+        for order in range(rng.randint(2, 5)):
+            images.append({
+                'id': _uuid(rng),
+                'product_id': product_id,
+                'image': f'https://placehold.co/800x800/f3f4f6/1f2937?text={product_id.hex[:8]}-{order + 1}',
+                'order': order,
+            })
+    return products, images
+
+
+def generate_orders(task):
+    """Rows for orders holding roughly ``count`` order items."""
+    start, count = task
+    fake, rng = _generators(_context['seed'], 'orders', start)
+    now = _context['now']
+    addresses = _context['addresses']
+    products = _context['products']
+    statuses = [status for status, _ in ORDER_STATUS_WEIGHTS]
+    weights = [weight for _, weight in ORDER_STATUS_WEIGHTS]
+
+    orders, items = [], []
+    remaining = count
+    while remaining > 0:
+        size = min(remaining, rng.randint(1, AVERAGE_ITEMS_PER_ORDER * 2 - 1))
+        remaining -= size
+        user_id, address_id = rng.choice(addresses)
+        order_id = _uuid(rng)
+        status = rng.choices(statuses, weights)[0]
+        if status == 'pending':
+            # Still payable: older ones would have been expired already
+            created_at = now - timedelta(seconds=rng.randint(0, _context['pending_window']))
+        else:
+            created_at = _past(rng, now, ORDER_HISTORY_DAYS)
+
+        total = Decimal('0')
+        for product_id, name, image, price in rng.sample(products, min(size, len(products))):
+            quantity = rng.randint(1, 3)
+            subtotal = price * quantity
+            total += subtotal
+            items.append({
+                'id': _uuid(rng),
+                'order_id': order_id,
+                'product_id': product_id,
+                'product_name': name,
+                'product_image': image,
+                'price': price,
+                'quantity': quantity,
+                'subtotal': subtotal,
+            })
+
+        shipping_fee = Decimal('0') if total >= 99 else Decimal('10')
+        paid_at = created_at + timedelta(minutes=rng.randint(1, 30)) \
+            if status in ('paid', 'shipped', 'completed') else None
+        shipped_at = paid_at + timedelta(hours=rng.randint(2, 48)) \
+            if status in ('shipped', 'completed') else None
+        completed_at = shipped_at + timedelta(days=rng.randint(1, 7)) if status == 'completed' else None
+        cancelled_at = created_at + timedelta(minutes=rng.randint(5, 60)) if status == 'cancelled' else None
+        orders.append({
+            'id': order_id,
+            'user_id': user_id,
+            'address_id': address_id,
+            'total_amount': total,
+            'shipping_fee': shipping_fee,
+            'discount_amount': Decimal('0'),
+            'actual_amount': total + shipping_fee,
+            'status': status,
+            'remarks': fake.sentence() if rng.random() < 0.1 else None,
+            'paid_at': paid_at,
+            'shipped_at': shipped_at,
+            'completed_at': completed_at,
+            'cancelled_at': cancelled_at,
+            'created_at': created_at,
+            'updated_at': completed_at or cancelled_at or shipped_at or paid_at or created_at,
+        })
+    return orders, items
+
+
+# -- Parent side -------------------------------------------------------------
+
+@contextmanager
+def historical_timestamps(*models):
+    """Let ``bulk_create`` keep explicit ``auto_now``/``auto_now_add`` values."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _chunks(total, chunk_size):
+    return [(start, min(chunk_size, total - start)) for start in range(0, total, chunk_size)]
+
+
+class BulkSeeder:
+    """
+    Seed users, categories, products, orders and carts at scale.
+
+    ``log`` receives progress lines.
+    """
+
+    def __init__(self, users, products, order_items, category_fanout=0,
+                 num_categories=len(CATEGORY_DATA), chunk_size=2000, workers=None,
+                 seed=None, log=print):
+        self.users = users
+        self.products = products
+        self.order_items = order_items
+        self.category_fanout = category_fanout
+        self.num_categories = num_categories
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.log = log
+        self.run = uuid.uuid4().hex[:6]
+        self.now = timezone.now()
+
+    def seed_all(self):
+        started = time.perf_counter()
+        leaves = self.seed_categories()
+        addresses = self.seed_users()
+        self.seed_products(leaves)
+        products = self.sample_products()
+        self.seed_orders(addresses, products)
+        self.seed_carts(addresses, products)
+
+        invalidate_category_tree()
+        bump_version(CATALOG, CATEGORIES)
+        self.log(f'Done in {time.perf_counter() - started:.1f}s (seed={self.seed})')
+
+    def _pool_map(self, func, total, context):
+        """Yield worker results for ``total`` rows, chunk by chunk."""
+        # Don't hand open database sockets to forked workers
+        connections.close_all()
+        context = {'seed': self.seed, 'run': self.run, 'now': self.now, **context}
+        tasks = _chunks(total, self.chunk_size)
+        if self.workers <= 1:
+            _init_worker(context)
+            yield from map(func, tasks)
+            return
+        with multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(context,)) as pool:
+            yield from pool.imap_unordered(func, tasks)
+
+    def _insert(self, label, total, batches, progress_index=0, after_batch=None):
+        """
+        Insert ``batches`` of ``[(model, rows), ...]``, one transaction
+        each, counting progress by the rows of ``batch[progress_index]``.
+        ``after_batch(batch)`` runs inside each batch's transaction.
+        """
+        done = 0
+        started = time.perf_counter()
+        for batch in batches:
+            with transaction.atomic():
+                for model, rows in batch:
+                    model.objects.bulk_create([model(**row) for row in rows], batch_size=self.chunk_size)
+                if after_batch is not None:
+                    after_batch(batch)
+            done += len(batch[progress_index][1])
+            rate = done / max(time.perf_counter() - started, 1e-6)
+            self.log(f'  {label}: {done}/{total} ({rate:,.0f}/s)')
+
+    def seed_categories(self):
+        """Create the category tree and return ``[(leaf_id, leaf_name), ...]``."""
+        self.log('Generating categories...')
+        fake, rng = _generators(self.seed, 'categories', 0)
+        nodes = []
+        leaves = []
+
+        def node(name, parent=None, **extra):
+            category = Category(
+                id=_uuid(rng), name=name, parent=parent,
+                image=f'https://placehold.co/400x300/e2e8f0/64748b?text={name}',
+                description=fake.text(max_nb_chars=200), order=rng.randint(1, 10),
+                lft=0, rght=0, tree_id=0, level=0, **extra
+            )
+            nodes.append(category)
+            return category
+
+        for data in CATEGORY_DATA[:self.num_categories]:
+            parent = node(data['name'], icon=data['icon'])
+            for sub_name in data['subcategories']:
+                sub = node(sub_name, parent)
+                if not self.category_fanout:
+                    leaves.append((sub.id, sub.name))
+                for index in range(1, self.category_fanout + 1):
+                    leaf = node(f'{sub_name}系列{index}', sub)
+                    leaves.append((leaf.id, sub_name))
+
+        with transaction.atomic(), Category.objects.disable_mptt_updates():
+            Category.objects.bulk_create(nodes, batch_size=self.chunk_size)
+        Category.objects.rebuild()
+        self.log(f'  categories: {len(nodes)}')
+        return leaves
+
+    def seed_users(self):
+        """Create users and addresses; return ``[(user_id, address_id), ...]``."""
+        self.log(f'Generating {self.users} users...')
+        password = make_password(DEFAULT_PASSWORD)
+        pairs = []
+
+        def batches():
+            for users, addresses in self._pool_map(generate_users, self.users, {}):
+                for row in users:
+                    row['password'] = password
+                pairs.extend(
+                    (address['user_id'], address['id']) for address in addresses if address['is_default']
+                )
+                yield [(User, users), (Address, addresses)]
+
+        with historical_timestamps(Address):
+            self._insert('users', self.users, batches())
+        return pairs
+
+    def seed_products(self, leaves):
+        self.log(f'Generating {self.products} products...')
+        batches = (
+            [(Product, products), (ProductImage, images)]
+            for products, images in self._pool_map(generate_products, self.products, {'leaves': leaves})
+        )
+        with historical_timestamps(Product):
+            self._insert('products', self.products, batches)
+
+    def sample_products(self):
+        """``(id, name, main_image, price, stock)`` for products used by orders and carts."""
+        return list(
+            Product.objects
+            .filter(is_active=True)
+            .order_by('?')
+            .values_list('id', 'name', 'main_image', 'price', 'stock')[:ORDER_PRODUCT_SAMPLE]
+        )
+
+    def seed_orders(self, addresses, products):
+        if not self.order_items or not addresses or not products:
+            return
+        self.log(f'Generating {self.order_items} order items...')
+        context = {
+            'addresses': addresses,
+            'products': [product[:4] for product in products],
+            'pending_window': get_expiry_settings()['TIMEOUT_MINUTES'] * 60,
+        }
+        # Only this process writes stock while seeding
+        stock = {product[0]: product[4] for product in products}
+
+        def batches():
+            for orders, items in self._pool_map(generate_orders, self.order_items, context):
+                lines = {}
+                for item in items:
+                    lines.setdefault(item['order_id'], Counter())[item['product_id']] += item['quantity']
+                for row in orders:
+                    row['order_no'] = f'ORD{next_id()}'
+                    if row['status'] != 'pending':
+                        continue
+                    wanted = lines.get(row['id'], {})
+                    if all(stock[product_id] >= quantity for product_id, quantity in wanted.items()):
+                        for product_id, quantity in wanted.items():
+                            stock[product_id] -= quantity
+                    else:
+                        row.update(status='cancelled', cancelled_at=row['created_at'])
+                yield [(Order, orders), (OrderItem, items)]
+
+        def reserve_pending(batch):
+            (_, orders), (_, items) = batch
+            pending = {row['id'] for row in orders if row['status'] == 'pending'}
+            reserve_stock(
+                (item['product_id'], item['quantity']) for item in items if item['order_id'] in pending
+            )
+
+        with historical_timestamps(Order):
+            self._insert('order items', self.order_items, batches(), progress_index=1, after_batch=reserve_pending)
+
+    def seed_carts(self, addresses, products):
+        """Give half of the new users a few cart items."""
+        if not addresses or not products:
+            return
+        rng = random.Random(_derive_seed(self.seed, 'carts', 0))
+        users = rng.sample([user_id for user_id, _ in addresses], len(addresses) // 2)
+        self.log(f'Generating carts for {len(users)} users...')
+        for start in range(0, len(users), self.chunk_size):
+            items = [
+                CartItem(user_id=user_id, product_id=product[0], quantity=rng.randint(1, 3))
+                for user_id in users[start:start + self.chunk_size]
+                for product in rng.sample(products, min(rng.randint(1, 5), len(products)))
+            ]
+            with transaction.atomic():
+                CartItem.objects.bulk_create(items, batch_size=self.chunk_size, ignore_conflicts=True)
@@ -0,0 +1,96 @@
+"""
+Tests for read replica routing.
+
+The test settings define a ``replica`` alias mirroring the test database;
+these tests turn routing to it on and tell the two apart by which
+connection ran the queries.
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order
+from apps.products.models import Product
+from apps.products.tests.factories import ProductFactory
+from apps.users.tests.factories import UserFactory
+from config.db_router import PIN_CACHE_PREFIX, ReplicaRouter, RoutingState, _current_state
+
+REPLICA = 'replica'
+READ_REPLICAS = {'ALIASES': [REPLICA], 'APPS': ['products'], 'STICKY_SECONDS': 10, 'COOKIE_NAME': 'db_pin'}
+
+
+@override_settings(READ_REPLICAS=READ_REPLICAS)
+class ReplicaRouterTests(TestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.request = mock.Mock(COOKIES={}, user=mock.Mock(is_authenticated=False))
+        self.state = RoutingState(self.request)
+        self.state.use_replica = True
+        token = _current_state.set(self.state)
+        self.addCleanup(_current_state.reset, token)
+
+    def test_catalog_reads_go_to_the_replica(self):
+        self.assertEqual(self.router.db_for_read(Product), REPLICA)
+        self.assertEqual(self.router.db_for_read(Order), DEFAULT_DB_ALIAS)
+
+    def test_writes_go_to_the_primary_and_later_reads_follow(self):
+        self.assertEqual(self.router.db_for_write(Product), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(Product), DEFAULT_DB_ALIAS)
+
+    def test_pinned_cookie_reads_the_primary(self):
+        self.request.COOKIES = {'db_pin': '1'}
+        self.assertEqual(self.router.db_for_read(Product), DEFAULT_DB_ALIAS)
+
+    def test_pinned_user_reads_the_primary(self):
+        self.request.user = mock.Mock(is_authenticated=True, pk=42)
+        cache.set(f'{PIN_CACHE_PREFIX}42', 1)
+        self.addCleanup(cache.delete, f'{PIN_CACHE_PREFIX}42')
+        self.assertEqual(self.router.db_for_read(Product), DEFAULT_DB_ALIAS)
+
+    def test_reads_outside_a_request_use_the_primary(self):
+        _current_state.set(None)
+        self.assertEqual(self.router.db_for_read(Product), DEFAULT_DB_ALIAS)
+
+
+# The replica is a second connection, so it only sees committed rows
+@override_settings(READ_REPLICAS=READ_REPLICAS)
+class ReadYourWritesTests(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        self.product = ProductFactory()
+        patcher = mock.patch.object(router, 'routers', [ReplicaRouter()])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(UserFactory())
+
+    def product_list_queries(self):
+        with CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = self.client.get(reverse('product_list'))
+        self.assertEqual(response.status_code, 200)
+        return len(replica)
+
+    def test_reads_move_to_the_primary_after_a_write(self):
+        self.assertGreater(self.product_list_queries(), 0)
+
+        response = self.client.post(
+            reverse('add_to_cart'), {'product_id': str(self.product.id), 'quantity': 1}, format='json'
+        )
+        self.assertLess(response.status_code, 300)
+        self.assertIn('db_pin', response.cookies)
+
+        self.assertEqual(self.product_list_queries(), 0)
+
+    def test_user_pin_outlives_the_cookie(self):
+        self.client.post(reverse('add_to_cart'), {'product_id': str(self.product.id), 'quantity': 1}, format='json')
+        self.client.cookies.clear()
+
+        self.assertEqual(self.product_list_queries(), 0)
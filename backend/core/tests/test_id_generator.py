@@ -0,0 +1,105 @@
+"""
+Tests for worker id leasing in the ID generator.
+"""
+
+import os
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core.id_generator import MAX_WORKER_ID, SEQUENCE_BITS, SnowflakeGenerator, WorkerIdUnavailable
+
+
+@mock.patch('core.id_generator.threading.Thread')
+@override_settings(CACHES={
+    # Room for a lease per worker id
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 4 * (MAX_WORKER_ID + 1)},
+    },
+})
+class WorkerIdLeaseTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_processes_lease_distinct_worker_ids(self, thread):
+        generators = [SnowflakeGenerator() for _ in range(50)]
+        worker_ids = [generator.worker_id for generator in generators]
+        self.assertEqual(len(set(worker_ids)), len(worker_ids))
+        self.assertEqual(thread.return_value.start.call_count, len(generators))
+
+    def test_no_free_worker_id_fails_loudly(self, thread):
+        for _ in range(MAX_WORKER_ID + 1):
+            SnowflakeGenerator().worker_id
+        with self.assertRaises(WorkerIdUnavailable):
+            SnowflakeGenerator().next_id()
+
+    def test_released_worker_id_can_be_leased_again(self, thread):
+        generators = [SnowflakeGenerator() for _ in range(MAX_WORKER_ID + 1)]
+        for generator in generators:
+            generator.worker_id
+        released = generators[7].worker_id
+        generators[7].release()
+        self.assertEqual(SnowflakeGenerator().worker_id, released)
+
+    def test_renewal_keeps_the_lease_until_another_process_takes_it(self, thread):
+        generator = SnowflakeGenerator()
+        worker_id = generator.worker_id
+        token = generator._lease_token
+        key = generator._lease_key(worker_id)
+
+        self.assertTrue(generator._renew_lease(worker_id, token))
+        cache.delete(key)
+        self.assertTrue(generator._renew_lease(worker_id, token))
+        cache.set(key, 'another-process')
+        self.assertFalse(generator._renew_lease(worker_id, token))
+
+    def test_configured_worker_id_is_not_leased(self, thread):
+        self.assertEqual(SnowflakeGenerator(worker_id=3).worker_id, 3)
+        thread.assert_not_called()
+
+    def test_renewal_does_not_hold_the_generator_lock(self, thread):
+        generator = SnowflakeGenerator()
+        worker_id = generator.worker_id
+        token = generator._lease_token
+        lock_held = []
+
+        def renew(*args):
+            lock_held.append(generator._lock.locked())
+            return True
+
+        with mock.patch.object(generator, '_renew_lease', side_effect=renew):
+            self.assertTrue(generator._refresh_lease(os.getpid(), worker_id, token))
+        self.assertEqual(lock_held, [False])
+
+    def test_failed_renewals_stop_ids_from_the_expired_lease(self, thread):
+        generator = SnowflakeGenerator()
+        worker_id = generator.worker_id
+        token = generator._lease_token
+
+        with mock.patch.object(generator, '_renew_lease', side_effect=ConnectionError):
+            self.assertTrue(generator._refresh_lease(os.getpid(), worker_id, token))
+        generator._lease_deadline = time.monotonic() - 1
+
+        # The old key is still ours in the cache, so a different id is leased
+        self.assertNotEqual((generator.next_id() >> SEQUENCE_BITS) & MAX_WORKER_ID, worker_id)
+        self.assertNotEqual(generator._lease_token, token)
+        self.assertFalse(generator._refresh_lease(os.getpid(), worker_id, token))
+
+    def test_expired_lease_with_the_cache_down_fails_loudly(self, thread):
+        generator = SnowflakeGenerator()
+        generator.next_id()
+        generator._lease_deadline = time.monotonic() - 1
+
+        with mock.patch('core.id_generator.cache.add', side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                generator.next_id()
+
+    def test_process_local_cache_is_warned_about(self, thread):
+        with self.assertLogs('core.id_generator', 'WARNING') as logs:
+            SnowflakeGenerator().worker_id
+        self.assertIn('process-local cache', logs.output[0])
@@ -0,0 +1,58 @@
+"""
+Tests for keyset pagination.
+"""
+
+import base64
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.products.tests.factories import CategoryFactory, ProductFactory
+
+
+def make_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = CategoryFactory()
+        cls.products = ProductFactory.create_batch(5, category=category)
+
+    def get(self, **params):
+        return APIClient().get(reverse('product_list'), params)
+
+    def test_next_link_walks_every_row(self):
+        seen = []
+        response = self.get(page_size=2)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen += [item['id'] for item in response.data['results']]
+            if not response.data['next']:
+                break
+            response = APIClient().get(response.data['next'])
+        self.assertCountEqual(seen, [str(product.id) for product in self.products])
+
+    def test_cursor_values_of_the_wrong_type_are_rejected(self):
+        product = self.products[0]
+        for key in (
+            ['not-a-date', str(product.id)],
+            [product.created_at.isoformat(), 'not-a-uuid'],
+            [None, str(product.id)],
+            [{'a': 1}, str(product.id)],
+            [product.created_at.isoformat()],
+        ):
+            with self.subTest(key=key):
+                response = self.get(cursor=make_cursor({'k': key}))
+                self.assertEqual(response.status_code, 404)
+
+    def test_malformed_cursor_is_rejected(self):
+        product = self.products[0]
+        key = [product.created_at.isoformat(), str(product.id)]
+        for cursor in ('%%%', make_cursor(['k']), make_cursor({'k': key, 'r': 'yes'})):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.get(cursor=cursor).status_code, 404)
@@ -0,0 +1,62 @@
+"""
+Tests for the bulk seeder.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.test import SimpleTestCase, TransactionTestCase
+
+from apps.orders.models import Order, OrderItem
+from apps.orders.tasks import get_expiry_settings
+from apps.products.models import Product
+from apps.products.tests.factories import CategoryFactory, ProductFactory
+from apps.users.tests.factories import AddressFactory
+from core.seeding import BulkSeeder, _generators
+
+
+# The seeder closes connections before forking, so it can't run inside a test transaction
+class SeedOrdersTests(TransactionTestCase):
+
+    def seed(self, stock):
+        category = CategoryFactory()
+        ProductFactory.create_batch(5, category=category, stock=stock)
+        addresses = [(address.user_id, address.id) for address in AddressFactory.create_batch(3)]
+        seeder = BulkSeeder(users=0, products=0, order_items=400, chunk_size=50, workers=1, seed=7,
+                            log=lambda message: None)
+        seeder.seed_orders(addresses, seeder.sample_products())
+        return seeder
+
+    def test_pending_orders_are_recent_and_reserve_stock(self):
+        seeder = self.seed(stock=1000)
+        pending = Order.objects.filter(status='pending')
+        self.assertTrue(pending.exists())
+
+        timeout = timedelta(minutes=get_expiry_settings()['TIMEOUT_MINUTES'])
+        self.assertFalse(pending.filter(created_at__lt=seeder.now - timeout).exists())
+
+        reserved = dict(
+            OrderItem.objects.filter(order__status='pending')
+            .values_list('product_id').annotate(quantity=Sum('quantity'))
+        )
+        for product in Product.objects.all():
+            self.assertEqual(product.stock, 1000 - reserved.get(product.id, 0))
+
+    def test_pending_orders_beyond_stock_are_cancelled(self):
+        self.seed(stock=0)
+        self.assertFalse(Order.objects.filter(status='pending').exists())
+        self.assertFalse(Product.objects.exclude(stock=0).exists())
+
+
+class GeneratorSeedTests(SimpleTestCase):
+
+    def draws(self, table, start):
+        _, rng = _generators(7, table, start)
+        return [rng.random() for _ in range(3)]
+
+    def test_tables_and_chunks_get_distinct_sequences(self):
+        sequences = [self.draws(table, start) for table in ('categories', 'users') for start in (0, 50)]
+        self.assertEqual(len({tuple(sequence) for sequence in sequences}), len(sequences))
+
+    def test_sequences_are_reproducible(self):
+        self.assertEqual(self.draws('users', 0), self.draws('users', 0))
@@ -39,7 +39,9 @@ interface Order {
   total_amount: number
   discount_amount: number
   shipping_fee: number
-  items: OrderItem[]
+  item_count?: number
+  thumbnails?: string[]
+  items?: OrderItem[]
   address?: {
     receiver_name: string
     receiver_phone: string
@@ -50,15 +52,41 @@ interface Order {
   }
 }
 
+interface OrderPage {
+  next: string | null
+  previous: string | null
+  results: Order[]
+}
+
 export default function OrdersPage() {
   const router = useRouter()
   const { isAuthenticated } = useAuthStore()
   const [selectedOrder, setSelectedOrder] = useState<Order | null>(null)
   const [detailModalOpen, setDetailModalOpen] = useState(false)
 
-  const { data: orders, loading } = useRequest<Order[]>('/orders/', {
+  const [moreOrders, setMoreOrders] = useState<Order[]>([])
+  const [nextUrl, setNextUrl] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
+
+  const { data: firstPage, loading } = useRequest<OrderPage>('/orders/', {
     immediate: isAuthenticated,
+    onSuccess: (page: OrderPage) => setNextUrl(page.next),
   })
+  const orders = firstPage ? [...firstPage.results, ...moreOrders] : null
+
+  const loadMore = async () => {
+    if (!nextUrl) return
+    setLoadingMore(true)
+    try {
+      const response = await api.get<OrderPage>(nextUrl)
+      setMoreOrders((prev) => [...prev, ...response.data.results])
+      setNextUrl(response.data.next)
+    } catch (error) {
+      toast.error('加载失败')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
 
   useEffect(() => {
     if (!isAuthenticated) {
@@ -76,9 +104,14 @@ export default function OrdersPage() {
     }
   }
 
-  const showOrderDetail = (order: Order) => {
-    setSelectedOrder(order)
-    setDetailModalOpen(true)
+  const showOrderDetail = async (order: Order) => {
+    try {
+      const response = await api.get<Order>(`/orders/${order.id}/`)
+      setSelectedOrder(response.data)
+      setDetailModalOpen(true)
+    } catch (error) {
+      toast.error('加载订单详情失败')
+    }
   }
 
   if (!isAuthenticated) {
@@ -122,25 +155,20 @@ export default function OrdersPage() {
                   </div>
 
                   <div className="grid grid-cols-1 md:grid-cols-3 gap-4 mb-4">
-                    {order.items.slice(0, 3).map((item: any) => (
-                      <div key={item.id} className="flex items-center gap-2">
-                        <img
-                          src={item.product_image || '/placeholder-product.jpg'}
-                          alt={item.product_name}
-                          className="w-16 h-16 object-cover rounded"
-                        />
-                        <div className="flex-1 min-w-0">
-                          <p className="text-sm truncate">{item.product_name}</p>
-                          <p className="text-xs text-gray-500">¥{item.price} x {item.quantity}</p>
-                        </div>
-                      </div>
+                    {(order.thumbnails || []).map((image: string, index: number) => (
+                      <img
+                        key={index}
+                        src={image || '/placeholder-product.jpg'}
+                        alt={order.order_no}
+                        className="w-16 h-16 object-cover rounded"
+                      />
                     ))}
                   </div>
 
                   <div className="flex justify-between items-center border-t pt-4 flex-wrap gap-4">
                     <div className="flex items-center gap-4">
                       <span className="text-sm text-gray-600">
-                        共 {order.items.reduce((sum: number, item: any) => sum + item.quantity, 0)} 件商品
+                        共 {order.item_count ?? 0} 件商品
                       </span>
                       <span className="text-sm">
                         实付：<span className="text-red-500 font-semibold text-lg">¥{order.actual_amount}</span>
@@ -175,6 +203,13 @@ export default function OrdersPage() {
               </Card>
             )
           })}
+          {nextUrl && (
+            <div className="flex justify-center">
+              <Button variant="default" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? '加载中...' : '加载更多'}
+              </Button>
+            </div>
+          )}
         </div>
       )}
 
@@ -241,7 +276,7 @@ export default function OrdersPage() {
             <div className="border-t pt-4">
               <h3 className="font-semibold mb-3">商品清单</h3>
               <div className="space-y-3">
-                {selectedOrder.items.map((item: any) => (
+                {(selectedOrder.items || []).map((item: any) => (
                   <div key={item.id} className="flex items-center gap-4">
                     <img
                       src={item.product_image || '/placeholder-product.jpg'}
@@ -1,6 +1,6 @@
 'use client'
 
-import { Suspense, useEffect, useState } from 'react'
+import { Suspense, useEffect, useRef, useState } from 'react'
 import { useRouter, useSearchParams } from 'next/navigation'
 import { CreditCard, Smartphone, CheckCircle, Loader2, ArrowLeft } from 'lucide-react'
 import { Button } from '@/components/ui/button'
@@ -9,6 +9,7 @@ import { LoadingPage } from '@/components/ui/loading'
 import { useAuthStore } from '@/store/authStore'
 import api from '@/lib/api'
 import { toast } from '@/lib/utils/toast'
+import { uuid } from '@/lib/utils/uuid'
 
 interface OrderDetail {
   id: string
@@ -38,6 +39,8 @@ function PaymentContent() {
   const [loading, setLoading] = useState(true)
   const [paying, setPaying] = useState(false)
   const [paymentMethod, setPaymentMethod] = useState('alipay')
+  // One idempotency key per payment method, reused on retries and double clicks
+  const idempotencyKeys = useRef<Record<string, string>>({})
 
   useEffect(() => {
     if (!isAuthenticated) {
@@ -80,9 +83,19 @@ function PaymentContent() {
 
     setPaying(true)
     try {
-      const response = await api.post(`/orders/${order.id}/pay/`, {
-        payment_method: paymentMethod,
-      })
+      const idempotencyKey = (idempotencyKeys.current[paymentMethod] ??= uuid())
+      const headers = { 'Idempotency-Key': idempotencyKey }
+      // Keys are scoped per endpoint, so a retry replays the same payment
+      const payment = await api.post(
+        `/orders/${order.id}/payment/`,
+        { payment_method: paymentMethod },
+        { headers },
+      )
+      const response = await api.post(
+        `/orders/${order.id}/pay/`,
+        { payment_method: paymentMethod, payment_no: payment.data.payment_no },
+        { headers },
+      )
 
       if (response.data.success) {
         toast.success('支付成功')